@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from api.tools import RowSerializer
+from api.views import CatalogEntryViewSet, TLEViewSet
+
+class Command(BaseCommand):
+    help = 'Compare the rows per second of the model and row serializations of the lists'
+
+    def add_arguments(self, parser):
+        """
+            Set command's arguments
+        """
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=1000,
+            help='Number of rows of each list'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Number of times each list is serialized, the best time is kept'
+        )
+
+    def handle(self, *args, **options):
+        """
+            Main function
+        """
+        if options['rows'] < 1 or options['repeat'] < 1:
+            raise CommandError('The number of rows and of repeats must be positive')
+
+        renderer = JSONRenderer()
+
+        for name, viewset in [('tle', TLEViewSet), ('catalogentry', CatalogEntryViewSet)]:
+            queryset = viewset.queryset.order_by('pk')[:options['rows']]
+            rows = RowSerializer(viewset.serializer_class)
+
+            count = queryset.count()
+            if not count:
+                raise CommandError('No %s found in the database' % name)
+
+            def model():
+                return renderer.render(
+                    viewset.serializer_class(queryset.all(), many=True).data
+                )
+
+            def row():
+                return renderer.render(rows.serialize(rows.values(queryset.all())))
+
+            results = {}
+            for method, function in [('serializer', model), ('rows', row)]:
+                best = None
+                for _ in range(options['repeat']):
+                    begin = time.time()
+                    results[method] = function()
+                    duration = time.time() - begin
+                    best = duration if best is None else min(best, duration)
+
+                self.stdout.write('{0:<13} {1:<11} {2:12.0f} rows/s'.format(
+                    name,
+                    method,
+                    count / best
+                ))
+
+            if results['serializer'] != results['rows']:
+                raise CommandError('The %s outputs differ' % name)
+
+        self.stdout.write(self.style.SUCCESS('Both serializations give the same JSON'))
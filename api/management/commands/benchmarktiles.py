@@ -0,0 +1,115 @@
+import math
+import random
+import time
+
+import ephem
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.models import TLE
+from api.tools import EphemerisTiles, SatelliteComputation
+
+class Command(BaseCommand):
+    help = 'Compare the ephemeris tiles with direct pyephem propagation'
+
+    def add_arguments(self, parser):
+        """
+            Set command's arguments
+        """
+        parser.add_argument(
+            '--path',
+            default=settings.EPHEMERIS_TILES_PATH,
+            help='Tiles file, EPHEMERIS_TILES_PATH by default'
+        )
+        parser.add_argument(
+            '--satellites',
+            type=int,
+            default=100,
+            help='Number of satellites of the tiles to query'
+        )
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=100,
+            help='Number of queries per satellite'
+        )
+
+    def handle(self, *args, **options):
+        """
+            Main function
+        """
+        try:
+            tiles = EphemerisTiles(options['path'])
+        except (TypeError, ValueError, OSError):
+            raise CommandError('Could not read the tiles file "%s"' % options['path'])
+
+        index = list(tiles.index[:options['satellites']])
+        tles = TLE.objects.in_bulk([int(entry['tle']) for entry in index])
+
+        queries = []
+        for entry in index:
+            tle = tles.get(int(entry['tle']))
+            if tle is None:
+                continue
+
+            end = entry['start'] + entry['length'] * entry['segments']
+            for _ in range(options['queries']):
+                queries.append((tle, random.uniform(entry['start'], end)))
+
+        if not queries:
+            raise CommandError('No TLE of the tiles found in the database')
+
+        bodies = dict(
+            (tle.id, ephem.readtle(tle.first_line, tle.second_line, tle.third_line))
+            for tle in tles.values()
+        )
+        computations = dict(
+            (tle.id, SatelliteComputation(tle=tle)) for tle in tles.values()
+        )
+
+        def direct(tle, date):
+            body = bodies[tle.id]
+            body.compute(ephem.Date(date))
+            return {
+                'longitude': math.degrees(body.sublong),
+                'latitude': math.degrees(body.sublat),
+                'elevation': body.elevation,
+            }
+
+        def computation(tle, date):
+            sc = computations[tle.id]
+            sc.observer.date = date
+            return sc.compute()
+
+        def interpolation(tle, date):
+            return tiles.compute(tle.id, date)
+
+        results = {}
+        for name, method in [('pyephem', direct), ('compute', computation), ('tiles', interpolation)]:
+            begin = time.time()
+            results[name] = [method(tle, date) for tle, date in queries]
+            duration = time.time() - begin
+
+            self.stdout.write('{0:<10} {1:10.2f} us per query'.format(
+                name,
+                duration / len(queries) * 1e6
+            ))
+
+        errors = {'longitude': 0.0, 'latitude': 0.0, 'elevation': 0.0}
+        for expected, data in zip(results['pyephem'], results['tiles']):
+            for key in errors:
+                error = abs(data[key] - expected[key])
+                if key == 'longitude':
+                    error = min(error, 360 - error)
+                errors[key] = max(errors[key], error)
+
+        self.stdout.write(
+            'Largest difference with pyephem over {0} queries: {1:.6f} deg '
+            'longitude, {2:.6f} deg latitude, {3:.1f} m elevation'.format(
+                len(queries),
+                errors['longitude'],
+                errors['latitude'],
+                errors['elevation']
+            )
+        )
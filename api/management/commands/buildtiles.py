@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.models import CatalogEntry, TLE
+from api.tools import BatchPropagator, format_inline_time
+from api.tools.ephemeris_tiles import write_tiles
+
+class Command(BaseCommand):
+    help = 'Precompute the ephemeris tiles of the latest TLE of each satellite'
+
+    def add_arguments(self, parser):
+        """
+            Set command's arguments
+        """
+        parser.add_argument(
+            '--path',
+            default=settings.EPHEMERIS_TILES_PATH,
+            help='Tiles file, EPHEMERIS_TILES_PATH by default'
+        )
+        parser.add_argument(
+            '--start',
+            help='Start of the tiles (YYYYMMDDhhmmss), now by default'
+        )
+        parser.add_argument(
+            '--hours',
+            type=float,
+            default=settings.EPHEMERIS_TILES_HOURS,
+            help='Time window covered by the tiles'
+        )
+        parser.add_argument(
+            '--accuracy',
+            type=float,
+            default=settings.EPHEMERIS_TILES_ACCURACY,
+            help='Largest position error of the tiles (m)'
+        )
+        parser.add_argument(
+            'satellites',
+            nargs='*',
+            help='Satellites to precompute, every one by default'
+        )
+
+    def handle(self, *args, **options):
+        """
+            Main function
+        """
+        if options['path'] is None:
+            raise CommandError('No tiles file given and EPHEMERIS_TILES_PATH is not set')
+
+        try:
+            start = format_inline_time(options['start'])
+        except ValueError:
+            raise CommandError('The given start time is not correct')
+
+        if options['hours'] <= 0 or options['accuracy'] <= 0:
+            raise CommandError('Duration and accuracy must be positive')
+
+        # Whole minutes, so that the tiles cover the start of the window
+        start = start.replace(second=0, microsecond=0)
+        end = start + timedelta(hours=options['hours'])
+
+        entries = CatalogEntry.objects.all()
+        if options['satellites']:
+            entries = entries.filter(norad_catalog_number__in=options['satellites'])
+
+        lines = TLE.objects.findLinesByCatalogEntriesAndTime(entries)
+
+        count = write_tiles(
+            options['path'],
+            [(line[0], line[1]) for line in lines],
+            BatchPropagator.from_lines(
+                [(line1, line2) for _, _, line1, line2 in lines]
+            ),
+            start,
+            end,
+            options['accuracy']
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            'Successfully built the tiles of %d satellites out of %d' % (
+                count,
+                len(lines)
+            )
+        ))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from api.tools import response_cache
+
+class Command(BaseCommand):
+    help = 'Show the hits and misses of the API response cache'
+
+    def add_arguments(self, parser):
+        """
+            Set command's arguments
+        """
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Set the counters back to 0 once shown'
+        )
+
+    def handle(self, *args, **options):
+        """
+            Main function
+        """
+        stats = response_cache.stats()
+
+        self.stdout.write('Enabled     %s' % response_cache.enabled)
+        self.stdout.write('Generation  %d' % stats['generation'])
+        self.stdout.write('Hits        %d' % stats['hits'])
+        self.stdout.write('Misses      %d' % stats['misses'])
+        if stats['ratio'] is not None:
+            self.stdout.write('Hit ratio   %.1f%%' % (stats['ratio'] * 100))
+
+        if options['reset']:
+            response_cache.reset()
+            self.stdout.write(self.style.SUCCESS('Successfully reset the counters'))
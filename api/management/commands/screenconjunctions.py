@@ -0,0 +1,133 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.models import CatalogEntry, TLE
+from api.tools import BatchPropagator, ConjunctionScreener, format_inline_time
+from api.tools.conjunction import screen_window
+
+class Command(BaseCommand):
+    help = 'Screen close approaches between the satellites of the catalog'
+
+    def add_arguments(self, parser):
+        """
+            Set command's arguments
+        """
+        parser.add_argument(
+            '--start',
+            help='Start of the screening (YYYYMMDDhhmmss), now by default'
+        )
+        parser.add_argument(
+            '--hours',
+            type=float,
+            default=24,
+            help='Duration of the screening'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=ConjunctionScreener.default_threshold / 1000.0,
+            help='Miss distance under which an approach is reported (km)'
+        )
+        parser.add_argument(
+            '--step',
+            type=float,
+            default=ConjunctionScreener.step,
+            help='Seconds between two samples'
+        )
+        parser.add_argument(
+            '--satellite',
+            help='Only screen the approaches of this satellite'
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=max(1, settings.COMPUTE_WORKERS),
+            help='Number of processes screening time windows in parallel'
+        )
+
+    def handle(self, *args, **options):
+        """
+            Main function
+        """
+        try:
+            start = format_inline_time(options['start'])
+        except ValueError:
+            raise CommandError('The given start time is not correct')
+
+        if options['hours'] <= 0 or options['threshold'] <= 0 or \
+           not math.isfinite(options['threshold']) or \
+           options['step'] <= 0 or options['processes'] < 1:
+            raise CommandError('Duration, threshold, step and processes must be positive')
+
+        end = start + timedelta(hours=options['hours'])
+
+        lines = TLE.objects.findLinesByCatalogEntriesAndTime(
+            CatalogEntry.objects.all(),
+            start
+        )
+
+        primary = None
+        if options['satellite'] is not None:
+            numbers = [line[0] for line in lines]
+            if options['satellite'] not in numbers:
+                raise CommandError(
+                    'No TLE found for satellite "%s"' % options['satellite']
+                )
+            primary = numbers.index(options['satellite'])
+
+        conjunctions = self.screen(
+            [(line1, line2) for _, _, line1, line2 in lines],
+            start,
+            end,
+            options['threshold'] * 1000.0,
+            options['step'],
+            primary,
+            options['processes']
+        )
+
+        for conjunction in conjunctions:
+            self.stdout.write('{0} {1} {2} {3:.3f} km {4:.1f} m/s'.format(
+                conjunction['tca'].strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+                lines[conjunction['first']][0],
+                lines[conjunction['second']][0],
+                conjunction['miss_distance'] / 1000.0,
+                conjunction['relative_velocity'],
+            ))
+
+        self.stdout.write(self.style.SUCCESS(
+            'Found %d conjunctions' % len(conjunctions)
+        ))
+
+    def screen(self, lines, start, end, threshold, step, primary, processes):
+        """
+            Screen the time windows, in worker processes if more than one is
+            requested
+        """
+        if not lines:
+            return []
+
+        screener = ConjunctionScreener(BatchPropagator.from_lines(lines), threshold)
+        screener.step = step
+
+        windows = screener.windows(start, end)
+        last = [i == len(windows) - 1 for i in range(len(windows))]
+
+        if processes == 1:
+            results = [
+                screener.screen_window(window[0], window[1], primary, is_last)
+                for window, is_last in zip(windows, last)
+            ]
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                results = list(executor.map(
+                    partial(screen_window, lines, threshold, step, primary),
+                    windows,
+                    last
+                ))
+
+        return [conjunction for result in results for conjunction in result]
@@ -0,0 +1,73 @@
+"""
+    Query budgets of the API endpoints
+"""
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from api.tools import data_generation
+
+class QueryBudgetMixin(object):
+    """
+        TestCase mixin checking the number of queries run by a request
+
+        The data generation, read once in a while by each process, is read
+        before the requests and not counted.
+    """
+
+    def setUp(self):
+        super(QueryBudgetMixin, self).setUp()
+
+        settings = override_settings(API_GENERATION_REFRESH_INTERVAL=3600)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        data_generation.clear()
+        data_generation.state()
+
+    def assertQueryBudget(self, url, budget, using=DEFAULT_DB_ALIAS):
+        """
+            Request url and fail if it runs more than budget queries, the
+            queries are listed in the failure message. Returns the response.
+        """
+        with CaptureQueriesContext(connections[using]) as context:
+            response = self.client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+
+        queries = context.captured_queries
+        if len(queries) > budget:
+            self.fail('%s ran %d queries, more than its budget of %d:\n%s' % (
+                url,
+                len(queries),
+                budget,
+                '\n'.join(
+                    '%d. %s' % (i, query['sql'])
+                    for i, query in enumerate(queries, start=1)
+                )
+            ))
+
+        return response
+
+    def assertConstantQueries(self, url, grow):
+        """
+            Fail if the number of queries of url changes once grow() added
+            rows to the database
+        """
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as before:
+            self.client.get(url)
+
+        grow()
+
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as after:
+            self.client.get(url)
+
+        self.assertEqual(
+            len(before.captured_queries),
+            len(after.captured_queries),
+            '%s runs a number of queries depending on the number of rows' % url
+        )
@@ -7,7 +7,7 @@ from rest_framework import status
 from rest_framework.test import APIRequestFactory
 
 from api.views import LaunchSiteViewSet, OperationalStatusViewSet, OrbitalStatusViewSet, SourceViewSet, CatalogEntryViewSet, TLEViewSet, DataSourceViewSet, ComputeView
-from api.tools import SatelliteComputation, format_inline_time
+from api.tools import SatelliteComputation, format_inline_time, tle_timeline
 from catalog.models import CatalogEntry, TLE
 
 def is_correct_json(string):
@@ -422,4 +422,441 @@ class ComputationTestCase(ApiGetTestCase):
             the given time
         """
         response = self.client.get('/api/v1/catalogentry/25544/tle/?time=20000825200000')
-        self.assertEquals(response.status_code, status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        self.assertEquals(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_getTLEFromCatalogEntryWithoutTimeUsesCurrentTle(self):
+        """
+            Check if the current TLE of the entry is returned when no time is
+            given
+        """
+        CatalogEntry.objects.filter(norad_catalog_number='25544') \
+            .update(current_tle=2)
+
+        response = self.client.get('/api/v1/catalogentry/25544/tle/')
+        json_data = json.loads(response.content.decode('utf8'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json_data['id'], 2)
+        self.assertEqual(json_data['satellite_number']['norad_catalog_number'], '25544')
+
+def streamed_json(response):
+    """
+        Decode the json of a streamed response
+    """
+    content = b''.join(response.streaming_content).decode('utf8')
+    return json.loads(content)
+
+class TrackTestCase(TestCase):
+    """
+        Tests on the ground track part of the api
+    """
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    url = '/api/v1/compute/25544/track/'
+
+    def test_trackRouteExists(self):
+        response = self.client.get(
+            '{}?start=20170301000000&end=20170301003000&step=60'.format(self.url)
+        )
+        self.assertEquals(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+
+    def test_trackReturnsOnePointPerStep(self):
+        response = self.client.get(
+            '{}?start=20170301000000&end=20170301003000&step=60'.format(self.url)
+        )
+        json_data = streamed_json(response)
+
+        self.assertEqual(json_data['count'], 31)
+        self.assertEqual(len(json_data['results']), 31)
+        self.assertEqual(json_data['results'][0]['time'], '2017-03-01T00:00:00Z')
+        self.assertEqual(json_data['results'][-1]['time'], '2017-03-01T00:30:00Z')
+
+    def test_trackDefaultsToOneOrbit(self):
+        response = self.client.get('{}?start=20170301000000'.format(self.url))
+        json_data = streamed_json(response)
+
+        # 92.6 minutes at one point per minute
+        self.assertEqual(json_data['count'], 93)
+
+    def test_trackUsesTheTleOfTheStartDate(self):
+        tle = TLE.objects.findByCatalogEntryAndTime(
+            CatalogEntry.objects.get(norad_catalog_number='25544'),
+            format_inline_time('20170301000000')
+        )
+        response = self.client.get('{}?start=20170301000000'.format(self.url))
+
+        self.assertEqual(streamed_json(response)['tle'], tle.id)
+
+    def test_trackPointsMatchComputeView(self):
+        response = self.client.get(
+            '{}?start=20170301000000&end=20170301001000&step=300'.format(self.url)
+        )
+        points = streamed_json(response)['results']
+
+        for point, time in zip(points, ['20170301000000', '20170301000500']):
+            response = self.client.get(
+                '/api/v1/compute/25544/?time={}'.format(time)
+            )
+            expected = json.loads(response.content.decode('utf8'))
+
+            for key in ['longitude', 'latitude']:
+                self.assertAlmostEqual(point[key], expected[key], places=3)
+            self.assertAlmostEqual(point['elevation'], expected['elevation'], delta=100)
+
+    def test_trackReturns400IfTooManyPoints(self):
+        response = self.client.get(
+            '{}?start=20170301000000&end=20170310000000&step=1'.format(self.url)
+        )
+        self.assertEquals(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_trackReturns400IfRangeIsIncorrect(self):
+        queries = [
+            '?start=20170301000000&end=20170228000000',
+            '?start=20170301000000&step=0',
+            '?start=20170301000000&step=abc',
+            '?start=notadate',
+        ]
+
+        for query in queries:
+            response = self.client.get('{}{}'.format(self.url, query))
+            self.assertEquals(
+                response.status_code,
+                status.HTTP_400_BAD_REQUEST,
+                query
+            )
+
+    def test_trackReturns400IfTheOrbitCanNotBeDefaulted(self):
+        TLE.objects.filter(satellite_number='25544').update(mean_motion=0)
+        tle_timeline.clear()
+
+        response = self.client.get('{}?start=20170301000000'.format(self.url))
+        self.assertEquals(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        tle_timeline.clear()
+
+    def test_trackReturns400IfNoTLEFoundForTime(self):
+        response = self.client.get('{}?start=20000301000000'.format(self.url))
+        self.assertEquals(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class SnapshotTestCase(TestCase):
+    """
+        Tests on the catalog snapshot part of the api
+    """
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    url = '/api/v1/compute/snapshot/'
+
+    def test_snapshotRouteExists(self):
+        response = self.client.get('{}?time=20170301000000'.format(self.url))
+        self.assertEquals(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+
+    def test_snapshotReturnsEveryEntryWithATle(self):
+        response = self.client.get('{}?time=20170301000000'.format(self.url))
+        json_data = streamed_json(response)
+
+        self.assertEqual(json_data['count'], 2)
+        self.assertEqual(json_data['failed'], [])
+        self.assertEqual(
+            [row[:2] for row in json_data['results']],
+            [['25544', 4], ['37820', 3]]
+        )
+
+    def test_snapshotRowsMatchFields(self):
+        response = self.client.get('{}?time=20170301000000'.format(self.url))
+        json_data = streamed_json(response)
+
+        for row in json_data['results']:
+            self.assertEqual(len(row), len(json_data['fields']))
+
+        row = dict(zip(json_data['fields'], json_data['results'][0]))
+        response = self.client.get('/api/v1/compute/25544/?time=20170301000000')
+        expected = json.loads(response.content.decode('utf8'))
+
+        self.assertEqual(row['tle'], expected['tle'])
+        for key in ['longitude', 'latitude']:
+            self.assertAlmostEqual(row[key], expected[key], places=3)
+
+    def test_snapshotAcceptsCatalogEntryFilters(self):
+        expected_results = {
+            '&owner__code=PRC': ['37820'],
+            '&norad_catalog_number__in=25544': ['25544'],
+            '&owner__code=NOPE': [],
+        }
+
+        for search, expected in expected_results.items():
+            response = self.client.get(
+                '{}?time=20170301000000{}'.format(self.url, search)
+            )
+            json_data = streamed_json(response)
+
+            self.assertEqual([row[0] for row in json_data['results']], expected)
+
+    def test_snapshotSkipsEntriesWithoutTleAtTime(self):
+        response = self.client.get('{}?time=20170228210000'.format(self.url))
+        json_data = streamed_json(response)
+
+        self.assertEqual([row[:2] for row in json_data['results']], [['25544', 2]])
+
+    def test_snapshotListsFailedEntries(self):
+        response = self.client.get('{}?time=20200301000000'.format(self.url))
+        json_data = streamed_json(response)
+
+        self.assertEqual(json_data['count'], 0)
+        self.assertEqual(json_data['failed'], ['25544', '37820'])
+
+    def test_snapshotReturns400IfTimeIsIncorrect(self):
+        response = self.client.get('{}?time=notatime'.format(self.url))
+        self.assertEquals(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class PassesTestCase(TestCase):
+    """
+        Tests on the pass prediction part of the api
+    """
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    url = '/api/v1/compute/25544/passes/'
+    observer = 'latitude=45&longitude=5&elevation=300'
+
+    def test_passesRouteExists(self):
+        response = self.client.get(
+            '{}?{}&start=20170301000000'.format(self.url, self.observer)
+        )
+        self.assertEquals(response.status_code, status.HTTP_200_OK)
+
+    def test_passesViewReturnsExpectedJsonFormat(self):
+        response = self.client.get(
+            '{}?{}&start=20170301000000'.format(self.url, self.observer)
+        )
+        json_data = json.loads(response.content.decode('utf8'))
+
+        self.assertEqual(json_data['tle'], 4)
+        self.assertGreater(len(json_data['passes']), 0)
+
+        expected_keys = [
+            'aos', 'aos_azimuth', 'tca', 'tca_azimuth', 'max_elevation',
+            'los', 'los_azimuth',
+        ]
+        for satellite_pass in json_data['passes']:
+            self.assertEqual(sorted(satellite_pass.keys()), sorted(expected_keys))
+            self.assertTrue(satellite_pass['aos'].startswith('2017-03-0'))
+            self.assertLess(satellite_pass['aos'], satellite_pass['tca'])
+            self.assertLess(satellite_pass['tca'], satellite_pass['los'])
+
+    def test_passesViewFiltersByMinimumElevation(self):
+        response = self.client.get(
+            '{}?{}&start=20170301000000&min_elevation=30'.format(
+                self.url,
+                self.observer
+            )
+        )
+        json_data = json.loads(response.content.decode('utf8'))
+
+        for satellite_pass in json_data['passes']:
+            self.assertGreaterEqual(satellite_pass['max_elevation'], 30)
+
+    def test_passesViewReturns400IfObserverIsIncorrect(self):
+        queries = [
+            '?start=20170301000000',
+            '?latitude=45&start=20170301000000',
+            '?latitude=95&longitude=5&start=20170301000000',
+            '?latitude=abc&longitude=5&start=20170301000000',
+        ]
+
+        for query in queries:
+            response = self.client.get('{}{}'.format(self.url, query))
+            self.assertEquals(
+                response.status_code,
+                status.HTTP_400_BAD_REQUEST,
+                query
+            )
+
+    def test_passesViewReturns400IfRangeIsIncorrect(self):
+        queries = [
+            '&start=20170301000000&end=20170228000000',
+            '&start=20170301000000&end=20170401000000',
+            '&start=20170301000000&min_elevation=abc',
+            '&start=notadate',
+        ]
+
+        for query in queries:
+            response = self.client.get(
+                '{}?{}{}'.format(self.url, self.observer, query)
+            )
+            self.assertEquals(
+                response.status_code,
+                status.HTTP_400_BAD_REQUEST,
+                query
+            )
+
+    def test_passesViewReturns400IfTimeTooFarAway(self):
+        response = self.client.get(
+            '{}?{}&start=20200301000000'.format(self.url, self.observer)
+        )
+        self.assertEquals(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_passesViewReturns400IfNoTLEFoundForTime(self):
+        response = self.client.get(
+            '{}?{}&start=20000301000000'.format(self.url, self.observer)
+        )
+        self.assertEquals(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_catalogPassesReturnsPassesPerSatellite(self):
+        response = self.client.get(
+            '/api/v1/compute/passes/?{}&start=20170301000000'.format(self.observer)
+        )
+        json_data = streamed_json(response)
+
+        self.assertEqual(json_data['count'], 2)
+        self.assertEqual(json_data['failed'], [])
+        self.assertEqual(
+            [(row['norad_catalog_number'], row['tle']) for row in json_data['results']],
+            [('25544', 4), ('37820', 3)]
+        )
+
+        response = self.client.get(
+            '{}?{}&start=20170301000000'.format(self.url, self.observer)
+        )
+        expected = json.loads(response.content.decode('utf8'))
+
+        self.assertEqual(json_data['results'][0]['passes'], expected['passes'])
+
+    def test_catalogPassesAcceptsCatalogEntryFilters(self):
+        response = self.client.get(
+            '/api/v1/compute/passes/?{}&start=20170301000000&owner__code=PRC'.format(
+                self.observer
+            )
+        )
+        json_data = streamed_json(response)
+
+        self.assertEqual(
+            [row['norad_catalog_number'] for row in json_data['results']],
+            ['37820']
+        )
+
+    def test_catalogPassesListsFailedEntries(self):
+        response = self.client.get(
+            '/api/v1/compute/passes/?{}&start=20200301000000'.format(self.observer)
+        )
+        json_data = streamed_json(response)
+
+        self.assertEqual(json_data['count'], 0)
+        self.assertEqual(json_data['failed'], ['25544', '37820'])
+
+class ObservationsTestCase(TestCase):
+    """
+        Tests on the topocentric parts of the api
+    """
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    url = '/api/v1/compute/observations/'
+    stations = 'station=45,5,300&station=-30,-70,2000'
+
+    def test_computeViewReturnsTopocentricDataWithAnObserver(self):
+        response = self.client.get(
+            '/api/v1/compute/25544/?time=20170301000000&latitude=45&longitude=5&elevation=300'
+        )
+        json_data = json.loads(response.content.decode('utf8'))
+
+        self.assertEqual(
+            sorted(json_data['topocentric'].keys()),
+            ['azimuth', 'elevation', 'range', 'range_rate']
+        )
+
+        response = self.client.get('/api/v1/compute/25544/?time=20170301000000')
+        self.assertNotIn('topocentric', json.loads(response.content.decode('utf8')))
+
+    def test_computeViewReturns400IfObserverIsIncorrect(self):
+        for query in ['&latitude=45', '&latitude=45&longitude=500']:
+            response = self.client.get(
+                '/api/v1/compute/25544/?time=20170301000000{}'.format(query)
+            )
+            self.assertEquals(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_observationsReturnsEveryCombination(self):
+        response = self.client.get(
+            '{}?{}&start=20170301000000&end=20170301000500&step=60'.format(
+                self.url,
+                self.stations
+            )
+        )
+        json_data = streamed_json(response)
+
+        self.assertEqual(len(json_data['stations']), 2)
+        self.assertEqual(len(json_data['times']), 6)
+        self.assertEqual(json_data['count'], 2 * 2 * 6)
+        self.assertEqual(len(json_data['results']), 2 * 2 * 6)
+        self.assertEqual(json_data['failed'], [])
+
+        row = dict(zip(json_data['fields'], json_data['results'][0]))
+        self.assertEqual(row['station'], 0)
+        self.assertEqual(row['norad_catalog_number'], '25544')
+        self.assertEqual(row['time'], 0)
+
+    def test_observationsMatchComputeView(self):
+        response = self.client.get(
+            '{}?{}&time=20170301000000&norad_catalog_number__in=25544'.format(
+                self.url,
+                self.stations
+            )
+        )
+        json_data = streamed_json(response)
+        row = dict(zip(json_data['fields'], json_data['results'][0]))
+
+        response = self.client.get(
+            '/api/v1/compute/25544/?time=20170301000000&latitude=45&longitude=5&elevation=300'
+        )
+        expected = json.loads(response.content.decode('utf8'))['topocentric']
+
+        for key in ['azimuth', 'elevation', 'range', 'range_rate']:
+            self.assertAlmostEqual(row[key], expected[key])
+
+    def test_observationsFiltersByMinimumElevation(self):
+        response = self.client.get(
+            '{}?{}&start=20170301000000&end=20170301060000&step=60&min_elevation=10'.format(
+                self.url,
+                self.stations
+            )
+        )
+        json_data = streamed_json(response)
+        index = json_data['fields'].index('elevation')
+
+        self.assertGreater(json_data['count'], 0)
+        self.assertLess(json_data['count'], 2 * 2 * 361)
+        for row in json_data['results']:
+            self.assertGreaterEqual(row[index], 10)
+
+    def test_observationsReturns400IfParametersAreIncorrect(self):
+        queries = [
+            '?time=20170301000000',
+            '?station=45&time=20170301000000',
+            '?station=95,5&time=20170301000000',
+            '?{}&time=notatime'.format(self.stations),
+            '?{}&start=20170301000000&end=20170228000000'.format(self.stations),
+            '?{}&start=20170301000000&end=20170310000000&step=1'.format(self.stations),
+        ]
+
+        for query in queries:
+            response = self.client.get('{}{}'.format(self.url, query))
+            self.assertEquals(
+                response.status_code,
+                status.HTTP_400_BAD_REQUEST,
+                query
+            )
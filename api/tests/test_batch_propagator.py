@@ -0,0 +1,192 @@
+from unittest import mock
+
+from django.test import TestCase
+
+import ephem
+import numpy as np
+
+from catalog.models import TLE
+from api.tools import BatchPropagator, SatelliteComputation
+from api.tools import sgp4
+
+# Verification element set published with the reference implementation
+VERIFICATION_LINES = (
+    '1 00005U 58002B   00179.78495062  .00000023  00000-0  28098-4 0  4753',
+    '2 00005  34.2682 348.7242 1859667 331.7664  19.3264 10.82419157413667',
+)
+
+GEO_LINES = (
+    '1 29155U 06018A   17236.28392374 -.00000277  00000-0  00000+0 0  9990',
+    '2 29155   0.0320 231.9245 0003315 245.6473 242.4487  1.00264274 41246',
+)
+
+class BatchPropagatorTestCase(TestCase):
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def setUp(self):
+        self.date = ephem.Date('2017/3/1 10:00:00')
+
+    def test_sgp4MatchesReferenceVectors(self):
+        """
+            Check the kernel against the published verification vectors
+        """
+        elements = sgp4.parse_elements([VERIFICATION_LINES])
+        coefficients = sgp4.sgp4_init(elements)
+
+        expected = {
+            0: ([7022.46529266, -1400.08296755, 0.03995155],
+                [1.893841015, 6.405893759, 4.534807250]),
+            360: ([-7154.03120202, -3783.17682504, -3536.19412294],
+                  [4.741887409, -4.151817765, -2.093935425]),
+        }
+
+        for minutes, (position, velocity) in expected.items():
+            r, v, error = sgp4.sgp4(
+                coefficients,
+                elements['epoch'] + minutes / 1440.0
+            )
+
+            self.assertEqual(error[0, 0], sgp4.ERROR_NONE)
+            np.testing.assert_allclose(r[0, 0], position, atol=1e-6)
+            np.testing.assert_allclose(v[0, 0], velocity, atol=1e-9)
+
+    def test_propagateOutputsArraysOfTheExpectedShape(self):
+        propagator = BatchPropagator.from_tles(TLE.objects.all())
+        dates = self.date + np.arange(5) / 1440.0
+
+        data = propagator.propagate(dates)
+
+        for key in ['longitude', 'latitude', 'elevation', 'velocity']:
+            self.assertEqual(data[key].shape, (4, 5), key)
+
+        self.assertEqual(data['position'].shape, (4, 5, 3))
+        self.assertEqual(data['velocity_vector'].shape, (4, 5, 3))
+        self.assertEqual(data['error'].shape, (4,))
+
+    def test_propagateWithoutDatesGivesEmptyArrays(self):
+        propagator = BatchPropagator.from_tles(TLE.objects.all())
+
+        data = propagator.propagate([])
+
+        self.assertEqual(data['longitude'].shape, (4, 0))
+        self.assertEqual(data['position'].shape, (4, 0, 3))
+        self.assertEqual(data['error'].tolist(), [0, 0, 0, 0])
+
+    def test_propagateAgreesWithPyEphem(self):
+        """
+            Check the vectorized kernel against pyephem on the fixtures
+        """
+        tles = list(TLE.objects.all())
+        data = BatchPropagator.from_tles(tles).propagate([self.date])
+
+        for i, tle in enumerate(tles):
+            body = ephem.readtle(tle.first_line, tle.second_line, tle.third_line)
+            body.compute(self.date)
+
+            self.assertEqual(data['error'][i], sgp4.ERROR_NONE)
+            self.assertAlmostEqual(
+                data['longitude'][i, 0],
+                np.degrees(body.sublong),
+                delta=0.01
+            )
+            self.assertAlmostEqual(
+                data['latitude'][i, 0],
+                np.degrees(body.sublat),
+                delta=0.01
+            )
+            self.assertAlmostEqual(
+                data['elevation'][i, 0],
+                body.elevation,
+                delta=1000
+            )
+
+    def test_velocityVectorHasOrbitalMagnitude(self):
+        propagator = BatchPropagator.from_tles(TLE.objects.all())
+        data = propagator.propagate([self.date])
+
+        speed = np.linalg.norm(data['velocity_vector'][:, 0], axis=-1)
+        np.testing.assert_allclose(speed, data['velocity'][:, 0], rtol=0.01)
+
+    def test_deepSpaceElementsUsePyEphem(self):
+        propagator = BatchPropagator.from_lines([GEO_LINES])
+        date = ephem.Date('2017/8/25 20:00:00')
+
+        body = ephem.readtle('GOES 13', *GEO_LINES)
+        body.compute(date)
+
+        data = propagator.propagate([date])
+
+        self.assertTrue(propagator.deep_space[0])
+        self.assertEqual(data['error'][0], sgp4.ERROR_NONE)
+        self.assertEqual(data['elevation'][0, 0], body.elevation)
+        self.assertAlmostEqual(
+            np.linalg.norm(data['velocity_vector'][0, 0]),
+            3075,
+            delta=5
+        )
+
+    def test_invalidElementSetsAreFlagged(self):
+        propagator = BatchPropagator.from_lines([
+            ('not a', 'tle'),
+            VERIFICATION_LINES,
+        ])
+
+        data = propagator.propagate([ephem.Date('2000/6/27 18:50:00')])
+
+        self.assertEqual(data['error'][0], sgp4.ERROR_INVALID)
+        self.assertTrue(np.isnan(data['longitude'][0, 0]))
+        self.assertEqual(data['error'][1], sgp4.ERROR_NONE)
+        self.assertFalse(np.isnan(data['longitude'][1, 0]))
+
+    def test_datesTooFarFromEpochAreFlagged(self):
+        propagator = BatchPropagator.from_tles(TLE.objects.all())
+
+        for engine in [BatchPropagator.SGP4, BatchPropagator.EPHEM]:
+            data = propagator.propagate(
+                [ephem.Date('2020/8/25 20:00:00')],
+                engine=engine
+            )
+
+            for error in data['error']:
+                self.assertEqual(error, sgp4.ERROR_EPOCH_RANGE)
+
+    def test_computeIsTheEphemEngineOfThePropagator(self):
+        tle = TLE.objects.first()
+        sc = SatelliteComputation(tle=tle)
+        sc.observer.date = self.date
+
+        data = BatchPropagator.from_tles([tle]).propagate(
+            [self.date],
+            engine=BatchPropagator.EPHEM
+        )
+
+        expected = dict(
+            (key, data[key][0, 0])
+            for key in ['longitude', 'latitude', 'elevation', 'velocity']
+        )
+
+        # Through the scalar path, without propagating arrays
+        with mock.patch.object(BatchPropagator, 'propagate') as propagate:
+            self.assertEqual(sc.compute(), expected)
+
+        self.assertFalse(propagate.called)
+
+    def test_subpointMatchesThePropagation(self):
+        propagator = BatchPropagator.from_lines([
+            ('not a', 'tle'),
+            GEO_LINES,
+        ])
+        date = ephem.Date('2017/8/25 20:00:00')
+
+        data = propagator.propagate([date], engine=BatchPropagator.EPHEM)
+        longitude, latitude, elevation, error = propagator.subpoint(1, date)
+
+        self.assertEqual(propagator.subpoint(0, date)[3], sgp4.ERROR_INVALID)
+        self.assertEqual(error, sgp4.ERROR_NONE)
+        self.assertEqual(np.degrees(longitude), data['longitude'][1, 0])
+        self.assertEqual(np.degrees(latitude), data['latitude'][1, 0])
+        self.assertEqual(elevation, data['elevation'][1, 0])
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+
+import pytz
+from django.test import TestCase
+from django.utils.http import http_date
+
+from catalog.models import CatalogEntry, Generation
+from api.tools import data_generation
+
+class ConditionalTestCase(TestCase):
+    """
+        Test the ETag and Last-Modified validators of the viewsets
+    """
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def setUp(self):
+        Generation.objects.bump(Generation.DATA)
+        data_generation.clear()
+
+    def import_data(self):
+        Generation.objects.bump(Generation.DATA)
+        data_generation.clear()
+
+    def test_responsesHaveValidators(self):
+        response = self.client.get('/api/v1/tle/')
+
+        self.assertEqual(response['ETag'], '"%d-json"' % data_generation.state()[0])
+        self.assertIn('Last-Modified', response)
+
+    def test_etagDependsOnTheFormat(self):
+        self.assertNotEqual(
+            self.client.get('/api/v1/source/')['ETag'],
+            self.client.get('/api/v1/source/?format=api')['ETag']
+        )
+
+    def test_matchingEtagGives304WithoutQueries(self):
+        etag = self.client.get('/api/v1/catalogentry/?ordering=names')['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                '/api/v1/catalogentry/?ordering=names',
+                HTTP_IF_NONE_MATCH=etag
+            )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_importChangesTheEtag(self):
+        etag = self.client.get('/api/v1/tle/4/')['ETag']
+        self.import_data()
+
+        response = self.client.get('/api/v1/tle/4/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_detailLastModifiedIsTheObjectDate(self):
+        entry = CatalogEntry.objects.get(pk='25544')
+        entry.updated = datetime(2017, 3, 1, 12, 0, tzinfo=pytz.UTC)
+        entry.save()
+
+        # Without nested objects
+        url = '/api/v1/catalogentry/25544/?expand='
+        response = self.client.get(url)
+
+        self.assertEqual(
+            response['Last-Modified'],
+            http_date(entry.updated.timestamp())
+        )
+        self.assertEqual(
+            self.client.get(
+                url,
+                HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            ).status_code,
+            304
+        )
+
+        # Updated by an import of the catalog
+        entry.updated += timedelta(days=1)
+        entry.save()
+
+        self.assertEqual(
+            self.client.get(
+                url,
+                HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            ).status_code,
+            200
+        )
+
+    def test_detailWithNestedObjectsLastModifiedIsTheLastImport(self):
+        response = self.client.get('/api/v1/tle/4/')
+
+        self.assertEqual(
+            response['Last-Modified'],
+            http_date(data_generation.state()[1].timestamp())
+        )
+
+        # The nested entry is renamed by a later import
+        CatalogEntry.objects.filter(pk='25544').update(names='ISS')
+        self.import_data()
+        Generation.objects.filter(name=Generation.DATA).update(
+            updated=data_generation.state()[1] + timedelta(days=1)
+        )
+        data_generation.clear()
+
+        response = self.client.get(
+            '/api/v1/tle/4/',
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['satellite_number']['names'], 'ISS')
+
+    def test_listLastModifiedIsTheLastImport(self):
+        last_modified = self.client.get('/api/v1/tle/')['Last-Modified']
+
+        self.assertEqual(
+            self.client.get(
+                '/api/v1/tle/',
+                HTTP_IF_MODIFIED_SINCE=last_modified
+            ).status_code,
+            304
+        )
+
+    def test_errorsHaveNoValidators(self):
+        response = self.client.get('/api/v1/tle/999/')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response)
@@ -0,0 +1,265 @@
+import json
+
+from django.core.management import call_command, get_commands
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils.six import StringIO
+
+import ephem
+import numpy as np
+
+from catalog.models import CatalogEntry, TLE
+from api.tools import BatchPropagator, ConjunctionScreener
+
+def crossing_lines(satellite_number, inclination):
+    """
+        Lines of an element set on the orbit of the ISS fixture TLE but at
+        its ascending node at epoch, with the given inclination. Two such
+        element sets cross each other near their epoch.
+    """
+    line1, line2 = TLE.objects.get(id=4).second_line, TLE.objects.get(id=4).third_line
+
+    return (
+        line1[:2] + satellite_number + line1[7:],
+        '{0}{1}{2:8.4f}{3}{4:8.4f}{5}'.format(
+            line2[:2],
+            satellite_number + line2[7:8],
+            inclination,
+            line2[16:43],
+            360 - float(line2[34:42]),
+            line2[51:]
+        ),
+    )
+
+class ConjunctionScreenerTestCase(TestCase):
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def setUp(self):
+        tiangong = TLE.objects.get(id=3)
+
+        self.lines = [
+            (tiangong.second_line, tiangong.third_line),
+            crossing_lines('90001', 51.6426),
+            crossing_lines('90002', 53.0),
+        ]
+        self.propagator = BatchPropagator.from_lines(self.lines)
+        self.start = ephem.Date('2017/2/28 19:00:00')
+        self.end = ephem.Date('2017/2/28 21:00:00')
+
+    def closest_approach(self, first, second):
+        """
+            Brute force closest approach of two satellites, sampled every
+            second
+        """
+        dates = np.arange(self.start, self.end, 1 / 86400.0)
+        position = self.propagator.propagate(dates, vectors=False)['position']
+
+        distance = np.linalg.norm(position[first] - position[second], axis=1)
+        closest = np.argmin(distance)
+
+        return dates[closest], distance[closest]
+
+    def test_screeningFindsCrossingSatellites(self):
+        conjunctions = ConjunctionScreener(
+            self.propagator,
+            1000
+        ).screen(self.start, self.end)
+
+        self.assertEqual(len(conjunctions), 1)
+        self.assertEqual(conjunctions[0]['first'], 1)
+        self.assertEqual(conjunctions[0]['second'], 2)
+
+        date, distance = self.closest_approach(1, 2)
+        delta = conjunctions[0]['tca'] - ephem.Date(date).datetime()
+
+        self.assertLess(abs(delta.total_seconds()), 1)
+        self.assertLessEqual(conjunctions[0]['miss_distance'], distance)
+        self.assertAlmostEqual(conjunctions[0]['miss_distance'], distance, delta=200)
+        self.assertAlmostEqual(conjunctions[0]['relative_velocity'], 182, delta=5)
+
+    def test_screeningHonorsTheThreshold(self):
+        screener = ConjunctionScreener(self.propagator, 100)
+        self.assertEqual(screener.screen(self.start, self.end), [])
+
+        screener = ConjunctionScreener(self.propagator, 10000)
+        conjunctions = screener.screen(self.start, self.end)
+
+        # The satellites cross each other every half orbit
+        self.assertEqual(len(conjunctions), 3)
+        for conjunction in conjunctions:
+            self.assertLessEqual(conjunction['miss_distance'], 10000)
+
+    def test_windowsDoNotChangeTheResult(self):
+        screener = ConjunctionScreener(self.propagator)
+        expected = screener.screen(self.start, self.end)
+
+        screener.window_steps = 7
+        conjunctions = screener.screen(self.start, self.end)
+
+        self.assertGreater(len(screener.windows(self.start, self.end)), 100)
+        self.assertEqual(len(conjunctions), len(expected))
+        for conjunction, expected_conjunction in zip(conjunctions, expected):
+            self.assertEqual(conjunction['first'], expected_conjunction['first'])
+            self.assertEqual(conjunction['second'], expected_conjunction['second'])
+
+            delta = conjunction['tca'] - expected_conjunction['tca']
+            self.assertLess(abs(delta.total_seconds()), 0.001)
+
+    def test_primaryScreeningMatchesCatalogScreening(self):
+        screener = ConjunctionScreener(self.propagator)
+        expected = screener.screen(self.start, self.end)
+
+        self.assertEqual(screener.screen(self.start, self.end, primary=2), expected)
+        self.assertEqual(screener.screen(self.start, self.end, primary=0), [])
+
+    def test_gridFindsEveryCloseSample(self):
+        """
+            Compare the grid pairs with a brute force search
+        """
+        screener = ConjunctionScreener(self.propagator)
+        screener.threshold = 3000000
+
+        dates = self.start + np.arange(10) * 0.01
+        position = self.propagator.propagate(dates, vectors=False)['position']
+
+        pairs = screener._grid_pairs(position)
+
+        expected = set()
+        for first in range(3):
+            for second in range(first + 1, 3):
+                distance = np.linalg.norm(position[first] - position[second], axis=1)
+                for sample in np.flatnonzero(distance < screener.screening_distance):
+                    expected.add((first, second, sample))
+
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(set(map(tuple, pairs.tolist())), expected)
+
+class ScreenConjunctionsTestCase(TestCase):
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def setUp(self):
+        tle = TLE.objects.get(id=4)
+        tle.added = TLE.objects.get(id=2).added
+
+        for number, inclination in [('90001', 51.6426), ('90002', 53.0)]:
+            CatalogEntry.objects.create(
+                norad_catalog_number=number,
+                international_designator='TEST' + number
+            )
+
+            line1, line2 = crossing_lines(number, inclination)
+            tle.pk = None
+            tle.satellite_number_id = number
+            tle.second_line = line1
+            tle.third_line = line2
+            tle.save()
+
+    def test_screenconjunctionsCommandExists(self):
+        self.assertIn('screenconjunctions', get_commands())
+
+    def test_screenconjunctionsPrintsConjunctions(self):
+        out = StringIO()
+        call_command(
+            'screenconjunctions',
+            start='20170228190000',
+            hours=2,
+            stdout=out
+        )
+        lines = out.getvalue().splitlines()
+
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[1].startswith('2017-02-28T19:56:'))
+        self.assertEqual(lines[1].split()[1:3], ['90001', '90002'])
+        self.assertIn('Found 3 conjunctions', lines[-1])
+
+    def test_screenconjunctionsUsesWorkerProcesses(self):
+        out = StringIO()
+        call_command(
+            'screenconjunctions',
+            start='20170228190000',
+            hours=2,
+            processes=2,
+            stdout=out
+        )
+        expected = StringIO()
+        call_command(
+            'screenconjunctions',
+            start='20170228190000',
+            hours=2,
+            stdout=expected
+        )
+
+        self.assertEqual(out.getvalue(), expected.getvalue())
+
+    def test_screenconjunctionsAcceptsAPrimarySatellite(self):
+        out = StringIO()
+        call_command(
+            'screenconjunctions',
+            start='20170228190000',
+            hours=2,
+            satellite='25544',
+            stdout=out
+        )
+
+        self.assertIn('Found 0 conjunctions', out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command(
+                'screenconjunctions',
+                satellite='99999',
+                stdout=StringIO()
+            )
+
+    def test_screenconjunctionsRejectsIncorrectParameters(self):
+        options_list = [
+            {'start': 'notadate'},
+            {'hours': 0},
+            {'threshold': -1},
+            {'threshold': float('nan')},
+        ]
+
+        for options in options_list:
+            with self.assertRaises(CommandError):
+                call_command('screenconjunctions', stdout=StringIO(), **options)
+
+    def test_conjunctionsViewReturnsConjunctions(self):
+        response = self.client.get(
+            '/api/v1/compute/conjunctions/?start=20170228190000&end=20170228210000'
+        )
+        json_data = json.loads(
+            b''.join(response.streaming_content).decode('utf8')
+        )
+
+        self.assertEqual(json_data['count'], 3)
+        self.assertEqual(json_data['threshold'], 10)
+        self.assertEqual(
+            [(row['first'], row['second']) for row in json_data['results']],
+            [('90001', '90002')] * 3
+        )
+        self.assertTrue(json_data['results'][1]['tca'].startswith('2017-02-28T19:56:'))
+
+    def test_conjunctionsViewReturns400IfParametersAreIncorrect(self):
+        queries = [
+            '?start=notadate',
+            '?start=20170228190000&end=20170228180000',
+            '?start=20170228190000&threshold=abc',
+            '?start=20170228190000&threshold=0',
+            '?start=20170228190000&threshold=nan',
+            '?start=20170228190000&threshold=inf',
+            '?start=20170228190000&threshold=1e9',
+            '?start=20170228190000&threshold=101',
+            '?start=20170228190000&satellite=99999',
+            '?start=20170228190000&end=20190228190000',
+        ]
+
+        for query in queries:
+            response = self.client.get('/api/v1/compute/conjunctions/' + query)
+            self.assertEqual(response.status_code, 400, query)
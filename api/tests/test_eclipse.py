@@ -0,0 +1,173 @@
+import json
+import math
+from datetime import datetime
+from unittest import mock
+
+from django.test import TestCase
+
+import ephem
+import numpy as np
+
+from catalog.models import TLE
+from api.tools import BatchPropagator, SolarEphemeris, frames
+from api.tools.eclipse import (
+    PENUMBRA, SUNLIT, UMBRA, eclipse, shadow, sun_position
+)
+
+class EclipseTestCase(TestCase):
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def test_sunPositionMatchesPyephem(self):
+        """
+            Test if the sun position is close to the pyephem one
+        """
+        for date in ['2017/3/1', '2017/6/21 6:00', '2017/12/25 18:00']:
+            sun = ephem.Sun()
+            sun.compute(date, epoch=date)
+
+            position = sun_position(float(ephem.Date(date)) + frames.EPHEM_JD_OFFSET)
+            distance = np.sqrt(np.dot(position, position))
+
+            self.assertAlmostEqual(
+                math.degrees(sun.g_ra),
+                math.degrees(math.atan2(position[1], position[0])) % 360,
+                places=1
+            )
+            self.assertAlmostEqual(
+                math.degrees(sun.g_dec),
+                math.degrees(math.asin(position[2] / distance)),
+                places=1
+            )
+            self.assertAlmostEqual(
+                1.0,
+                distance / ephem.meters_per_au / sun.earth_distance,
+                places=3
+            )
+
+    def test_shadowStates(self):
+        """
+            Test the states of satellites around the shadow cone
+        """
+        sun = np.array([1.5e11, 0.0, 0.0])
+        radius = 7000000.0
+        edge = math.asin(frames.WGS84_A / radius)
+
+        positions = np.array([
+            [radius, 0.0, 0.0],
+            [-radius, 0.0, 0.0],
+            [0.0, radius, 0.0],
+            [-radius * math.cos(edge), radius * math.sin(edge), 0.0],
+        ])
+        state, sunlight = shadow(positions, sun)
+
+        self.assertEqual([SUNLIT, UMBRA, SUNLIT, PENUMBRA], state.tolist())
+        self.assertEqual(1.0, sunlight[0])
+        self.assertEqual(0.0, sunlight[1])
+        self.assertTrue(0.0 < sunlight[3] < 1.0)
+
+    def test_eclipseMatchesPyephem(self):
+        """
+            Test if the umbra matches the pyephem eclipsed flag
+        """
+        tle = TLE.objects.get(id=4)
+        body = ephem.readtle(tle.first_line, tle.second_line, tle.third_line)
+
+        dates = ephem.Date(datetime(2017, 3, 1)) + np.arange(0, 1, 10 / 86400.0)
+        state, sunlight, error = eclipse(BatchPropagator.from_tles([tle]), dates)
+
+        self.assertEqual(0, error[0])
+        self.assertTrue(((state[0] == UMBRA) == (sunlight[0] == 0)).all())
+
+        eclipsed = []
+        for date in dates:
+            body.compute(date)
+            eclipsed.append(body.eclipsed)
+
+        agreement = np.mean((state[0] != SUNLIT) == np.array(eclipsed))
+        self.assertGreater(agreement, 0.99)
+
+    def test_eclipseOfFailedSamples(self):
+        """
+            Test if samples which can't be computed have no state
+        """
+        tle = TLE.objects.get(id=4)
+        state, sunlight, error = eclipse(
+            BatchPropagator.from_tles([tle]),
+            [ephem.Date(datetime(2020, 1, 1))]
+        )
+
+        self.assertNotEqual(0, error[0])
+        self.assertEqual(-1, state[0, 0])
+        self.assertTrue(np.isnan(sunlight[0, 0]))
+
+    def test_solarEphemerisCachesBins(self):
+        """
+            Test if the sun positions are cached per time bin
+        """
+        cache = SolarEphemeris(max_size=3)
+        start = float(ephem.Date(datetime(2017, 3, 1)))
+
+        positions = cache.get(start + np.arange(120) / 86400.0)
+
+        self.assertEqual((120, 3), positions.shape)
+        self.assertEqual(3, len(cache))
+        np.testing.assert_array_equal(positions[0], positions[29])
+
+        cache.get(start + np.arange(10) / 1440.0)
+        self.assertEqual(3, len(cache))
+
+    def test_solarEphemerisSurvivesConcurrentEvictions(self):
+        """
+            Test if positions evicted by another thread while the missing
+            ones are computed are still returned
+        """
+        cache = SolarEphemeris()
+        start = float(ephem.Date(datetime(2017, 3, 1)))
+        expected = cache.get(start + np.arange(2) / 1440.0)
+
+        def evicting_sun_position(dates):
+            cache._positions.clear()
+            return sun_position(dates)
+
+        with mock.patch('api.tools.eclipse.sun_position', evicting_sun_position):
+            positions = cache.get(start + np.arange(3) / 1440.0)
+
+        np.testing.assert_array_equal(positions[:2], expected)
+
+    def test_computeViewEclipse(self):
+        """
+            Test if the compute view returns the eclipse state on demand
+        """
+        url = '/api/v1/compute/25544/?time=20170301000000'
+
+        data = json.loads(self.client.get(url).content.decode('utf8'))
+        self.assertNotIn('eclipse', data)
+
+        data = json.loads(
+            self.client.get(url + '&eclipse=true').content.decode('utf8')
+        )
+        self.assertIn(data['eclipse']['state'], ['sunlit', 'penumbra', 'umbra'])
+        self.assertTrue(0 <= data['eclipse']['sunlight'] <= 1)
+
+    def test_snapshotSunlitFilter(self):
+        """
+            Test if the sunlit filter splits the snapshot
+        """
+        url = '/api/v1/compute/snapshot/?time=20170301000000'
+
+        def numbers(response):
+            content = b''.join(response.streaming_content).decode('utf8')
+            return sorted(row[0] for row in json.loads(content)['results'])
+
+        everything = numbers(self.client.get(url))
+        sunlit = numbers(self.client.get(url + '&sunlit=true'))
+        shadowed = numbers(self.client.get(url + '&sunlit=false'))
+
+        self.assertEqual(everything, sorted(sunlit + shadowed))
+
+        response = self.client.get(url + '&sunlit=maybe')
+        self.assertEqual(400, response.status_code)
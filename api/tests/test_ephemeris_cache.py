@@ -0,0 +1,120 @@
+import threading
+
+from django.test import TestCase
+
+import ephem
+
+from catalog.models import TLE
+from api.tools import EphemerisCache, SatelliteComputation, ephemeris_cache
+
+class EphemerisCacheTestCase(TestCase):
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def setUp(self):
+        self.cache = EphemerisCache(max_size=2)
+        self.date = ephem.Date('2017/3/1 10:00:00')
+
+    def test_getCountsHitsAndMisses(self):
+        tle = TLE.objects.get(id=1)
+
+        self.cache.get(tle)
+        self.cache.get(tle)
+        self.cache.get(tle)
+
+        stats = self.cache.stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['size'], 1)
+
+    def test_getReturnsIndependentPropagators(self):
+        tle = TLE.objects.get(id=4)
+
+        first = self.cache.get(tle)
+        second = self.cache.get(tle)
+
+        self.assertIsNot(first, second)
+        self.assertIsNot(first._body(0), second._body(0))
+        self.assertEqual(
+            first.propagate([self.date])['longitude'][0, 0],
+            second.propagate([self.date])['longitude'][0, 0]
+        )
+
+    def test_leastRecentlyUsedEntryIsEvicted(self):
+        self.cache.get(TLE.objects.get(id=1))
+        self.cache.get(TLE.objects.get(id=2))
+        self.cache.get(TLE.objects.get(id=1))
+        self.cache.get(TLE.objects.get(id=3))
+
+        self.assertIn(1, self.cache)
+        self.assertNotIn(2, self.cache)
+        self.assertIn(3, self.cache)
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_unsavedTlesAreNotCached(self):
+        tle = TLE.objects.get(id=1)
+        tle.id = None
+
+        self.cache.get(tle)
+
+        self.assertEqual(len(self.cache), 0)
+
+    def test_invalidateBySatellite(self):
+        self.cache.get(TLE.objects.get(id=2))
+        self.cache.get(TLE.objects.get(id=3))
+
+        self.cache.invalidate(satellite_number='25544')
+
+        self.assertNotIn(2, self.cache)
+        self.assertIn(3, self.cache)
+
+    def test_savingANewTleInvalidatesItsSatellite(self):
+        tle = TLE.objects.get(id=4)
+        ephemeris_cache.get(tle)
+        ephemeris_cache.get(TLE.objects.get(id=3))
+
+        tle.id = None
+        tle.save()
+
+        self.assertNotIn(4, ephemeris_cache)
+        self.assertIn(3, ephemeris_cache)
+
+    def test_satelliteComputationUsesTheCache(self):
+        tle = TLE.objects.get(id=4)
+        ephemeris_cache.invalidate()
+        hits = ephemeris_cache.stats()['hits']
+
+        SatelliteComputation(tle=tle)
+        SatelliteComputation(tle=tle)
+
+        self.assertEqual(ephemeris_cache.stats()['hits'], hits + 1)
+
+    def test_cacheCanBeUsedFromSeveralThreads(self):
+        tles = list(TLE.objects.all())
+        cache = EphemerisCache(max_size=3)
+        expected = dict(
+            (tle.id, cache.parse(tle).propagate([self.date])['longitude'][0, 0])
+            for tle in tles
+        )
+        errors = []
+
+        def work():
+            for i in range(200):
+                tle = tles[i % len(tles)]
+                longitude = cache.get(tle).propagate([self.date])['longitude'][0, 0]
+                if longitude != expected[tle.id]:
+                    errors.append(tle.id)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        stats = cache.stats()
+        self.assertEqual(stats['hits'] + stats['misses'], 800)
+        self.assertLessEqual(stats['size'], 3)
@@ -0,0 +1,186 @@
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from unittest import mock
+
+from django.core.management import call_command, get_commands
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.utils.six import StringIO
+
+import ephem
+import numpy as np
+
+from catalog.models import TLE
+from api.tools import BatchPropagator, EphemerisTiles, SatelliteComputation
+from api.tools.ephemeris_tiles import EphemerisTilesLoader, write_tiles
+
+class EphemerisTilesTestCase(TestCase):
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'tiles.bin')
+
+        self.tles = [TLE.objects.get(id=4), TLE.objects.get(id=3)]
+        self.propagator = BatchPropagator.from_lines(
+            [(tle.second_line, tle.third_line) for tle in self.tles]
+        )
+        self.start = datetime(2017, 3, 1)
+        self.end = datetime(2017, 3, 1, 6)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, accuracy=10.0):
+        return write_tiles(
+            self.path,
+            [(tle.satellite_number_id, tle.id) for tle in self.tles],
+            self.propagator,
+            self.start,
+            self.end,
+            accuracy
+        )
+
+    def test_tilesMatchPropagation(self):
+        """
+            Test if the interpolated positions are within the accuracy bound
+        """
+        self.assertEqual(2, self.write())
+
+        tiles = EphemerisTiles(self.path)
+        self.assertEqual(2, len(tiles))
+        self.assertIn(4, tiles)
+
+        dates = np.linspace(
+            float(ephem.Date(self.start)),
+            float(ephem.Date(self.end)),
+            1000
+        )
+        expected = self.propagator.propagate(dates, vectors=False)['position']
+
+        for row, tle in enumerate(self.tles):
+            position = tiles.position(tle.id, dates)
+            error = np.sqrt(((position - expected[row]) ** 2).sum(axis=1))
+
+            self.assertLess(error.max(), 10.0)
+
+    def test_tilesComputeMatchesSatelliteComputation(self):
+        """
+            Test if the tiles compute the same data as pyephem
+        """
+        self.write()
+        tiles = EphemerisTiles(self.path)
+
+        sc = SatelliteComputation(tle=self.tles[0])
+        sc.observer.date = datetime(2017, 3, 1, 2, 30)
+        expected = sc.compute()
+
+        data = tiles.compute(4, datetime(2017, 3, 1, 2, 30))
+
+        self.assertEqual(set(expected.keys()), set(data.keys()))
+        self.assertAlmostEqual(expected['longitude'], data['longitude'], places=2)
+        self.assertAlmostEqual(expected['latitude'], data['latitude'], places=2)
+        self.assertLess(abs(expected['elevation'] - data['elevation']), 1000)
+
+    def test_tilesReturnNoneOutsideOfThem(self):
+        """
+            Test if dates and TLEs not covered by the tiles return None
+        """
+        self.write()
+        tiles = EphemerisTiles(self.path)
+
+        self.assertIsNone(tiles.compute(4, datetime(2017, 2, 28, 23)))
+        self.assertIsNone(tiles.compute(4, datetime(2017, 3, 1, 7)))
+        self.assertIsNone(tiles.compute(1, datetime(2017, 3, 1, 2)))
+        self.assertIsNotNone(tiles.compute(4, self.end))
+
+    def test_tilesRejectOtherFiles(self):
+        """
+            Test if a file which isn't a tiles file is rejected
+        """
+        with open(self.path, 'wb') as output:
+            output.write(b'\0' * 256)
+
+        with self.assertRaises(ValueError):
+            EphemerisTiles(self.path)
+
+    def test_loaderReloadsReplacedFile(self):
+        """
+            Test if the loader reloads the tiles when the file is replaced
+        """
+        loader = EphemerisTilesLoader()
+        loader.check_interval = 0
+
+        with override_settings(EPHEMERIS_TILES_PATH=None):
+            self.assertIsNone(loader.get())
+
+        with override_settings(EPHEMERIS_TILES_PATH=self.path):
+            self.assertIsNone(loader.get())
+
+            self.write()
+            self.assertEqual(2, len(loader.get()))
+
+            self.tles = self.tles[:1]
+            self.propagator = self.propagator.subset([0])
+            self.write()
+            self.assertEqual(1, len(loader.get()))
+
+    def test_computeViewUsesTiles(self):
+        """
+            Test if the compute view answers from the tiles
+        """
+        url = '/api/v1/compute/25544/?time=20170301023000'
+        expected = self.client.get(url).json()
+
+        self.write()
+        with override_settings(EPHEMERIS_TILES_PATH=self.path), \
+                mock.patch('api.views.compute.SatelliteComputation') as computation:
+            data = self.client.get(url).json()
+
+        # Without setting up a computation
+        self.assertFalse(computation.called)
+
+        self.assertEqual(4, data['tle'])
+        self.assertAlmostEqual(expected['longitude'], data['longitude'], places=2)
+        self.assertAlmostEqual(expected['latitude'], data['latitude'], places=2)
+
+        tiles = EphemerisTiles(self.path)
+        self.assertEqual(
+            tiles.compute(4, datetime(2017, 3, 1, 2, 30))['longitude'],
+            data['longitude']
+        )
+
+    def test_buildtilesCommand(self):
+        """
+            Test if the buildtiles command writes the tiles file
+        """
+        self.assertIn('buildtiles', get_commands())
+
+        out = StringIO()
+        call_command(
+            'buildtiles',
+            '25544',
+            path=self.path,
+            start='20170301000000',
+            hours=2,
+            stdout=out
+        )
+
+        self.assertIn('Successfully built the tiles of 1 satellites', out.getvalue())
+
+        tiles = EphemerisTiles(self.path)
+        self.assertIn(4, tiles)
+        self.assertIsNotNone(tiles.compute(4, datetime(2017, 3, 1, 1)))
+
+    def test_buildtilesCommandNeedsPath(self):
+        """
+            Test if the buildtiles command fails without tiles file
+        """
+        with self.assertRaises(CommandError):
+            call_command('buildtiles', path=None, stdout=StringIO())
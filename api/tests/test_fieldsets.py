@@ -0,0 +1,117 @@
+import json
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+class FieldsetTestCase(TestCase):
+    """
+        Test the fields and expand parameters of the viewsets
+    """
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def get(self, url, status=200):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status)
+
+        return json.loads(response.content.decode('utf8'))
+
+    def test_withoutParametersEverythingIsReturned(self):
+        tle = self.get('/api/v1/tle/4/')
+
+        self.assertEqual(len(tle), 25)
+        self.assertEqual(tle['satellite_number']['owner']['code'], 'ISS')
+
+    def test_fieldsRestrictTheKeys(self):
+        entries = self.get(
+            '/api/v1/catalogentry/?fields=norad_catalog_number,names'
+        )['results']
+
+        self.assertEqual(
+            entries[0],
+            {'norad_catalog_number': '25544', 'names': 'ISS (ZARYA)'}
+        )
+
+    def test_relationsAreKeysUnlessExpanded(self):
+        url = '/api/v1/tle/4/?fields=third_line,satellite_number'
+
+        self.assertEqual(self.get(url)['satellite_number'], '25544')
+        self.assertEqual(
+            self.get(url + '&expand=satellite_number')['satellite_number']['names'],
+            'ISS (ZARYA)'
+        )
+
+    def test_expandAloneKeepsEveryField(self):
+        tle = self.get('/api/v1/tle/4/?expand=satellite_number')
+
+        self.assertEqual(len(tle), 25)
+        self.assertEqual(tle['classification'], 'U')
+        self.assertEqual(tle['satellite_number']['owner'], 'ISS')
+
+    def test_nestedFieldsAreExpanded(self):
+        tle = self.get(
+            '/api/v1/tle/4/?fields=id,satellite_number.names,satellite_number.owner.code'
+        )
+
+        self.assertEqual(tle, {
+            'id': 4,
+            'satellite_number': {
+                'names': 'ISS (ZARYA)',
+                'owner': {'code': 'ISS'},
+            },
+        })
+
+    def test_unknownFieldsAreRejected(self):
+        for url in [
+                '/api/v1/tle/?fields=id,foo',
+                '/api/v1/tle/?fields=satellite_number.foo',
+                '/api/v1/tle/?expand=first_line',
+                '/api/v1/catalogentry/?expand=satellite_number']:
+            self.assertIn('detail', self.get(url, status=400))
+
+    def test_expandedRelationsOfLeftOutFieldsAreKnown(self):
+        tle = self.get('/api/v1/tle/4/?fields=id&expand=satellite_number.owner')
+
+        self.assertEqual(tle, {'id': 4})
+
+    def test_onlyTheReturnedColumnsAreRead(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.get('/api/v1/tle/?fields=first_line,second_line,third_line,satellite_number')
+
+        sql = queries.captured_queries[-1]['sql']
+        self.assertNotIn('JOIN', sql)
+        self.assertNotIn('mean_motion', sql)
+        self.assertIn('third_line', sql)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.get('/api/v1/tle/?fields=id,satellite_number.names')
+
+        sql = queries.captured_queries[-1]['sql']
+        self.assertEqual(sql.count('JOIN'), 1)
+        self.assertNotIn('inclination', sql)
+
+    def test_fastSerializationGivesTheSameFields(self):
+        for url in [
+                '/api/v1/tle/?fields=first_line,second_line,third_line,satellite_number',
+                '/api/v1/tle/?fields=id,satellite_number.names&pagination=cursor',
+                '/api/v1/catalogentry/?expand=owner&ordering=-names',
+                '/api/v1/tle/?fields=first_line&pagination=cursor&limit=2',
+                '/api/v1/catalogentry/?fields=names&pagination=cursor&limit=1']:
+            with override_settings(API_FAST_SERIALIZATION=False):
+                expected = self.client.get(url).content
+            with override_settings(API_FAST_SERIALIZATION=True):
+                self.assertEqual(self.client.get(url).content, expected)
+
+    @override_settings(API_FAST_SERIALIZATION=True)
+    def test_cursorKeysAreReadWithoutBeingReturned(self):
+        page = self.get('/api/v1/tle/?fields=first_line&pagination=cursor&limit=3')
+
+        self.assertEqual(page['results'][0], {'first_line': 'ISS (ZARYA)'})
+
+        rest = self.get(page['next'])
+        self.assertEqual(len(page['results'] + rest['results']), 4)
+        self.assertEqual(list(rest['results'][0]), ['first_line'])
@@ -0,0 +1,162 @@
+import json
+
+from django.test import TestCase
+
+import ephem
+import numpy as np
+
+from catalog.models import TLE
+from api.tools import BatchPropagator
+from api.tools import frames
+
+class FramesTestCase(TestCase):
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def setUp(self):
+        self.tles = [TLE.objects.get(id=4), TLE.objects.get(id=3)]
+        self.dates = ephem.Date('2017/3/1') + np.arange(0, 0.1, 0.01)
+        self.data = BatchPropagator.from_tles(self.tles).propagate(self.dates)
+        self.earth = frames.EarthRotation.from_dates(self.dates)
+
+    def test_earthRotationRoundTrip(self):
+        """
+            Test if converting to the earth fixed frame and back is lossless
+        """
+        position = self.data['position']
+        velocity = self.data['velocity_vector']
+
+        ecef = self.earth.to_ecef(position)
+        ecef_velocity = self.earth.velocity_to_ecef(velocity, ecef)
+
+        np.testing.assert_allclose(position, self.earth.to_teme(ecef), atol=1e-6)
+        np.testing.assert_allclose(
+            velocity,
+            self.earth.velocity_to_teme(ecef_velocity, ecef),
+            atol=1e-9
+        )
+
+        np.testing.assert_array_equal(
+            ecef,
+            frames.teme_to_ecef(position, frames.gmst(self.dates + frames.EPHEM_JD_OFFSET))
+        )
+
+    def test_ecefVelocityMatchesPositions(self):
+        """
+            Test if the earth fixed velocity is the derivative of the earth
+            fixed position
+        """
+        # Long enough for the rounding of the julian dates to be negligible
+        step = 2.0 / 86400.0
+        propagator = BatchPropagator.from_tles(self.tles)
+
+        before = propagator.propagate(self.dates - step)['position']
+        after = propagator.propagate(self.dates + step)['position']
+        derivative = (
+            frames.EarthRotation.from_dates(self.dates + step).to_ecef(after) -
+            frames.EarthRotation.from_dates(self.dates - step).to_ecef(before)
+        ) / (2.0 * step * 86400.0)
+
+        ecef = self.earth.to_ecef(self.data['position'])
+        velocity = self.earth.velocity_to_ecef(self.data['velocity_vector'], ecef)
+
+        np.testing.assert_allclose(velocity, derivative, atol=0.1)
+
+    def test_stateVectorsFrames(self):
+        """
+            Test if the state vectors are only computed in the requested
+            frames and the geodetic ones are consistent
+        """
+        states = frames.state_vectors(
+            self.data['position'],
+            self.data['velocity_vector'],
+            self.earth
+        )
+        self.assertEqual(set(frames.STATE_FRAMES), set(states.keys()))
+
+        longitude, latitude, height, velocity = states['geodetic']
+        np.testing.assert_allclose(
+            states['ecef'][0],
+            frames.geodetic_to_ecef(longitude, latitude, height),
+            atol=1e-3
+        )
+
+        # The speed doesn't depend on the axes it is expressed in
+        np.testing.assert_allclose(
+            np.linalg.norm(velocity, axis=-1),
+            np.linalg.norm(states['ecef'][1], axis=-1)
+        )
+
+        states = frames.state_vectors(
+            self.data['position'],
+            self.data['velocity_vector'],
+            self.earth,
+            ('teme',)
+        )
+        self.assertEqual(['teme'], list(states.keys()))
+
+    def test_stateVectorView(self):
+        """
+            Test if the state vector view returns every frame
+        """
+        response = self.client.get(
+            '/api/v1/compute/25544/state/?start=20170301000000&end=20170301001000'
+        )
+        self.assertEqual(200, response.status_code)
+
+        content = json.loads(b''.join(response.streaming_content).decode('utf8'))
+        self.assertEqual(11, content['count'])
+
+        row = content['results'][0]
+        self.assertEqual('2017-03-01T00:00:00Z', row['time'])
+        np.testing.assert_allclose(
+            self.data['position'][0, 0],
+            row['teme']['position']
+        )
+        np.testing.assert_allclose(
+            self.data['velocity_vector'][0, 0],
+            row['teme']['velocity']
+        )
+        self.assertEqual(
+            ['height', 'latitude', 'longitude', 'velocity'],
+            sorted(row['geodetic'].keys())
+        )
+
+    def test_stateVectorViewFramesParameter(self):
+        """
+            Test if the frames parameter restricts the returned frames
+        """
+        response = self.client.get(
+            '/api/v1/compute/25544/state/?start=20170301000000&frames=ecef'
+        )
+        content = json.loads(b''.join(response.streaming_content).decode('utf8'))
+
+        self.assertEqual(['ecef', 'time'], sorted(content['results'][0].keys()))
+
+        response = self.client.get(
+            '/api/v1/compute/25544/state/?start=20170301000000&frames=j2000'
+        )
+        self.assertEqual(400, response.status_code)
+
+    def test_catalogStateVectorView(self):
+        """
+            Test if the catalog state vector view returns every satellite
+        """
+        response = self.client.get(
+            '/api/v1/compute/state/?time=20170301000000&frames=teme,geodetic'
+        )
+        content = json.loads(b''.join(response.streaming_content).decode('utf8'))
+
+        rows = dict((row['norad_catalog_number'], row) for row in content['results'])
+        self.assertIn('25544', rows)
+        self.assertEqual(
+            ['geodetic', 'norad_catalog_number', 'teme', 'tle'],
+            sorted(rows['25544'].keys())
+        )
+        np.testing.assert_allclose(
+            self.data['position'][0, 0],
+            rows['25544']['teme']['position']
+        )
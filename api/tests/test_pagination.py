@@ -0,0 +1,69 @@
+import json
+
+from django.test import TestCase, override_settings
+
+class PaginationTestCase(TestCase):
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def walk(self, url):
+        """
+            Follow the next links from url, returns the pages
+        """
+        pages = []
+        while url is not None:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+            pages.append(json.loads(response.content.decode('utf8')))
+            url = pages[-1]['next']
+
+        return pages
+
+    def test_pageNumberPaginationIsTheDefault(self):
+        pages = self.walk('/api/v1/tle/?limit=3')
+
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(pages[0]['count'], 4)
+
+    def test_cursorPaginationWalksTlesInImportOrder(self):
+        pages = self.walk('/api/v1/tle/?pagination=cursor&limit=1')
+
+        self.assertEqual(
+            [tle['id'] for page in pages for tle in page['results']],
+            [1, 2, 3, 4]
+        )
+        self.assertNotIn('count', pages[0])
+        self.assertIsNone(pages[0]['previous'])
+        self.assertIn('pagination=cursor', pages[0]['next'])
+
+    def test_cursorPaginationWalksCatalogEntriesByNumber(self):
+        pages = self.walk(
+            '/api/v1/catalogentry/?pagination=cursor&limit=1&ordering=-names'
+        )
+
+        self.assertEqual(
+            [entry['norad_catalog_number'] for page in pages for entry in page['results']],
+            ['25544', '37820']
+        )
+
+    # The data generation is read by the first request only
+    @override_settings(API_GENERATION_REFRESH_INTERVAL=3600)
+    def test_cursorPageReadsRowsInOneQuery(self):
+        page = self.walk('/api/v1/tle/?pagination=cursor&limit=2')[0]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(page['next'])
+
+        self.assertEqual(
+            [tle['id'] for tle in json.loads(response.content.decode('utf8'))['results']],
+            [3, 4]
+        )
+
+    def test_cursorPaginationReturns404OnInvalidCursor(self):
+        response = self.client.get('/api/v1/tle/?cursor=notacursor')
+
+        self.assertEqual(response.status_code, 404)
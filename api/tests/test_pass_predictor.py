@@ -0,0 +1,191 @@
+from django.test import TestCase
+
+import math
+
+import ephem
+import numpy as np
+
+from catalog.models import TLE
+from api.tools import BatchPropagator, PassPredictor, SatelliteComputation
+from api.tools import frames
+from api.tools.topocentric import look_angles, observer_location
+
+class PassPredictorTestCase(TestCase):
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def setUp(self):
+        self.observer = ephem.Observer()
+        self.observer.lat = math.radians(45.0)
+        self.observer.lon = math.radians(5.0)
+        self.observer.elevation = 300
+        self.observer.pressure = 0
+
+        self.tle = TLE.objects.get(id=4)
+        self.start = ephem.Date('2017/3/1 00:00:00')
+        self.end = ephem.Date(self.start + 2)
+
+    def propagator(self, *tles):
+        return BatchPropagator.from_tles(tles)
+
+    def test_lookAnglesMatchPyEphem(self):
+        """
+            Check the topocentric coordinates against pyephem
+        """
+        body = ephem.readtle(
+            self.tle.first_line,
+            self.tle.second_line,
+            self.tle.third_line
+        )
+        dates = self.start + np.arange(0, 1, 0.01)
+        data = self.propagator(self.tle).propagate(dates)
+
+        ecef = frames.teme_to_ecef(
+            data['position'][0],
+            frames.gmst(dates + frames.EPHEM_JD_OFFSET)
+        )
+        azimuth, elevation, distance = look_angles(
+            ecef,
+            *observer_location(self.observer)
+        )
+
+        for i, date in enumerate(dates):
+            self.observer.date = date
+            body.compute(self.observer)
+
+            self.assertAlmostEqual(
+                math.degrees(elevation[i]),
+                math.degrees(body.alt),
+                delta=0.05
+            )
+            self.assertAlmostEqual(distance[i], body.range, delta=1000)
+            if body.alt > 0:
+                self.assertAlmostEqual(
+                    math.degrees(azimuth[i]),
+                    math.degrees(body.az),
+                    delta=0.05
+                )
+
+    def test_passesMatchPyEphem(self):
+        """
+            Check the predicted passes against the pyephem pass finder
+        """
+        body = ephem.readtle(
+            self.tle.first_line,
+            self.tle.second_line,
+            self.tle.third_line
+        )
+        passes = PassPredictor(
+            self.propagator(self.tle),
+            self.observer
+        ).predict(self.start, self.end)[0]
+
+        self.assertGreater(len(passes), 0)
+
+        self.observer.date = self.start
+        for satellite_pass in passes:
+            rise, rise_azimuth, culmination, altitude, setting, _ = \
+                self.observer.next_pass(body)
+            self.observer.date = setting + ephem.minute
+
+            for key, expected in [('aos', rise), ('tca', culmination), ('los', setting)]:
+                delta = satellite_pass[key] - ephem.Date(expected).datetime()
+                self.assertLess(abs(delta.total_seconds()), 2)
+
+            self.assertAlmostEqual(
+                satellite_pass['max_elevation'],
+                math.degrees(altitude),
+                delta=0.05
+            )
+            self.assertAlmostEqual(
+                satellite_pass['aos_azimuth'],
+                math.degrees(rise_azimuth),
+                delta=0.1
+            )
+
+    def test_shortPassesAreFoundBetweenSamples(self):
+        """
+            Check that passes culminating between two coarse samples are
+            found
+        """
+        predictor = PassPredictor(self.propagator(self.tle), self.observer)
+        expected = predictor.predict(self.start, self.end)[0]
+
+        predictor.coarse_step = 300
+        passes = predictor.predict(self.start, self.end)[0]
+
+        self.assertEqual(len(passes), len(expected))
+        for satellite_pass, expected_pass in zip(passes, expected):
+            delta = satellite_pass['aos'] - expected_pass['aos']
+            self.assertLess(abs(delta.total_seconds()), 1)
+
+    def test_passesAreFilteredByMinimumElevation(self):
+        predictor = PassPredictor(self.propagator(self.tle), self.observer)
+        passes = predictor.predict(self.start, self.end)[0]
+        high_passes = predictor.predict(self.start, self.end, 30)[0]
+
+        self.assertEqual(
+            [p['tca'] for p in high_passes],
+            [p['tca'] for p in passes if p['max_elevation'] >= 30]
+        )
+        for satellite_pass in high_passes:
+            self.assertGreater(satellite_pass['los'], satellite_pass['aos'])
+
+    def test_passesAreClippedToTheWindow(self):
+        predictor = PassPredictor(self.propagator(self.tle), self.observer)
+        satellite_pass = predictor.predict(self.start, self.end)[0][0]
+
+        middle = ephem.Date(satellite_pass['tca'])
+        passes = predictor.predict(middle, self.end)[0]
+
+        self.assertEqual(passes[0]['aos'], ephem.Date(middle).datetime())
+        delta = passes[0]['los'] - satellite_pass['los']
+        self.assertLess(abs(delta.total_seconds()), 1)
+
+    def test_batchPredictionMatchesSingleSatellites(self):
+        tles = [TLE.objects.get(id=4), TLE.objects.get(id=3)]
+        predictor = PassPredictor(self.propagator(*tles), self.observer)
+        predictor.max_samples = 3000
+        passes = predictor.predict(self.start, self.end)
+
+        self.assertEqual(len(passes), 2)
+        for tle, satellite_passes in zip(tles, passes):
+            expected = PassPredictor(
+                self.propagator(tle),
+                self.observer
+            ).predict(self.start, self.end)[0]
+
+            self.assertEqual(
+                [p['tca'] for p in satellite_passes],
+                [p['tca'] for p in expected]
+            )
+
+    def test_failedSatellitesHaveNoPasses(self):
+        predictor = PassPredictor(self.propagator(self.tle), self.observer)
+        passes = predictor.predict('2020/3/1', '2020/3/2')
+
+        self.assertEqual(passes, [[]])
+        self.assertNotEqual(predictor.errors[0], 0)
+
+    def test_satelliteComputationPassesStartAtTheObserverDate(self):
+        sc = SatelliteComputation(tle=self.tle)
+        sc.observer = self.observer
+        sc.observer.date = self.start
+
+        passes = sc.passes(self.end)
+        expected = PassPredictor(
+            self.propagator(self.tle),
+            self.observer
+        ).predict(self.start, self.end)[0]
+
+        self.assertEqual([p['tca'] for p in passes], [p['tca'] for p in expected])
+
+    def test_satelliteComputationPassesRaisesIfNotComputable(self):
+        sc = SatelliteComputation(tle=self.tle)
+        sc.observer.date = '2020/3/1'
+
+        with self.assertRaises(ValueError):
+            sc.passes(ephem.Date('2020/3/2'))
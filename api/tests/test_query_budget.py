@@ -0,0 +1,78 @@
+import copy
+
+from django.test import TestCase
+
+from catalog.models import CatalogEntry, TLE
+from api.tests.query_budget import QueryBudgetMixin
+
+class QueryBudgetTestCase(QueryBudgetMixin, TestCase):
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    # Most queries each endpoint may run, a paginated list counts the rows
+    # then reads them
+    budgets = {
+        '/api/v1/launchsite/': 2,
+        '/api/v1/launchsite/TYMSC/': 1,
+        '/api/v1/operationalstatus/': 2,
+        '/api/v1/orbitalstatus/': 2,
+        '/api/v1/source/': 2,
+        '/api/v1/datasource/': 1,
+        '/api/v1/catalogentry/': 2,
+        '/api/v1/catalogentry/?ordering=-launch_date&owner__code=ISS': 2,
+        '/api/v1/catalogentry/?search=ISS': 2,
+        '/api/v1/catalogentry/25544/': 1,
+        '/api/v1/catalogentry/25544/tle/': 1,
+        '/api/v1/catalogentry/25544/tle/?time=20170301000000': 3,
+        '/api/v1/tle/': 2,
+        '/api/v1/tle/?limit=1000': 2,
+        '/api/v1/tle/?pagination=cursor': 1,
+        '/api/v1/catalogentry/?pagination=cursor': 1,
+        '/api/v1/tle/4/': 1,
+    }
+
+    def addTles(self, count=50):
+        template = TLE.objects.get(id=4)
+        tles = []
+        for i in range(count):
+            tle = copy.copy(template)
+            tle.pk = None
+            tle.satellite_number_id = '37820' if i % 2 else '25544'
+            tles.append(tle)
+
+        TLE.objects.bulk_create(tles)
+
+    def addEntries(self, count=50):
+        template = CatalogEntry.objects.get(norad_catalog_number='25544')
+        entries = []
+        for i in range(count):
+            entry = copy.copy(template)
+            entry.norad_catalog_number = str(80000 + i)
+            entry.international_designator = '2099-%03dA' % i
+            entry.current_tle = None
+            entries.append(entry)
+
+        CatalogEntry.objects.bulk_create(entries)
+
+    def test_endpointsStayWithinTheirBudget(self):
+        for url, budget in self.budgets.items():
+            self.assertQueryBudget(url, budget)
+
+    def test_tleListQueriesDoNotDependOnRows(self):
+        self.assertConstantQueries('/api/v1/tle/?limit=1000', self.addTles)
+
+    def test_catalogEntryListQueriesDoNotDependOnRows(self):
+        self.assertConstantQueries(
+            '/api/v1/catalogentry/?limit=1000',
+            self.addEntries
+        )
+
+    def test_budgetFailureListsTheQueries(self):
+        with self.assertRaises(AssertionError) as context:
+            self.assertQueryBudget('/api/v1/tle/', 1)
+
+        self.assertIn('more than its budget of 1', str(context.exception))
+        self.assertIn('SELECT', str(context.exception))
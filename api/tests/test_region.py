@@ -0,0 +1,200 @@
+import json
+from datetime import datetime
+
+from django.test import TestCase
+
+import ephem
+import numpy as np
+
+from catalog.models import TLE
+from api.tools import BatchPropagator
+from api.tools.region import Region, RegionScanner, reachable
+
+class RegionTestCase(TestCase):
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def setUp(self):
+        self.tles = [TLE.objects.get(id=4), TLE.objects.get(id=3)]
+        self.propagator = BatchPropagator.from_tles(self.tles)
+
+    def test_bboxContains(self):
+        """
+            Test if a bounding box contains the expected points
+        """
+        region = Region.from_bbox(40, -10, 50, 10)
+
+        self.assertEqual(
+            [True, False, False, False],
+            region.contains(
+                [45, 55, 45, np.nan],
+                [0, 0, 20, 0]
+            ).tolist()
+        )
+
+    def test_bboxAcrossAntimeridian(self):
+        """
+            Test if a bounding box can cross the antimeridian
+        """
+        region = Region.from_bbox(-10, 170, 10, -170)
+
+        self.assertEqual(
+            [True, True, True, False],
+            region.contains([0, 0, 0, 0], [175, -175, 180, 0]).tolist()
+        )
+
+        region = Region.from_bbox(-10, -180, 10, 180)
+        self.assertTrue(region.contains([0, 0, 0], [-179, 0, 179]).all())
+
+    def test_bboxIsChecked(self):
+        """
+            Test if a bounding box out of range is rejected, and if the
+            polygon of a correct one stays small
+        """
+        for bounds in [
+                (0, 0, 10, float('inf')),
+                (0, 0, 10, 1e7),
+                (float('nan'), 0, 10, 10),
+                (-91, 0, 10, 10),
+                (0, 0, 10, 181)]:
+            with self.assertRaises(ValueError):
+                Region.from_bbox(*bounds)
+
+        self.assertLessEqual(len(Region.from_bbox(-10, 180, 10, 179).latitude), 10)
+
+    def test_polygonContains(self):
+        """
+            Test if a polygon contains the expected points
+        """
+        region = Region([(0, 0), (10, 0), (0, 10)])
+
+        self.assertEqual(
+            [True, False, False],
+            region.contains([2, 8, -1], [2, 8, 5]).tolist()
+        )
+
+        with self.assertRaises(ValueError):
+            Region([(0, 0), (10, 0)])
+
+    def test_reachableInclination(self):
+        """
+            Test if regions beyond the inclination of a satellite are left out
+        """
+        self.assertEqual(
+            [False, False],
+            reachable(self.propagator.elements, Region.from_bbox(60, -10, 70, 10)).tolist()
+        )
+        self.assertEqual(
+            [True, True],
+            reachable(self.propagator.elements, Region.from_bbox(-48, -10, -40, 10)).tolist()
+        )
+
+        # Tiangong is on a 42.8 deg orbit
+        self.assertEqual(
+            [True, False],
+            reachable(self.propagator.elements, Region.from_bbox(-52, -10, -47, 10)).tolist()
+        )
+
+    def test_reachableAltitude(self):
+        """
+            Test if satellites outside of the altitude range are left out
+        """
+        region = Region.from_bbox(-10, -10, 10, 10)
+
+        self.assertEqual(
+            [True, True],
+            reachable(self.propagator.elements, region, 300000, 500000).tolist()
+        )
+        self.assertEqual(
+            [False, False],
+            reachable(self.propagator.elements, region, 1000000, None).tolist()
+        )
+        self.assertEqual(
+            [False, False],
+            reachable(self.propagator.elements, region, None, 200000).tolist()
+        )
+
+    def test_scanMatchesSampling(self):
+        """
+            Test if the passes match a sampling every second
+        """
+        region = Region.from_bbox(-20, -60, 20, 60)
+        start = ephem.Date(datetime(2017, 3, 1))
+        end = ephem.Date(datetime(2017, 3, 1, 3))
+
+        passes = RegionScanner(self.propagator, region).scan(start, end)
+
+        dates = np.arange(start, end, 1 / 86400.0)
+        data = self.propagator.propagate(dates, vectors=False)
+        inside = region.contains(data['latitude'], data['longitude'])
+
+        for row in range(len(self.tles)):
+            entries = dates[1:][np.diff(inside[row].astype(np.int8)) == 1]
+            self.assertGreater(len(entries), 0)
+            self.assertEqual(len(entries), len(passes[row]))
+
+            for entry, (found, _) in zip(entries, passes[row]):
+                self.assertLess(
+                    abs(ephem.Date(found) - entry) * 86400.0,
+                    1.1
+                )
+
+    def test_regionViewSnapshot(self):
+        """
+            Test if the region view returns the satellites inside the region
+        """
+        data = self.propagator.propagate([ephem.Date(datetime(2017, 3, 1))])
+        latitude, longitude = data['latitude'][0, 0], data['longitude'][0, 0]
+
+        response = self.client.get(
+            '/api/v1/compute/region/?time=20170301000000&bbox={0},{1},{2},{3}'.format(
+                latitude - 1, longitude - 1, latitude + 1, longitude + 1
+            )
+        )
+        self.assertEqual(200, response.status_code)
+
+        content = json.loads(b''.join(response.streaming_content).decode('utf8'))
+        self.assertEqual(['25544'], [row[0] for row in content['results']])
+
+        response = self.client.get(
+            '/api/v1/compute/region/?time=20170301000000&bbox=60,-10,70,10'
+        )
+        content = json.loads(b''.join(response.streaming_content).decode('utf8'))
+        self.assertEqual(0, content['candidates'])
+
+    def test_regionViewWindow(self):
+        """
+            Test if the region view returns the passes through the region
+        """
+        response = self.client.get(
+            '/api/v1/compute/region/?start=20170301000000&end=20170301030000'
+            '&point=-20,-60&point=-20,60&point=20,60&point=20,-60'
+        )
+        self.assertEqual(200, response.status_code)
+
+        content = json.loads(b''.join(response.streaming_content).decode('utf8'))
+        numbers = [row['norad_catalog_number'] for row in content['results']]
+        self.assertIn('25544', numbers)
+        self.assertTrue(all(row['passes'] for row in content['results']))
+
+    def test_regionViewIncorrectRegion(self):
+        """
+            Test if an incorrect region is rejected
+        """
+        for query in [
+                'bbox=1,2,3',
+                'bbox=10,0,0,10',
+                'bbox=0,0,10,inf',
+                'bbox=0,0,10,1e13',
+                'bbox=0,0,10,1e7',
+                'bbox=nan,0,10,10',
+                'bbox=-95,0,10,10',
+                'bbox=0,-200,10,10',
+                'point=1,2&point=3,4',
+                'point=1,2&point=3,4&point=nan,5',
+                '']:
+            response = self.client.get('/api/v1/compute/region/?' + query)
+            self.assertEqual(400, response.status_code)
@@ -0,0 +1,109 @@
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils.six import StringIO
+
+from catalog.models import Generation, TLE
+from api.tools import data_generation, response_cache
+
+@override_settings(API_CACHE_ENABLED=True, API_GENERATION_REFRESH_INTERVAL=3600)
+class ResponseCacheTestCase(TestCase):
+    """
+        Test the cache of the responses of the viewsets
+    """
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def setUp(self):
+        response_cache.cache.clear()
+        data_generation.clear()
+
+    def import_data(self):
+        Generation.objects.bump(Generation.DATA)
+        data_generation.clear()
+
+    def test_cachedResponseRunsNoQuery(self):
+        expected = self.client.get('/api/v1/tle/?limit=2')
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/tle/?limit=2')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response['Content-Type'], expected['Content-Type'])
+        self.assertEqual(response['ETag'], expected['ETag'])
+
+    def test_queryParametersAreNormalized(self):
+        self.client.get('/api/v1/catalogentry/?ordering=names&limit=1')
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/v1/catalogentry/?limit=1&ordering=names')
+
+        self.assertEqual(response_cache.stats()['hits'], 1)
+
+    def test_linksAreNotSharedByHosts(self):
+        url = '/api/v1/tle/?limit=1'
+        self.client.get(url, HTTP_HOST='internal:8000')
+
+        for host, secure in [('public.example.com', False), ('internal:8000', True)]:
+            response = self.client.get(url, HTTP_HOST=host, secure=secure)
+            self.assertTrue(response.json()['next'].startswith(
+                '%s://%s/' % ('https' if secure else 'http', host)
+            ))
+
+        self.assertEqual(response_cache.stats()['hits'], 0)
+
+    def test_differentRequestsAreDifferentEntries(self):
+        first = self.client.get('/api/v1/tle/?limit=1')
+        second = self.client.get('/api/v1/tle/?limit=2')
+        detail = self.client.get('/api/v1/tle/4/')
+
+        self.assertNotEqual(first.content, second.content)
+        self.assertNotEqual(second.content, detail.content)
+        self.assertEqual(response_cache.stats()['misses'], 3)
+
+    def test_importInvalidatesTheResponses(self):
+        self.client.get('/api/v1/tle/')
+        TLE.objects.filter(id=1).delete()
+        self.import_data()
+
+        response = self.client.get('/api/v1/tle/')
+
+        self.assertEqual(response.json()['count'], 3)
+        self.assertEqual(response_cache.stats()['hits'], 0)
+
+    def test_errorsAndOtherFormatsAreNotCached(self):
+        for url in ['/api/v1/tle/999/', '/api/v1/tle/?format=api']:
+            self.client.get(url)
+            self.client.get(url)
+
+        self.assertEqual(response_cache.stats()['hits'], 0)
+
+    def test_detailKeepsItsLastModified(self):
+        expected = self.client.get('/api/v1/tle/4/')
+
+        self.assertEqual(
+            self.client.get('/api/v1/tle/4/')['Last-Modified'],
+            expected['Last-Modified']
+        )
+
+    def test_statsCommandShowsTheCounters(self):
+        self.client.get('/api/v1/source/')
+        self.client.get('/api/v1/source/')
+        out = StringIO()
+
+        call_command('cachestats', '--reset', stdout=out)
+
+        self.assertIn('Hits        1', out.getvalue())
+        self.assertIn('Misses      1', out.getvalue())
+        self.assertIn('Hit ratio   50.0%', out.getvalue())
+        self.assertEqual(response_cache.stats()['hits'], 0)
+
+    @override_settings(API_CACHE_ENABLED=False)
+    def test_disabledCacheIsNotUsed(self):
+        self.client.get('/api/v1/source/')
+        self.client.get('/api/v1/source/')
+
+        self.assertEqual(response_cache.stats()['misses'], 0)
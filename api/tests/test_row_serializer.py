@@ -0,0 +1,88 @@
+from django.test import TestCase, override_settings
+
+from catalog.models import CatalogEntry, TLE
+from api.serializers import CatalogEntrySerializer, TLESerializer
+from api.tools import RowSerializer, data_generation
+
+class RowSerializerTestCase(TestCase):
+    """
+        Test the serialization of the lists from database rows
+    """
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def assertSameResponse(self, url):
+        """
+            Check that url gives the same response with and without the fast
+            serialization
+        """
+        with override_settings(API_FAST_SERIALIZATION=False):
+            expected = self.client.get(url)
+        with override_settings(API_FAST_SERIALIZATION=True):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response['Content-Type'], expected['Content-Type'])
+        self.assertEqual(response.content, expected.content)
+
+    def test_serializeGivesTheSerializerData(self):
+        for model, serializer_class in [
+                (TLE, TLESerializer),
+                (CatalogEntry, CatalogEntrySerializer)]:
+            rows = RowSerializer(serializer_class)
+
+            self.assertEqual(
+                rows.serialize(rows.values(model.objects.order_by('pk'))),
+                serializer_class(model.objects.order_by('pk'), many=True).data
+            )
+
+    def test_nullRelatedObjectsAreNone(self):
+        CatalogEntry.objects.filter(norad_catalog_number='25544').update(
+            owner=None,
+            launch_site=None
+        )
+
+        self.assertSameResponse('/api/v1/catalogentry/')
+        self.assertSameResponse('/api/v1/tle/')
+
+    def test_tleListsAreUnchanged(self):
+        for url in [
+                '/api/v1/tle/',
+                '/api/v1/tle/?format=json',
+                '/api/v1/tle/?limit=2&page=2',
+                '/api/v1/tle/?pagination=cursor&limit=2',
+                '/api/v1/tle/?page=9']:
+            self.assertSameResponse(url)
+
+    def test_catalogEntryListsAreUnchanged(self):
+        for url in [
+                '/api/v1/catalogentry/',
+                '/api/v1/catalogentry/?ordering=-names',
+                '/api/v1/catalogentry/?pagination=cursor&limit=1',
+                '/api/v1/catalogentry/?search=iss',
+                '/api/v1/catalogentry/?search=space&ordering=rank',
+                '/api/v1/catalogentry/?has_payload=true']:
+            self.assertSameResponse(url)
+
+    @override_settings(API_FAST_SERIALIZATION=True)
+    def test_cursorLinksWalkTheRows(self):
+        first = self.client.get('/api/v1/tle/?pagination=cursor&limit=3').json()
+        second = self.client.get(first['next']).json()
+
+        self.assertEqual(
+            [tle['id'] for tle in first['results'] + second['results']],
+            [1, 2, 3, 4]
+        )
+
+    @override_settings(
+        API_FAST_SERIALIZATION=True,
+        API_GENERATION_REFRESH_INTERVAL=3600
+    )
+    def test_listReadsRowsInOneQuery(self):
+        data_generation.state()
+
+        with self.assertNumQueries(1):
+            self.client.get('/api/v1/tle/?pagination=cursor')
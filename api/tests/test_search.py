@@ -0,0 +1,77 @@
+import json
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from catalog.models import CatalogEntry
+from catalog.search import catalog_search
+
+class CatalogSearchTestCase(TestCase):
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def search(self, query):
+        response = self.client.get('/api/v1/catalogentry/?{}'.format(query))
+        self.assertEqual(response.status_code, 200)
+
+        return [
+            entry['norad_catalog_number']
+            for entry in json.loads(response.content.decode('utf8'))['results']
+        ]
+
+    def addEntry(self, number, names):
+        return CatalogEntry.objects.create(
+            norad_catalog_number=number,
+            international_designator='1990-037' + number[-1],
+            names=names
+        )
+
+    def test_searchUsesTheIndex(self):
+        self.assertTrue(catalog_search.available())
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.search('search=zarya'), ['25544'])
+
+        self.assertTrue(any(
+            'MATCH' in query['sql'] for query in context.captured_queries
+        ))
+
+    def test_searchMatchesSubstringsOfRelatedDescriptions(self):
+        self.assertEqual(self.search('search=ARYA'), ['25544'])
+        self.assertEqual(self.search('search=quan+tiang'), ['37820'])
+        self.assertEqual(self.search('search=1998-067'), ['25544'])
+        self.assertEqual(self.search('search=nothing+like+this'), [])
+
+    def test_shortTermsUseTheSearchFields(self):
+        self.assertEqual(self.search('search=IS'), ['25544'])
+
+    def test_searchCanBeSortedByRank(self):
+        self.addEntry('20580', 'XQZ')
+        self.addEntry('20581', 'XQZ XQZ XQZ XQZ')
+
+        self.assertEqual(
+            self.search('search=xqz&ordering=rank'),
+            ['20581', '20580']
+        )
+
+    def test_indexFollowsSavedAndDeletedEntries(self):
+        entry = self.addEntry('20580', 'HUBBLE SPACE TELESCOPE')
+        self.assertEqual(self.search('search=hubble'), ['20580'])
+
+        entry.names = 'HST'
+        entry.save()
+        self.assertEqual(self.search('search=hubble'), [])
+
+        entry.delete()
+        self.assertEqual(self.search('search=1990-0370'), [])
+
+    def test_deferredIndexingRunsOnceAtTheEnd(self):
+        with catalog_search.deferred():
+            self.addEntry('20580', 'HUBBLE SPACE TELESCOPE')
+            self.assertEqual(self.search('search=hubble'), [])
+
+        self.assertEqual(self.search('search=hubble'), ['20580'])
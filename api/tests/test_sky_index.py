@@ -0,0 +1,185 @@
+import json
+import math
+from datetime import datetime, timedelta
+
+from django.test import TestCase, override_settings
+
+import ephem
+import numpy as np
+
+from catalog.models import TLE
+from api.tools import BatchPropagator, SkyIndex, frames, sky_index
+from api.tools.topocentric import look_angles
+
+class SkyIndexTestCase(TestCase):
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def setUp(self):
+        tle = TLE.objects.get(id=4)
+        line1, line2 = tle.second_line, tle.third_line
+
+        # A constellation on the orbit of the ISS fixture with other
+        # ascending nodes, mean anomalies and inclinations
+        self.lines = []
+        for i, (node, anomaly, inclination) in enumerate(
+            (node, anomaly, inclination)
+            for node in range(0, 360, 20)
+            for anomaly in range(0, 360, 40)
+            for inclination in (51.6426, 97.5)
+        ):
+            number = '{0:05d}'.format(90000 + i)
+            self.lines.append((
+                number,
+                i,
+                line1[:2] + number + line1[7:],
+                '{0}{1}{2:8.4f}{3:9.4f}{4}{5:8.4f}{6}'.format(
+                    line2[:2],
+                    number + line2[7:8],
+                    inclination,
+                    node,
+                    line2[25:43],
+                    anomaly,
+                    line2[51:]
+                ),
+            ))
+
+        self.date = datetime(2017, 3, 1, 12)
+        self.index = SkyIndex(self.lines, self.date, 60)
+
+    def visible(self, date, longitude, latitude, min_elevation):
+        """
+            Brute force rows above min_elevation (rad) at date
+        """
+        propagator = BatchPropagator.from_lines(
+            [(line1, line2) for _, _, line1, line2 in self.lines]
+        )
+        dates = [float(ephem.Date(date))]
+        position = propagator.propagate(dates, vectors=False)['position'][:, 0]
+        ecef = frames.teme_to_ecef(
+            position,
+            frames.gmst(dates[0] + frames.EPHEM_JD_OFFSET)
+        )
+        _, elevation, _ = look_angles(ecef, longitude, latitude, 0.0)
+
+        return np.flatnonzero(elevation >= min_elevation)
+
+    def test_candidatesContainVisibleSatellites(self):
+        """
+            Test if the candidates are a superset of the visible satellites
+            during the validity of the index, and a small part of the catalog
+        """
+        self.assertEqual(len(self.lines), len(self.index))
+
+        found = 0
+        for latitude, longitude in [(48.85, 2.35), (-33.9, 151.2), (78.2, 15.6), (0, -160)]:
+            for mask in (0.0, 10.0, 45.0):
+                lon, lat = math.radians(longitude), math.radians(latitude)
+                candidates = self.index.candidates(lon, lat, math.radians(mask))
+
+                self.assertLess(len(candidates), len(self.lines) / 2)
+
+                for seconds in (0, 30, 60):
+                    visible = self.visible(
+                        self.date + timedelta(seconds=seconds),
+                        lon,
+                        lat,
+                        math.radians(mask)
+                    )
+                    self.assertTrue(set(visible.tolist()) <= set(candidates.tolist()))
+                    found += len(visible)
+
+        self.assertGreater(found, 0)
+
+    def test_overheadMatchesBruteForce(self):
+        """
+            Test if the overhead satellites are exactly the visible ones
+        """
+        lon, lat = math.radians(2.35), math.radians(48.85)
+        date = self.date + timedelta(seconds=20)
+
+        rows, azimuth, elevation, distance, candidates = self.index.overhead(
+            date,
+            lon,
+            lat,
+            0.0,
+            math.radians(10)
+        )
+
+        np.testing.assert_array_equal(
+            self.visible(date, lon, lat, math.radians(10)),
+            rows
+        )
+        self.assertTrue((elevation >= math.radians(10)).all())
+        self.assertGreaterEqual(candidates, len(rows))
+
+    def test_indexCoversItsWindow(self):
+        """
+            Test if the index only covers its validity window
+        """
+        self.assertTrue(self.index.covers(self.date))
+        self.assertTrue(self.index.covers(self.date + timedelta(seconds=60)))
+        self.assertFalse(self.index.covers(self.date + timedelta(seconds=61)))
+        self.assertFalse(self.index.covers(self.date - timedelta(seconds=1)))
+
+    @override_settings(OVERHEAD_INDEX_INTERVAL=60)
+    def test_loaderRebuildsExpiredIndex(self):
+        """
+            Test if the loader reuses its index during its validity
+        """
+        sky_index.clear()
+
+        index = sky_index.get(self.date)
+        self.assertIs(index, sky_index.get(self.date + timedelta(seconds=30)))
+        self.assertIsNot(index, sky_index.get(self.date + timedelta(minutes=5)))
+
+        sky_index.clear()
+
+    def test_loaderKeepsTheLiveIndex(self):
+        """
+            Test if queries on other times do not replace the live index
+        """
+        sky_index.clear()
+
+        live = sky_index.get(datetime.utcnow())
+        past = sky_index.get(self.date)
+
+        self.assertIsNot(live, past)
+        self.assertIs(live, sky_index.get(datetime.utcnow()))
+        self.assertIs(past, sky_index.get(self.date + timedelta(seconds=30)))
+
+        sky_index.clear()
+
+    def test_overheadView(self):
+        """
+            Test if the overhead view returns the visible satellites
+        """
+        sky_index.clear()
+
+        # The ISS fixture TLE is above the observer at its sub-point
+        tle = TLE.objects.get(id=4)
+        data = BatchPropagator.from_tles([tle]).propagate(
+            [ephem.Date(self.date)]
+        )
+
+        response = self.client.get(
+            '/api/v1/compute/overhead/?time=20170301120000'
+            '&latitude={0}&longitude={1}&min_elevation=80'.format(
+                data['latitude'][0, 0],
+                data['longitude'][0, 0]
+            )
+        )
+        self.assertEqual(200, response.status_code)
+
+        content = json.loads(b''.join(response.streaming_content).decode('utf8'))
+        self.assertEqual(['25544'], [row[0] for row in content['results']])
+        self.assertEqual(4, content['results'][0][1])
+        self.assertGreater(content['results'][0][3], 80)
+
+        response = self.client.get('/api/v1/compute/overhead/?latitude=100&longitude=0')
+        self.assertEqual(400, response.status_code)
+
+        sky_index.clear()
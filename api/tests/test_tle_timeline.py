@@ -0,0 +1,119 @@
+import datetime
+
+from django.test import TestCase, override_settings
+
+from catalog.models import CatalogEntry, Generation, TLE
+from api.tools import TLETimeline
+
+@override_settings(TLE_TIMELINE_ENABLED=True)
+class TLETimelineTestCase(TestCase):
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def setUp(self):
+        self.timeline = TLETimeline(max_size=0, refresh_interval=0)
+        self.iss = CatalogEntry.objects.get(norad_catalog_number='25544')
+        self.times = [
+            datetime.datetime(2016, 11, 10, 7, 0, 0),
+            datetime.datetime(2016, 12, 1, 8, 0, 0),
+            datetime.datetime(2017, 2, 28, 13, 0, 0),
+            datetime.datetime(2017, 2, 28, 17, 0, 0),
+            datetime.datetime(2017, 2, 28, 23, 0, 0),
+            datetime.datetime(2017, 3, 28, 14, 0, 0),
+        ]
+
+    def test_findMatchesManagerInEveryMode(self):
+        for entry in CatalogEntry.objects.filter(tle__isnull=False).distinct():
+            for mode in ('added', 'epoch', 'nearest'):
+                for time in self.times:
+                    try:
+                        expected = TLE.objects.findByCatalogEntryAndTime(
+                            entry,
+                            time,
+                            mode
+                        ).id
+                    except IndexError:
+                        expected = None
+
+                    try:
+                        found = self.timeline.find(entry, time, mode).id
+                    except IndexError:
+                        found = None
+
+                    self.assertEqual(found, expected, (entry, mode, time))
+
+    def test_findReturnsUsableTle(self):
+        tle = self.timeline.find(self.iss, self.times[-1])
+        expected = TLE.objects.get(id=4)
+
+        self.assertEqual(tle.id, 4)
+        self.assertEqual(tle.second_line, expected.second_line)
+        self.assertEqual(tle.third_line, expected.third_line)
+        self.assertEqual(tle.mean_motion, expected.mean_motion)
+        self.assertEqual(tle.epoch, expected.epoch)
+
+    def test_findDoesNotQueryOnceLoaded(self):
+        self.timeline.refresh_interval = 3600
+        self.timeline.load()
+
+        with self.assertNumQueries(0):
+            for time in self.times[1:]:
+                self.timeline.find(self.iss, time)
+
+        self.assertEqual(self.timeline.stats()['hits'], len(self.times) - 1)
+
+    def test_findRaisesIndexErrorBeforeFirstTle(self):
+        with self.assertRaises(IndexError):
+            self.timeline.find(self.iss, datetime.datetime(2015, 1, 1))
+
+    def test_findRejectsUnknownMode(self):
+        with self.assertRaises(ValueError):
+            self.timeline.find(self.iss, None, 'closest')
+
+    def test_truncatedTimelineFallsBackToDatabase(self):
+        timeline = TLETimeline(max_size=2, refresh_interval=0)
+
+        # TLE 1 is not kept, the lookup is answered by the manager
+        self.assertEqual(timeline.find(self.iss, self.times[1]).id, 1)
+        self.assertEqual(timeline.find(self.iss, self.times[3]).id, 2)
+
+        stats = timeline.stats()
+        self.assertEqual(stats['tles'], 3)
+        self.assertEqual(stats['truncated'], 1)
+        self.assertEqual(stats['fallbacks'], 1)
+        self.assertEqual(stats['hits'], 1)
+
+    def test_refreshLoadsTlesOfNewGenerations(self):
+        self.timeline.load()
+
+        tle = TLE.objects.get(id=4)
+        tle.pk = None
+        tle.added = tle.added + datetime.timedelta(days=1)
+        tle.save()
+
+        time = datetime.datetime(2017, 3, 2)
+        self.assertEqual(self.timeline.find(self.iss, time).id, 4)
+
+        Generation.objects.bump(Generation.TLE)
+
+        self.assertEqual(self.timeline.find(self.iss, time).id, tle.pk)
+        self.assertEqual(
+            self.timeline.stats()['generation'],
+            Generation.objects.current(Generation.TLE)
+        )
+
+    def test_statsReportMemoryUse(self):
+        self.timeline.load()
+        stats = self.timeline.stats()
+
+        self.assertEqual(stats['satellites'], 2)
+        self.assertEqual(stats['tles'], 4)
+        self.assertGreater(stats['bytes'], 4 * 3 * 70)
+
+    @override_settings(TLE_TIMELINE_ENABLED=False)
+    def test_disabledTimelineUsesManager(self):
+        self.assertEqual(self.timeline.find(self.iss, self.times[-1]).id, 4)
+        self.assertEqual(len(self.timeline), 0)
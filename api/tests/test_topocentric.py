@@ -0,0 +1,91 @@
+from django.test import TestCase
+
+import math
+
+import ephem
+import numpy as np
+
+from catalog.models import TLE
+from api.tools import BatchPropagator, SatelliteComputation
+from api.tools import frames
+from api.tools.topocentric import observe
+
+class TopocentricTestCase(TestCase):
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def setUp(self):
+        self.tles = [TLE.objects.get(id=4), TLE.objects.get(id=3)]
+        self.stations = np.array([
+            [math.radians(5.0), math.radians(45.0), 300.0],
+            [math.radians(-70.0), math.radians(-30.0), 2000.0],
+            [math.radians(140.0), math.radians(35.0), 0.0],
+        ])
+        self.dates = ephem.Date('2017/3/1') + np.arange(0, 0.2, 0.02)
+
+    def observe(self):
+        data = BatchPropagator.from_tles(self.tles).propagate(self.dates)
+
+        return observe(
+            data['position'],
+            data['velocity_vector'],
+            frames.gmst(self.dates + frames.EPHEM_JD_OFFSET),
+            self.stations
+        )
+
+    def test_observeBroadcastsStationsSatellitesAndTimes(self):
+        for values in self.observe():
+            self.assertEqual(values.shape, (3, 2, 10))
+
+    def test_observeMatchesPyEphem(self):
+        azimuth, elevation, distance, range_rate = self.observe()
+
+        for s, (longitude, latitude, height) in enumerate(self.stations):
+            observer = ephem.Observer()
+            observer.lon = longitude
+            observer.lat = latitude
+            observer.elevation = height
+            observer.pressure = 0
+
+            for n, tle in enumerate(self.tles):
+                body = ephem.readtle(tle.first_line, tle.second_line, tle.third_line)
+
+                for m, date in enumerate(self.dates):
+                    observer.date = date
+                    body.compute(observer)
+
+                    self.assertAlmostEqual(
+                        math.degrees(elevation[s, n, m]),
+                        math.degrees(body.alt),
+                        delta=0.01
+                    )
+                    self.assertAlmostEqual(
+                        (math.degrees(azimuth[s, n, m] - body.az) + 180) % 360 - 180,
+                        0,
+                        delta=0.01
+                    )
+                    self.assertAlmostEqual(distance[s, n, m], body.range, delta=200)
+                    self.assertAlmostEqual(
+                        range_rate[s, n, m],
+                        body.range_velocity,
+                        delta=1
+                    )
+
+    def test_satelliteComputationObserveMatchesBatch(self):
+        azimuth, elevation, distance, range_rate = self.observe()
+
+        sc = SatelliteComputation(tle=self.tles[0])
+        sc.observer.lon = self.stations[0, 0]
+        sc.observer.lat = self.stations[0, 1]
+        sc.observer.elevation = self.stations[0, 2]
+        sc.observer.date = self.dates[3]
+
+        data = sc.observe()
+
+        self.assertAlmostEqual(data['azimuth'], math.degrees(azimuth[0, 0, 3]))
+        self.assertAlmostEqual(data['elevation'], math.degrees(elevation[0, 0, 3]))
+        self.assertAlmostEqual(data['range'], distance[0, 0, 3])
+        self.assertAlmostEqual(data['range_rate'], range_rate[0, 0, 3])
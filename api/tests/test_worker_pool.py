@@ -0,0 +1,117 @@
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+import ephem
+import numpy as np
+
+from catalog.models import TLE
+from api.tools import BatchPropagator, PassPredictor, WorkerPool
+from api.views.observer import parse_observer
+
+class WorkerPoolTestCase(TestCase):
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def setUp(self):
+        self.lines = [
+            (tle.second_line, tle.third_line)
+            for tle in TLE.objects.filter(id__in=[3, 4]).order_by('id')
+        ] * 3
+        self.dates = ephem.Date(datetime(2017, 3, 1)) + np.arange(10) / 1440.0
+
+        self.pool = WorkerPool(workers=2)
+        self.pool.min_chunk = 2
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_chunksSplitElementSets(self):
+        """
+            Test if the element sets are shared between the workers
+        """
+        self.assertEqual([(0, 3), (3, 6)], self.pool.chunks(6))
+        self.assertEqual([(0, 3)], self.pool.chunks(3))
+        self.assertEqual([(0, 0)], self.pool.chunks(0))
+
+        self.assertEqual([(0, 6)], WorkerPool(workers=0).chunks(6))
+
+    @override_settings(COMPUTE_WORKERS=3)
+    def test_workersDefaultToSettings(self):
+        """
+            Test if the number of workers is read from the settings
+        """
+        self.assertEqual(3, WorkerPool().workers)
+
+    def test_propagateMatchesInProcess(self):
+        """
+            Test if the workers compute the same arrays as a single propagator
+        """
+        expected = BatchPropagator.from_lines(self.lines).propagate(self.dates)
+        data = self.pool.propagate(self.lines, self.dates)
+
+        self.assertEqual(set(expected.keys()), set(data.keys()))
+        for key in expected:
+            np.testing.assert_array_equal(expected[key], data[key])
+
+    def test_propagateDatesPerElementSet(self):
+        """
+            Test if dates given per element set are split with them
+        """
+        dates = self.dates + np.arange(len(self.lines))[:, np.newaxis]
+
+        expected = BatchPropagator.from_lines(self.lines).propagate(dates)
+        data = self.pool.propagate(self.lines, dates)
+
+        np.testing.assert_array_equal(expected['position'], data['position'])
+
+    def test_predictPassesMatchesInProcess(self):
+        """
+            Test if the workers predict the same passes as a single predictor
+        """
+        observer = parse_observer({'latitude': '48.85', 'longitude': '2.35'})
+        start, end = datetime(2017, 3, 1), datetime(2017, 3, 2)
+
+        predictor = PassPredictor(BatchPropagator.from_lines(self.lines), observer)
+        expected = predictor.predict(start, end, 10)
+
+        passes, errors = self.pool.predict_passes(self.lines, observer, start, end, 10)
+
+        self.assertEqual(expected, passes)
+        np.testing.assert_array_equal(predictor.errors, errors)
+
+    def test_brokenPoolFallsBackInProcess(self):
+        """
+            Test if the job is computed in process when the pool is broken
+        """
+        expected = BatchPropagator.from_lines(self.lines).propagate(self.dates)
+
+        with mock.patch.object(
+            WorkerPool,
+            '_get_executor',
+            side_effect=BrokenProcessPool('broken')
+        ), self.assertLogs('api.tools.worker_pool', 'WARNING'):
+            data = self.pool.propagate(self.lines, self.dates)
+
+        np.testing.assert_array_equal(expected['position'], data['position'])
+
+    def test_snapshotUsesWorkers(self):
+        """
+            Test if the snapshot view gives the same rows with workers
+        """
+        url = '/api/v1/compute/snapshot/?time=20170301000000'
+        expected = self.client.get(url)
+
+        self.pool.min_chunk = 1
+        with mock.patch('api.views.snapshot.worker_pool', self.pool):
+            response = self.client.get(url)
+
+        self.assertEqual(
+            b''.join(expected.streaming_content),
+            b''.join(response.streaming_content)
+        )
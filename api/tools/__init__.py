@@ -1,8 +1,40 @@
 from .satellite_computation import SatelliteComputation
+from .batch_propagator import BatchPropagator
+from .pass_predictor import PassPredictor
+from .conjunction import ConjunctionScreener
+from .ephemeris_cache import EphemerisCache, ephemeris_cache
+from .ephemeris_tiles import EphemerisTiles, ephemeris_tiles
+from .worker_pool import WorkerPool, worker_pool
+from .eclipse import SolarEphemeris, solar_ephemeris
+from .sky_index import SkyIndex, sky_index
+from .tle_timeline import TLETimeline, tle_timeline
+from .row_serializer import RowSerializer
+from .data_generation import DataGeneration, data_generation
+from .response_cache import ResponseCache, response_cache
 from .dates import format_inline_time, fraction2date, date2fraction
 
 __all__ = [
 	'SatelliteComputation',
+	'BatchPropagator',
+	'PassPredictor',
+	'ConjunctionScreener',
+	'EphemerisCache',
+	'ephemeris_cache',
+	'EphemerisTiles',
+	'ephemeris_tiles',
+	'WorkerPool',
+	'worker_pool',
+	'SolarEphemeris',
+	'solar_ephemeris',
+	'SkyIndex',
+	'sky_index',
+	'TLETimeline',
+	'tle_timeline',
+	'RowSerializer',
+	'DataGeneration',
+	'data_generation',
+	'ResponseCache',
+	'response_cache',
 	'format_inline_time',
 	'date2fraction',
 	'fraction2date',
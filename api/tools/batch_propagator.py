@@ -0,0 +1,331 @@
+"""
+    Propagation of many satellites over many times in one call
+"""
+
+import math
+
+import ephem
+import numpy as np
+
+from . import frames, sgp4
+
+class BatchPropagator(object):
+    """
+        Propagate N element sets over M times at once
+
+        Near earth element sets go through the vectorized SGP4 kernel, deep
+        space ones (which the kernel does not model) are computed with pyephem.
+        The pyephem engine can also be forced for every element set.
+
+        Times are pyephem dates (float days since 1899/12/31 12:00 UTC).
+        Latitudes are geocentric and elevations are heights above the WGS-84
+        ellipsoid, as reported by pyephem.
+    """
+
+    G = 6.67408e-11
+    EARTH_MASS = 5.98e24
+
+    SGP4 = 'sgp4'
+    EPHEM = 'ephem'
+
+    # Step used to derive velocity vectors from pyephem positions (days)
+    EPHEM_VELOCITY_STEP = 0.5 / 86400.0
+
+    ERROR_MESSAGES = {
+        sgp4.ERROR_ECCENTRICITY: 'eccentricity out of range',
+        sgp4.ERROR_SEMI_LATUS_RECTUM: 'semi-latus rectum out of range',
+        sgp4.ERROR_DECAYED: 'satellite has decayed',
+        sgp4.ERROR_INVALID: 'invalid TLE',
+        sgp4.ERROR_EPOCH_RANGE: 'TLE elements are valid for a few weeks '
+                                'around their epoch, the given date is too '
+                                'far from it',
+    }
+
+    def __init__(self, elements, bodies=None, lines=None):
+        """
+            elements is an array of sgp4.ELEMENTS_DTYPE, bodies an optional
+            list of already parsed pyephem satellites matching it and lines
+            the optional TLE lines the elements were read from
+        """
+        if elements.dtype != sgp4.ELEMENTS_DTYPE:
+            raise TypeError("elements must be of type sgp4.ELEMENTS_DTYPE")
+
+        if bodies is not None and len(bodies) != len(elements):
+            raise ValueError("there must be as many bodies as elements")
+
+        self.elements = elements
+        self._lines = lines
+        self._bodies = list(bodies) if bodies is not None else \
+            [None] * len(elements)
+        self._coefficients = sgp4.sgp4_init(elements)
+
+    @classmethod
+    def from_lines(cls, lines):
+        """
+            Build a propagator from a sequence of (line 1, line 2) pairs
+        """
+        lines = list(lines)
+        return cls(sgp4.parse_elements(lines), lines=lines)
+
+    @classmethod
+    def from_tles(cls, tles):
+        """
+            Build a propagator from TLE instances
+        """
+        return cls.from_lines([(tle.second_line, tle.third_line) for tle in tles])
+
+    def __len__(self):
+        return len(self.elements)
+
+    def copy(self):
+        """
+            Return a propagator sharing the elements of this one but with its
+            own pyephem bodies, so that both can be used concurrently
+        """
+        propagator = BatchPropagator.__new__(BatchPropagator)
+        propagator.elements = self.elements
+        propagator._lines = self._lines
+        propagator._coefficients = self._coefficients
+        propagator._bodies = [
+            body.copy() if body is not None else None
+            for body in self._bodies
+        ]
+
+        return propagator
+
+    def subset(self, rows):
+        """
+            Return a propagator over the given element set indices, which may
+            repeat. Already built pyephem bodies are shared with this
+            propagator.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+
+        propagator = BatchPropagator.__new__(BatchPropagator)
+        propagator.elements = self.elements[rows]
+        propagator._lines = [self._lines[row] for row in rows] \
+            if self._lines is not None else None
+        propagator._coefficients = dict(
+            (key, value[rows]) for key, value in self._coefficients.items()
+        )
+        propagator._bodies = [self._bodies[row] for row in rows]
+
+        return propagator
+
+    @property
+    def deep_space(self):
+        """
+            Mask of the element sets propagated with pyephem
+        """
+        return self._coefficients['deep_space']
+
+    def _body(self, index):
+        """
+            Return the pyephem satellite of an element set, built on demand
+        """
+        if self._bodies[index] is None and self._lines is not None:
+            line1, line2 = self._lines[index]
+            try:
+                self._bodies[index] = ephem.readtle(line1[2:7], line1, line2)
+            except ValueError:
+                pass
+
+        if self._bodies[index] is None:
+            element = self.elements[index]
+            body = ephem.EarthSatellite()
+            body._epoch = ephem.Date(element['epoch'] - frames.EPHEM_JD_OFFSET)
+            body._inc = math.degrees(element['inclination'])
+            body._raan = math.degrees(element['ascending_node'])
+            body._e = element['eccentricity']
+            body._ap = math.degrees(element['perigee_argument'])
+            body._M = math.degrees(element['mean_anomaly'])
+            body._n = element['mean_motion'] * 1440.0 / sgp4.TWOPI
+            body._drag = element['bstar']
+            self._bodies[index] = body
+
+        return self._bodies[index]
+
+    def _propagate_ephem(self, rows, dates):
+        """
+            Compute the sub-satellite points of the given rows with pyephem,
+            dates being of shape (len(rows), M)
+        """
+        shape = dates.shape
+        longitude = np.full(shape, np.nan)
+        latitude = np.full(shape, np.nan)
+        elevation = np.full(shape, np.nan)
+        error = np.zeros(shape, dtype=np.int8)
+
+        for i, row in enumerate(rows):
+            for j, date in enumerate(dates[i]):
+                longitude[i, j], latitude[i, j], elevation[i, j], error[i, j] = \
+                    self.subpoint(row, date)
+
+        return longitude, latitude, elevation, error
+
+    def subpoint(self, row, date):
+        """
+            Compute the sub-satellite point of a single element set at a
+            single date (pyephem date) with pyephem, without any array.
+            Returns the longitude and latitude (rad), the elevation (m) and
+            the error code, the values are NaN on failure.
+        """
+        if self._coefficients['invalid'][row]:
+            return math.nan, math.nan, math.nan, sgp4.ERROR_INVALID
+
+        body = self._body(row)
+        try:
+            body.compute(date)
+        except ValueError:
+            return math.nan, math.nan, math.nan, sgp4.ERROR_EPOCH_RANGE
+        except RuntimeError:
+            return math.nan, math.nan, math.nan, sgp4.ERROR_DECAYED
+
+        if math.isnan(body.elevation):
+            return math.nan, math.nan, math.nan, sgp4.ERROR_DECAYED
+
+        return body.sublong, body.sublat, body.elevation, sgp4.ERROR_NONE
+
+    def _ephem_position(self, rows, dates):
+        """
+            TEME positions (m) of the given rows computed with pyephem
+        """
+        longitude, latitude, elevation, error = \
+            self._propagate_ephem(rows, dates)
+
+        direction = np.empty(longitude.shape + (3,))
+        direction[..., 0] = np.cos(latitude) * np.cos(longitude)
+        direction[..., 1] = np.cos(latitude) * np.sin(longitude)
+        direction[..., 2] = np.sin(latitude)
+
+        # pyephem gives a geocentric direction and a geodetic height, find the
+        # distance along that direction matching the height
+        distance = frames.WGS84_A + elevation
+        for _ in range(3):
+            _, _, height = frames.ecef_to_geodetic(
+                direction * distance[..., np.newaxis]
+            )
+            distance += elevation - height
+
+        theta = frames.gmst(dates + frames.EPHEM_JD_OFFSET)
+        position = frames.ecef_to_teme(
+            direction * distance[..., np.newaxis],
+            theta
+        )
+
+        return position, (longitude, latitude, elevation), error
+
+    def propagate(self, dates, engine=SGP4, vectors=True):
+        """
+            Propagate every element set to every date
+
+            dates are either shared by every element set (M,) or given per
+            element set (N, M). Returns a dict of arrays: longitude and
+            latitude (deg), elevation (m) and circular orbital velocity (m/s)
+            of shape (N, M), TEME position (m) and velocity (m/s) vectors of
+            shape (N, M, 3), and an error code per element set (the first
+            failure found, 0 if none). Failed samples are NaN.
+
+            Without vectors, the velocity vectors of the element sets computed
+            with pyephem are not derived and left to NaN.
+        """
+        dates = np.asarray(dates, dtype=np.float64)
+        if dates.ndim < 2:
+            dates = np.atleast_1d(dates)[np.newaxis, :]
+        shape = (len(self), dates.shape[1])
+
+        longitude = np.full(shape, np.nan)
+        latitude = np.full(shape, np.nan)
+        elevation = np.full(shape, np.nan)
+        position = np.full(shape + (3,), np.nan)
+        velocity = np.full(shape + (3,), np.nan)
+        errors = np.zeros(shape, dtype=np.int8)
+
+        if engine == BatchPropagator.EPHEM:
+            ephem_rows = np.arange(len(self))
+        else:
+            ephem_rows = np.flatnonzero(self.deep_space)
+
+        sgp4_rows = np.setdiff1d(np.arange(len(self)), ephem_rows)
+
+        def rows_dates(rows):
+            if dates.shape[0] == 1:
+                return np.broadcast_to(dates, (len(rows), shape[1]))
+            return dates[rows]
+
+        if len(sgp4_rows):
+            coefficients = dict(
+                (key, value[sgp4_rows])
+                for key, value in self._coefficients.items()
+            )
+            jd = rows_dates(sgp4_rows) + frames.EPHEM_JD_OFFSET
+            r, v, e = sgp4.sgp4(coefficients, jd)
+            r *= 1000.0
+            v *= 1000.0
+
+            lon, lat, height = frames.subpoint(
+                frames.teme_to_ecef(r, frames.gmst(jd))
+            )
+
+            longitude[sgp4_rows] = lon
+            latitude[sgp4_rows] = lat
+            elevation[sgp4_rows] = height
+            position[sgp4_rows] = r
+            velocity[sgp4_rows] = v
+            errors[sgp4_rows] = e
+
+        if len(ephem_rows):
+            ephem_dates = rows_dates(ephem_rows)
+            r, subpoint, e = self._ephem_position(ephem_rows, ephem_dates)
+
+            longitude[ephem_rows] = subpoint[0]
+            latitude[ephem_rows] = subpoint[1]
+            elevation[ephem_rows] = subpoint[2]
+            position[ephem_rows] = r
+            errors[ephem_rows] = e
+
+            if vectors:
+                before, _, _ = self._ephem_position(
+                    ephem_rows,
+                    ephem_dates - BatchPropagator.EPHEM_VELOCITY_STEP
+                )
+                after, _, _ = self._ephem_position(
+                    ephem_rows,
+                    ephem_dates + BatchPropagator.EPHEM_VELOCITY_STEP
+                )
+                velocity[ephem_rows] = (after - before) / \
+                    (2.0 * BatchPropagator.EPHEM_VELOCITY_STEP * 86400.0)
+
+        failed = errors != sgp4.ERROR_NONE
+        longitude[failed] = np.nan
+        latitude[failed] = np.nan
+        elevation[failed] = np.nan
+        position[failed] = np.nan
+        velocity[failed] = np.nan
+
+        # First error of each element set, argmax fails without any date
+        if shape[1]:
+            first = np.argmax(failed, axis=1)
+            error = errors[np.arange(len(self)), first]
+        else:
+            error = np.zeros(len(self), dtype=np.int8)
+
+        return {
+            'longitude': np.degrees(longitude),
+            'latitude': np.degrees(latitude),
+            'elevation': elevation,
+            'velocity': self.orbital_velocity(elevation),
+            'position': position,
+            'velocity_vector': velocity,
+            'error': error,
+        }
+
+    @staticmethod
+    def orbital_velocity(altitude):
+        """
+            Velocity (m/s) of a circular orbit at the given altitudes (m)
+        """
+        r = np.asarray(altitude, dtype=np.float64) + ephem.earth_radius
+
+        with np.errstate(invalid='ignore'):
+            return np.sqrt((BatchPropagator.G * BatchPropagator.EARTH_MASS) / r)
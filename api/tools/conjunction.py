@@ -0,0 +1,329 @@
+"""
+    Screening of close approaches between satellites
+"""
+
+import itertools
+import math
+
+import ephem
+import numpy as np
+
+from .batch_propagator import BatchPropagator
+
+class ConjunctionScreener(object):
+    """
+        Find the close approaches between the satellites of a BatchPropagator
+
+        Positions are sampled every step seconds and hashed into a grid whose
+        cells are as large as the screening distance, the threshold plus the
+        distance two satellites can close in half a step. Only the pairs in
+        neighbouring cells are compared, then the time of closest approach
+        (TCA) of each encounter is refined with a golden section search.
+
+        The time range is split in windows which are screened independently,
+        a window only reports the encounters whose TCA falls inside it, so
+        windows can be screened in parallel.
+    """
+
+    # Miss distance (m) under which an approach is reported by default
+    default_threshold = 10000.0
+
+    # Upper bound of the relative velocity of two earth orbiting objects
+    MAX_RELATIVE_VELOCITY = 16000.0
+
+    # Seconds between two samples
+    step = 10.0
+
+    # Longest window, in steps, and maximum number of positions propagated
+    # at once which shortens it for large catalogs
+    window_steps = 360
+    max_samples = 1000000
+
+    tca_iterations = 30
+
+    # Half of the neighbouring cells, the other half is seen from the
+    # neighbours themselves
+    NEIGHBOURS = [
+        offset for offset in itertools.product((-1, 0, 1), repeat=3)
+        if offset > (0, 0, 0)
+    ]
+
+    def __init__(self, propagator, threshold=default_threshold):
+        """
+            threshold is the miss distance (m) under which an approach is
+            reported
+        """
+        self.propagator = propagator
+        self.threshold = threshold
+
+    @property
+    def screening_distance(self):
+        return self.threshold + self.MAX_RELATIVE_VELOCITY * self.step / 2.0
+
+    def windows(self, start, end):
+        """
+            Split a time range (pyephem dates) in the windows screened at
+            once, as a list of (start, end) pyephem dates
+        """
+        start = float(ephem.Date(start))
+        end = float(ephem.Date(end))
+        steps = min(
+            self.window_steps,
+            max(2, self.max_samples // max(1, len(self.propagator)))
+        )
+        length = steps * self.step / 86400.0
+
+        count = max(1, int(math.ceil((end - start) / length)))
+        bounds = [min(start + i * length, end) for i in range(count + 1)]
+
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def screen(self, start, end, primary=None):
+        """
+            Return the approaches closer than the threshold between start and
+            end (pyephem dates or datetimes), sorted by TCA. With primary,
+            only the approaches of this satellite (index in the propagator)
+            are screened.
+        """
+        windows = self.windows(start, end)
+
+        conjunctions = []
+        for i, (window_start, window_end) in enumerate(windows):
+            conjunctions.extend(self.screen_window(
+                window_start,
+                window_end,
+                primary,
+                last=i == len(windows) - 1
+            ))
+
+        return conjunctions
+
+    def screen_window(self, start, end, primary=None, last=True):
+        """
+            Screen one window, the encounters whose TCA is at its end are
+            only reported for the last window
+        """
+        step = self.step / 86400.0
+        count = int(math.ceil((end - start) / step)) + 1
+        dates = np.minimum(start + np.arange(count) * step, end)
+
+        data = self.propagator.propagate(dates, vectors=False)
+        position = data['position']
+
+        if primary is None:
+            pairs = self._grid_pairs(position)
+        else:
+            pairs = self._primary_pairs(position, primary)
+
+        conjunctions = self._refine(position, dates, pairs)
+
+        return [
+            conjunction for conjunction in conjunctions
+            if start <= conjunction['date'] < end or
+            (last and conjunction['date'] == end)
+        ]
+
+    def _grid_pairs(self, position):
+        """
+            Return the (first, second, sample) indices of the pairs of
+            satellites closer than the screening distance at a sample
+        """
+        satellites, samples = np.nonzero(~np.isnan(position[..., 0]))
+        if not len(satellites):
+            return np.empty((0, 3), dtype=np.intp)
+
+        points = position[satellites, samples]
+        distance = self.screening_distance
+
+        # Cells are padded by one on each side so that the neighbours of a
+        # cell never wrap around to another row of the grid
+        cells = np.floor(points / distance).astype(np.int64)
+        cells -= cells.min(axis=0) - 1
+        width = cells.max(axis=0) + 2
+
+        strides = np.array([width[1] * width[2], width[2], 1], dtype=np.int64)
+        sample_stride = width[0] * strides[0]
+        keys = samples * sample_stride + np.dot(cells, strides)
+
+        order = np.argsort(keys, kind='mergesort')
+        keys = keys[order]
+
+        # Occupied cells and the range of sorted points each one holds
+        boundaries = np.flatnonzero(np.diff(keys)) + 1
+        cell_start = np.r_[0, boundaries]
+        cell_end = np.r_[boundaries, len(keys)]
+        cell_keys = keys[cell_start]
+        cell = np.repeat(np.arange(len(cell_keys)), cell_end - cell_start)
+
+        firsts = []
+        seconds = []
+        for offset in [(0, 0, 0)] + self.NEIGHBOURS:
+            if offset == (0, 0, 0):
+                # Each pair of the same cell only once
+                low = np.arange(1, len(keys) + 1)
+                high = cell_end[cell]
+            else:
+                target = cell_keys + np.dot(offset, strides)
+                index = np.minimum(
+                    np.searchsorted(cell_keys, target),
+                    len(cell_keys) - 1
+                )
+                found = cell_keys[index] == target
+                low = np.where(found, cell_start[index], 0)[cell]
+                high = np.where(found, cell_end[index], 0)[cell]
+
+            counts = high - low
+            counts[counts < 0] = 0
+            first = np.repeat(np.arange(len(keys)), counts)
+            second = np.repeat(low - np.cumsum(counts) + counts, counts) + \
+                np.arange(len(first))
+
+            firsts.append(order[first])
+            seconds.append(order[second])
+
+        first = np.concatenate(firsts)
+        second = np.concatenate(seconds)
+
+        gap = points[first] - points[second]
+        close = np.einsum('ij,ij->i', gap, gap) < distance * distance
+        first = first[close]
+        second = second[close]
+
+        # Same object twice, through duplicated element sets
+        different = satellites[first] != satellites[second]
+        first = first[different]
+        second = second[different]
+
+        pairs = np.stack([satellites[first], satellites[second], samples[first]], axis=1)
+        swap = pairs[:, 0] > pairs[:, 1]
+        pairs[swap, :2] = pairs[swap, 1::-1]
+
+        return pairs
+
+    def _primary_pairs(self, position, primary):
+        """
+            Return the (first, second, sample) indices of the satellites
+            closer than the screening distance to the primary at a sample
+        """
+        gap = position - position[primary]
+        with np.errstate(invalid='ignore'):
+            close = np.einsum('ijk,ijk->ij', gap, gap) < \
+                self.screening_distance ** 2
+        close[primary] = False
+
+        satellites, samples = np.nonzero(close)
+        first = np.minimum(satellites, primary)
+        second = np.maximum(satellites, primary)
+
+        return np.stack([first, second, samples], axis=1)
+
+    def _refine(self, position, dates, pairs):
+        """
+            Group the close samples of each pair in encounters and refine
+            their time of closest approach
+        """
+        if not len(pairs):
+            return []
+
+        pairs = pairs[np.lexsort((pairs[:, 2], pairs[:, 1], pairs[:, 0]))]
+
+        # An encounter is a run of consecutive close samples of a pair
+        new = np.ones(len(pairs), dtype=bool)
+        new[1:] = (
+            (pairs[1:, 0] != pairs[:-1, 0]) |
+            (pairs[1:, 1] != pairs[:-1, 1]) |
+            (pairs[1:, 2] != pairs[:-1, 2] + 1)
+        )
+        encounter = np.cumsum(new) - 1
+
+        gap = position[pairs[:, 0], pairs[:, 2]] - position[pairs[:, 1], pairs[:, 2]]
+        distance = np.sqrt(np.einsum('ij,ij->i', gap, gap))
+
+        # Closest sample of each encounter
+        order = np.lexsort((distance, encounter))
+        closest = order[np.r_[True, np.diff(encounter[order]) != 0]]
+
+        first = pairs[closest, 0]
+        second = pairs[closest, 1]
+        sample = dates[pairs[closest, 2]]
+
+        step = self.step / 86400.0
+        firsts = self.propagator.subset(first)
+        seconds = self.propagator.subset(second)
+
+        tca = self._closest_approach(firsts, seconds, sample - step, sample + step)
+
+        first_data = firsts.propagate(tca[:, np.newaxis])
+        second_data = seconds.propagate(tca[:, np.newaxis])
+
+        gap = first_data['position'][:, 0] - second_data['position'][:, 0]
+        miss = np.sqrt(np.einsum('ij,ij->i', gap, gap))
+
+        velocity = first_data['velocity_vector'][:, 0] - \
+            second_data['velocity_vector'][:, 0]
+        relative_velocity = np.sqrt(np.einsum('ij,ij->i', velocity, velocity))
+
+        conjunctions = []
+        for i in np.flatnonzero(miss <= self.threshold):
+            conjunctions.append({
+                'first': int(first[i]),
+                'second': int(second[i]),
+                'date': tca[i],
+                'tca': ephem.Date(tca[i]).datetime(),
+                'miss_distance': float(miss[i]),
+                'relative_velocity': float(relative_velocity[i]),
+            })
+
+        conjunctions.sort(key=lambda c: (c['date'], c['first'], c['second']))
+
+        return conjunctions
+
+    def _distance(self, firsts, seconds, dates):
+        """
+            Distance between the satellites of two propagators at the given
+            dates, one per satellite
+        """
+        dates = dates[:, np.newaxis]
+        gap = firsts.propagate(dates, vectors=False)['position'][:, 0] - \
+            seconds.propagate(dates, vectors=False)['position'][:, 0]
+
+        distance = np.sqrt(np.einsum('ij,ij->i', gap, gap))
+        distance[np.isnan(distance)] = np.inf
+
+        return distance
+
+    def _closest_approach(self, firsts, seconds, a, b):
+        """
+            Golden section search of the minimum distance between the
+            satellites of two propagators within [a, b]
+        """
+        ratio = (math.sqrt(5.0) - 1.0) / 2.0
+
+        c = b - ratio * (b - a)
+        d = a + ratio * (b - a)
+        fc = self._distance(firsts, seconds, c)
+        fd = self._distance(firsts, seconds, d)
+
+        for _ in range(self.tca_iterations):
+            left = fc < fd
+            b = np.where(left, d, b)
+            a = np.where(left, a, c)
+
+            point = np.where(left, b - ratio * (b - a), a + ratio * (b - a))
+            value = self._distance(firsts, seconds, point)
+
+            c, d = np.where(left, point, d), np.where(left, c, point)
+            fc, fd = np.where(left, value, fd), np.where(left, fc, value)
+
+        return (a + b) / 2.0
+
+
+def screen_window(lines, threshold, step, primary, window, last):
+    """
+        Screen one window of a time range from TLE lines, to be used by
+        worker processes
+    """
+    screener = ConjunctionScreener(BatchPropagator.from_lines(lines), threshold)
+    screener.step = step
+
+    return screener.screen_window(window[0], window[1], primary, last)
@@ -0,0 +1,49 @@
+"""
+    Per process copy of the generation of the data served by the API
+"""
+
+import threading
+import time as clock
+
+from django.conf import settings
+
+from catalog.models import Generation
+
+class DataGeneration(object):
+    """
+        Value of a generation counter and time of its last bump, read from
+        the database at most every API_GENERATION_REFRESH_INTERVAL seconds
+
+        A response computed from the data of a generation stays correct
+        until the counter is bumped by the next import.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+        self._state = None
+        self._checked = None
+        self._lock = threading.Lock()
+
+    def state(self):
+        """
+            Return the (value, last bump time) of the counter
+        """
+        with self._lock:
+            if self._checked is None or clock.monotonic() - self._checked >= \
+                    settings.API_GENERATION_REFRESH_INTERVAL:
+                self._state = Generation.objects.state(self.name)
+                self._checked = clock.monotonic()
+
+            return self._state
+
+    def clear(self):
+        """
+            Forget the counter, the next call reads it again
+        """
+        with self._lock:
+            self._state = None
+            self._checked = None
+
+
+data_generation = DataGeneration(Generation.DATA)
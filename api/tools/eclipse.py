@@ -0,0 +1,182 @@
+"""
+    Sunlight and eclipse state of satellites
+
+    The shadow of the earth is modelled as a cone: the sun and the earth are
+    seen from the satellite as two disks, the satellite being in umbra when
+    the earth hides the whole sun and in penumbra when it hides a part of it.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from . import frames
+from .batch_propagator import BatchPropagator
+
+SUNLIT = 0
+PENUMBRA = 1
+UMBRA = 2
+
+STATES = ('sunlit', 'penumbra', 'umbra')
+
+ASTRONOMICAL_UNIT = 149597870700.0
+SUN_RADIUS = 696000000.0
+EARTH_RADIUS = frames.WGS84_A
+
+
+def sun_position(jd):
+    """
+        Geocentric position (..., 3) of the sun in meters, in the equatorial
+        frame of date, at the given julian dates
+
+        Low precision solar coordinates (about 0.01 deg), the direction of the
+        sun barely changes during the time a satellite takes to cross the
+        shadow so this is enough for the eclipse geometry.
+    """
+    t = (np.asarray(jd, dtype=np.float64) - 2451545.0) / 36525.0
+
+    mean_longitude = np.radians(280.460 + 36000.771 * t)
+    anomaly = np.radians(357.5291092 + 35999.05034 * t)
+
+    longitude = mean_longitude + np.radians(
+        1.914666471 * np.sin(anomaly) + 0.019994643 * np.sin(2.0 * anomaly)
+    )
+    distance = ASTRONOMICAL_UNIT * (
+        1.000140612 - 0.016708617 * np.cos(anomaly) -
+        0.000139589 * np.cos(2.0 * anomaly)
+    )
+    obliquity = np.radians(23.439291 - 0.0130042 * t)
+
+    position = np.empty(t.shape + (3,))
+    position[..., 0] = distance * np.cos(longitude)
+    position[..., 1] = distance * np.cos(obliquity) * np.sin(longitude)
+    position[..., 2] = distance * np.sin(obliquity) * np.sin(longitude)
+
+    return position
+
+
+def shadow(position, sun):
+    """
+        Eclipse state and fraction of the solar disk visible of satellites
+        at the given positions (..., 3), sun being the matching (broadcastable)
+        positions of the sun, both geocentric in meters
+    """
+    to_sun = sun - position
+    sun_distance = np.sqrt(np.einsum('...i,...i->...', to_sun, to_sun))
+    earth_distance = np.sqrt(np.einsum('...i,...i->...', position, position))
+
+    # Apparent radii of the two disks and distance between their centers
+    a = np.arcsin(np.minimum(SUN_RADIUS / sun_distance, 1.0))
+    b = np.arcsin(np.minimum(EARTH_RADIUS / earth_distance, 1.0))
+    c = np.arccos(np.clip(
+        -np.einsum('...i,...i->...', position, to_sun) /
+        (earth_distance * sun_distance),
+        -1.0,
+        1.0
+    ))
+
+    # Area of the part of the sun hidden by the earth
+    partial = (np.abs(a - b) < c) & (c < a + b)
+    hidden = np.zeros(c.shape)
+
+    ap, bp, cp = a[partial], b[partial], c[partial]
+    hidden[partial] = \
+        ap ** 2 * np.arccos((cp ** 2 + ap ** 2 - bp ** 2) / (2.0 * cp * ap)) + \
+        bp ** 2 * np.arccos((cp ** 2 + bp ** 2 - ap ** 2) / (2.0 * cp * bp)) - \
+        0.5 * np.sqrt(
+            (-cp + ap + bp) * (cp + ap - bp) * (cp - ap + bp) * (cp + ap + bp)
+        )
+
+    inside = c <= np.abs(a - b)
+    hidden[inside] = math.pi * np.minimum(a, b)[inside] ** 2
+
+    sunlight = 1.0 - hidden / (math.pi * a ** 2)
+
+    state = np.full(c.shape, PENUMBRA, dtype=np.int8)
+    state[c >= a + b] = SUNLIT
+    state[inside & (b >= a)] = UMBRA
+
+    return state, sunlight
+
+
+class SolarEphemeris(object):
+    """
+        Bounded cache of the sun positions, computed per time bin
+
+        Dates are rounded to bin_size seconds, the sun moving by less than a
+        thousandth of a degree during a minute. Requests for many satellites
+        at the same times share their solar positions.
+    """
+
+    bin_size = 60.0
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self._positions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._positions)
+
+    def get(self, dates):
+        """
+            Positions (..., 3) of the sun at the given pyephem dates
+        """
+        dates = np.asarray(dates, dtype=np.float64)
+        bins = np.round(dates * (86400.0 / self.bin_size)).astype(np.int64)
+        unique, inverse = np.unique(bins, return_inverse=True)
+
+        keys = unique.tolist()
+        positions = np.empty((len(keys), 3))
+        missing = []
+
+        # Cached positions are copied at once, other threads may evict them
+        # before the missing ones are computed
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in self._positions:
+                    positions[i] = self._positions[key]
+                    self._positions.move_to_end(key)
+                else:
+                    missing.append(i)
+
+        if missing:
+            positions[missing] = sun_position(
+                unique[missing].astype(np.float64) * (self.bin_size / 86400.0) +
+                frames.EPHEM_JD_OFFSET
+            )
+
+            with self._lock:
+                for i in missing:
+                    self._positions[keys[i]] = positions[i].copy()
+
+                while len(self._positions) > self.max_size:
+                    self._positions.popitem(last=False)
+
+        return positions[inverse].reshape(dates.shape + (3,))
+
+
+solar_ephemeris = SolarEphemeris()
+
+
+def eclipse(propagator, dates, engine=BatchPropagator.SGP4):
+    """
+        Eclipse state and visible fraction of the sun (N, M) of the element
+        sets of a propagator at the given dates, (M,) or (N, M). Samples
+        which can't be computed have a state of -1 and a NaN fraction.
+        Returns the states, the fractions and the error code of each element
+        set.
+    """
+    data = propagator.propagate(dates, engine, vectors=False)
+    sun = solar_ephemeris.get(dates)
+
+    with np.errstate(invalid='ignore'):
+        state, sunlight = shadow(data['position'], sun)
+
+    failed = np.isnan(data['position'][..., 0])
+    state[failed] = -1
+    sunlight[failed] = np.nan
+
+    return state, sunlight, data['error']
@@ -0,0 +1,129 @@
+"""
+    Per process cache of parsed TLEs
+"""
+
+import threading
+from collections import OrderedDict
+
+import ephem
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from catalog.models import TLE
+from .batch_propagator import BatchPropagator
+from .sgp4 import parse_elements
+
+class EphemerisCache(object):
+    """
+        Bounded LRU cache of propagators built from TLEs, keyed by TLE id
+
+        A TLE row never changes once imported, so an entry can't go stale,
+        entries of a satellite are only dropped when a newer TLE is saved
+        because they are unlikely to be used again. Every hit returns a copy
+        of the cached propagator with its own pyephem body, which makes it
+        safe to use from several threads.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, tle_id):
+        return tle_id in self._entries
+
+    def parse(self, tle):
+        """
+            Build the propagator of a TLE, raises TypeError if the TLE can't
+            be read
+        """
+        body = ephem.readtle(tle.first_line, tle.second_line, tle.third_line)
+        lines = [(tle.second_line, tle.third_line)]
+
+        return BatchPropagator(parse_elements(lines), bodies=[body], lines=lines)
+
+    def get(self, tle):
+        """
+            Return a propagator for the given TLE, parsing it on a miss
+        """
+        if tle.id is None:
+            return self.parse(tle)
+
+        with self._lock:
+            entry = self._entries.get(tle.id)
+            if entry is not None:
+                self._entries.move_to_end(tle.id)
+                self.hits += 1
+                return entry[1].copy()
+
+            self.misses += 1
+
+        # Parse outside of the lock, two threads may parse the same TLE at
+        # worst
+        propagator = self.parse(tle)
+
+        with self._lock:
+            self._entries[tle.id] = (tle.satellite_number_id, propagator)
+            self._entries.move_to_end(tle.id)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return propagator.copy()
+
+    def invalidate(self, satellite_number=None, tle_id=None):
+        """
+            Drop the entries of a satellite or of a TLE, everything if no
+            argument is given
+        """
+        with self._lock:
+            if satellite_number is None and tle_id is None:
+                self._entries.clear()
+                return
+
+            for key, (satellite, _) in list(self._entries.items()):
+                if key == tle_id or (satellite_number is not None and
+                                     satellite == satellite_number):
+                    del self._entries[key]
+
+    def stats(self):
+        """
+            Return the counters of the cache
+        """
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+ephemeris_cache = EphemerisCache(settings.EPHEMERIS_CACHE_SIZE)
+
+
+@receiver(post_save, sender=TLE)
+def invalidate_satellite(sender, instance, created, **kwargs):
+    """
+        A new TLE supersedes the cached ones of its satellite
+    """
+    if created:
+        ephemeris_cache.invalidate(
+            satellite_number=instance.satellite_number_id,
+            tle_id=instance.id
+        )
+
+
+@receiver(post_delete, sender=TLE)
+def invalidate_tle(sender, instance, **kwargs):
+    ephemeris_cache.invalidate(tle_id=instance.id)
@@ -0,0 +1,390 @@
+"""
+    Precomputed ephemeris tiles
+
+    The TEME position of each satellite over a time window is stored as
+    Chebyshev polynomial coefficients on segments of equal length, in a
+    binary file which is memory mapped by the processes answering queries.
+    A position is then a polynomial evaluation instead of a propagation.
+"""
+
+import math
+import os
+import tempfile
+import threading
+import time
+
+import ephem
+import numpy as np
+from django.conf import settings
+
+from . import frames
+from .batch_propagator import BatchPropagator
+
+MAGIC = b'SATTILES'
+VERSION = 1
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('degree', '<u4'),
+    ('count', '<u8'),
+    ('segments', '<u8'),
+    ('accuracy', '<f8'),
+    ('created', '<f8'),
+])
+
+# One entry per satellite, start and length (of a segment) are pyephem dates
+# and days, offset is the index of its first segment and error the largest
+# interpolation error (m) measured while fitting
+INDEX_DTYPE = np.dtype([
+    ('tle', '<i8'),
+    ('satellite', 'S5'),
+    ('start', '<f8'),
+    ('length', '<f8'),
+    ('segments', '<u4'),
+    ('offset', '<u8'),
+    ('error', '<f8'),
+])
+
+
+def chebyshev_nodes(degree):
+    """
+        Chebyshev nodes of the first kind on [-1, 1]
+    """
+    return np.cos(math.pi * (np.arange(degree + 1) + 0.5) / (degree + 1))
+
+
+def chebyshev_terms(x, degree):
+    """
+        Chebyshev polynomials T0 to Tdegree evaluated at x (..., degree + 1)
+    """
+    angle = np.arccos(np.clip(x, -1.0, 1.0))
+
+    return np.cos(angle[..., np.newaxis] * np.arange(degree + 1))
+
+
+class EphemerisTiles(object):
+    """
+        Read only access to a tiles file
+    """
+
+    def __init__(self, path):
+        header = np.memmap(path, dtype=HEADER_DTYPE, mode='r', shape=(1,))[0]
+
+        if header['magic'] != MAGIC or header['version'] != VERSION:
+            raise ValueError('not an ephemeris tiles file')
+
+        self.path = path
+        self.degree = int(header['degree'])
+        self.accuracy = float(header['accuracy'])
+        self.created = float(header['created'])
+
+        offset = HEADER_DTYPE.itemsize
+        count = int(header['count'])
+        self.index = np.memmap(
+            path,
+            dtype=INDEX_DTYPE,
+            mode='r',
+            offset=offset,
+            shape=(count,)
+        ) if count else np.empty(0, dtype=INDEX_DTYPE)
+
+        offset += INDEX_DTYPE.itemsize * count
+        segments = int(header['segments'])
+        self.coefficients = np.memmap(
+            path,
+            dtype='<f8',
+            mode='r',
+            offset=offset,
+            shape=(segments, self.degree + 1, 3)
+        ) if segments else np.empty((0, self.degree + 1, 3))
+
+        # Plain copies of the index, reading the map for every lookup is slow
+        self._entries = dict(
+            (entry[0], entry[1:]) for entry in zip(
+                self.index['tle'].tolist(),
+                self.index['start'].tolist(),
+                self.index['length'].tolist(),
+                self.index['segments'].tolist(),
+                self.index['offset'].tolist(),
+            )
+        )
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, tle_id):
+        return tle_id in self._entries
+
+    def position(self, tle_id, dates):
+        """
+            Interpolated TEME positions (M, 3) of a TLE at the given pyephem
+            dates, None if the TLE or one of the dates is not covered
+        """
+        entry = self._entries.get(tle_id)
+        if entry is None:
+            return None
+
+        start, length, segments, first = entry
+        dates = np.atleast_1d(np.asarray(dates, dtype=np.float64))
+
+        offset = (dates - start) / length
+        segment = np.floor(offset).astype(np.intp)
+
+        # The end of the window belongs to the last segment
+        last = segments - 1
+        segment[(segment == last + 1) & (offset == last + 1)] = last
+
+        if segment.min() < 0 or segment.max() > last:
+            return None
+
+        x = 2.0 * (offset - segment) - 1.0
+        coefficients = self.coefficients[first + segment]
+
+        return np.einsum(
+            'mi,mik->mk',
+            chebyshev_terms(x, self.degree),
+            coefficients
+        )
+
+    def compute(self, tle_id, date):
+        """
+            Same data as SatelliteComputation.compute(), from the tiles, None
+            if the date is not covered
+        """
+        date = float(ephem.Date(date))
+        position = self.position(tle_id, [date])
+        if position is None:
+            return None
+
+        theta = frames.gmst(date + frames.EPHEM_JD_OFFSET)
+        longitude, latitude, elevation = frames.subpoint(
+            frames.teme_to_ecef(position[0], theta)
+        )
+
+        return {
+            'longitude': math.degrees(longitude),
+            'latitude': math.degrees(latitude),
+            'elevation': float(elevation),
+            'velocity': float(BatchPropagator.orbital_velocity(elevation)),
+        }
+
+
+class EphemerisTilesBuilder(object):
+    """
+        Fit the tiles of a propagator over a time window
+
+        Each satellite starts with one segment per orbital period, the
+        interpolation error is measured between the fitting nodes and at the
+        segment ends, and the segments of the satellites above the accuracy
+        bound are halved until it is met. Satellites which can't be computed
+        over the whole window, or which need segments shorter than
+        min_length, are left out.
+    """
+
+    degree = 15
+
+    # Shortest segment (days)
+    min_length = 60.0 / 86400.0
+
+    # Maximum number of samples propagated at once
+    max_samples = 500000
+
+    def __init__(self, propagator, accuracy):
+        """
+            accuracy is the largest interpolation error (m) allowed
+        """
+        self.propagator = propagator
+        self.accuracy = accuracy
+
+        nodes = chebyshev_nodes(self.degree)
+        self._nodes = nodes
+
+        # Coefficients are the product of this matrix with the node values
+        terms = chebyshev_terms(nodes, self.degree)
+        self._fit = 2.0 * terms.T / (self.degree + 1)
+        self._fit[0] /= 2.0
+
+        # Extrema of the last polynomial, ends included
+        self._checks = np.cos(
+            math.pi * np.arange(self.degree + 2) / (self.degree + 1)
+        )
+        self._check_terms = chebyshev_terms(self._checks, self.degree)
+
+    def fit(self, start, end):
+        """
+            Fit every satellite over [start, end] (pyephem dates), returns a
+            dict of (largest error, coefficients (segments, degree + 1, 3))
+            keyed by the rows of the fitted satellites in the propagator
+        """
+        duration = end - start
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            period = 2.0 * math.pi / self.propagator.elements['mean_motion'] / 1440.0
+            segments = np.ceil(duration / period)
+        segments[~np.isfinite(segments)] = 1
+        segments = np.maximum(segments, 1).astype(np.int64)
+
+        fitted = {}
+        pending = np.arange(len(self.propagator))
+        while len(pending):
+            too_short = duration / segments[pending] < self.min_length
+            pending = pending[~too_short]
+
+            failed = []
+            for count in np.unique(segments[pending]):
+                rows = pending[segments[pending] == count]
+
+                samples = count * (2 * self.degree + 3)
+                chunk = max(1, self.max_samples // samples)
+                for first in range(0, len(rows), chunk):
+                    group = rows[first:first + chunk]
+                    errors, coefficients = self._fit_rows(group, start, end, count)
+
+                    for row, error, values in zip(group, errors, coefficients):
+                        if error <= self.accuracy:
+                            fitted[int(row)] = (error, values)
+                        elif np.isfinite(error):
+                            failed.append(row)
+
+            pending = np.array(failed, dtype=np.intp)
+            segments[pending] *= 2
+
+        return fitted
+
+    def _fit_rows(self, rows, start, end, count):
+        """
+            Fit some satellites with count segments each, returns their
+            largest interpolation error and their coefficients (count,
+            degree + 1, 3). The error is NaN if they can't be computed.
+        """
+        length = (end - start) / count
+        origins = start + np.arange(count) * length
+
+        nodes = origins[:, np.newaxis] + (self._nodes + 1.0) / 2.0 * length
+        checks = origins[:, np.newaxis] + (self._checks + 1.0) / 2.0 * length
+        dates = np.concatenate([nodes.ravel(), checks.ravel()])
+
+        data = self.propagator.subset(rows).propagate(dates, vectors=False)
+        position = data['position']
+        split = nodes.size
+
+        values = position[:, :split].reshape(len(rows), count, self.degree + 1, 3)
+        expected = position[:, split:].reshape(len(rows), count, self.degree + 2, 3)
+
+        coefficients = np.einsum('ij,nsjk->nsik', self._fit, values)
+        interpolated = np.einsum('cj,nsjk->nsck', self._check_terms, coefficients)
+
+        gap = interpolated - expected
+        with np.errstate(invalid='ignore'):
+            errors = np.sqrt(np.einsum('nsck,nsck->nsc', gap, gap))
+            errors = errors.reshape(len(rows), -1).max(axis=1)
+        errors[data['error'] != 0] = np.nan
+
+        return errors, coefficients
+
+
+def write_tiles(path, tles, propagator, start, end, accuracy):
+    """
+        Fit the tiles of some TLEs, given as a list of (satellite number,
+        TLE id) matching the propagator rows, and atomically replace the
+        tiles file. Returns the number of satellites written.
+    """
+    start = float(ephem.Date(start))
+    end = float(ephem.Date(end))
+
+    builder = EphemerisTilesBuilder(propagator, accuracy)
+    fitted = builder.fit(start, end)
+
+    rows = sorted(fitted)
+    index = np.zeros(len(rows), dtype=INDEX_DTYPE)
+    coefficients = []
+    offset = 0
+    for i, row in enumerate(rows):
+        error, values = fitted[row]
+
+        index[i]['satellite'] = tles[row][0].encode('ascii')
+        index[i]['tle'] = tles[row][1]
+        index[i]['start'] = start
+        index[i]['length'] = (end - start) / len(values)
+        index[i]['segments'] = len(values)
+        index[i]['offset'] = offset
+        index[i]['error'] = error
+
+        coefficients.append(values)
+        offset += len(values)
+
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header['magic'] = MAGIC
+    header['version'] = VERSION
+    header['degree'] = builder.degree
+    header['count'] = len(index)
+    header['segments'] = offset
+    header['accuracy'] = accuracy
+    header['created'] = time.time()
+
+    # Readers map the file, it is replaced rather than rewritten
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as output:
+            output.write(header.tobytes())
+            output.write(index.tobytes())
+            for values in coefficients:
+                output.write(values.astype('<f8').tobytes())
+        os.replace(temporary, path)
+    except:
+        os.unlink(temporary)
+        raise
+
+    return len(index)
+
+
+class EphemerisTilesLoader(object):
+    """
+        Give access to the tiles file of the settings, reloading it when it
+        is replaced. The file is checked at most every check_interval
+        seconds.
+    """
+
+    check_interval = 10.0
+
+    def __init__(self):
+        self._tiles = None
+        self._key = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+            Return the current tiles, None if there are none
+        """
+        path = settings.EPHEMERIS_TILES_PATH
+        if path is None:
+            return None
+
+        now = time.time()
+        if self._key is not None and self._key[0] == path and \
+           now - self._checked < self.check_interval:
+            return self._tiles
+
+        with self._lock:
+            self._checked = now
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self._tiles, self._key = None, (path, None)
+                return None
+
+            key = (path, stat.st_mtime, stat.st_ino, stat.st_size)
+            if key != self._key:
+                try:
+                    self._tiles = EphemerisTiles(path)
+                except ValueError:
+                    self._tiles = None
+                self._key = key
+
+            return self._tiles
+
+
+ephemeris_tiles = EphemerisTilesLoader()
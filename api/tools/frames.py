@@ -0,0 +1,258 @@
+"""
+    Reference frame conversions working on NumPy arrays
+"""
+
+import math
+
+import numpy as np
+
+# WGS-84 ellipsoid, in meters
+WGS84_A = 6378137.0
+WGS84_F = 1.0 / 298.257223563
+WGS84_E2 = WGS84_F * (2.0 - WGS84_F)
+
+# Difference between the julian date and the pyephem date
+EPHEM_JD_OFFSET = 2415020.0
+
+# Rotation rate of the earth (rad/s)
+EARTH_ROTATION = 7.292115146706979e-5
+
+# Frames a state vector can be expressed in
+STATE_FRAMES = ('teme', 'ecef', 'geodetic')
+
+
+def gmst(jd):
+    """
+        Greenwich mean sidereal time (rad) of the given UT1 julian dates
+    """
+    jd = np.asarray(jd, dtype=np.float64)
+    tut1 = (jd - 2451545.0) / 36525.0
+
+    seconds = (-6.2e-6 * tut1 ** 3 + 0.093104 * tut1 ** 2 +
+               (876600.0 * 3600.0 + 8640184.812866) * tut1 + 67310.54841)
+
+    return np.mod(np.radians(seconds / 240.0), 2.0 * math.pi)
+
+
+class EarthRotation(object):
+    """
+        Rotation between TEME and the earth fixed frame at M timestamps
+
+        The sidereal times and their sines and cosines are computed once,
+        then shared by every satellite converted at these timestamps. Arrays
+        of vectors are (..., M, 3).
+    """
+
+    def __init__(self, theta):
+        """
+            theta are the sidereal times (M,) of the timestamps
+        """
+        self.theta = np.asarray(theta, dtype=np.float64)
+        self.cos = np.cos(self.theta)
+        self.sin = np.sin(self.theta)
+
+    @classmethod
+    def from_dates(cls, dates):
+        """
+            Build the rotation of the given pyephem dates
+        """
+        return cls(gmst(np.asarray(dates, dtype=np.float64) + EPHEM_JD_OFFSET))
+
+    def _rotate(self, vectors, sin):
+        rotated = np.empty_like(vectors)
+        rotated[..., 0] = self.cos * vectors[..., 0] + sin * vectors[..., 1]
+        rotated[..., 1] = -sin * vectors[..., 0] + self.cos * vectors[..., 1]
+        rotated[..., 2] = vectors[..., 2]
+
+        return rotated
+
+    def to_ecef(self, position):
+        """
+            Rotate TEME positions to the earth fixed frame
+        """
+        return self._rotate(position, self.sin)
+
+    def to_teme(self, position):
+        """
+            Rotate earth fixed positions back to TEME
+        """
+        return self._rotate(position, -self.sin)
+
+    def velocity_to_ecef(self, velocity, ecef):
+        """
+            Convert TEME velocities to earth fixed ones, ecef being the earth
+            fixed positions of the samples
+        """
+        velocity = self._rotate(velocity, self.sin)
+        velocity[..., 0] += EARTH_ROTATION * ecef[..., 1]
+        velocity[..., 1] -= EARTH_ROTATION * ecef[..., 0]
+
+        return velocity
+
+    def velocity_to_teme(self, velocity, ecef):
+        """
+            Convert earth fixed velocities back to TEME ones, ecef being the
+            earth fixed positions of the samples
+        """
+        velocity = velocity.copy()
+        velocity[..., 0] -= EARTH_ROTATION * ecef[..., 1]
+        velocity[..., 1] += EARTH_ROTATION * ecef[..., 0]
+
+        return self._rotate(velocity, -self.sin)
+
+
+def teme_to_ecef(position, theta):
+    """
+        Rotate TEME positions (..., M, 3) to the earth fixed frame, theta
+        being the sidereal times (M,) of the samples
+    """
+    return EarthRotation(theta).to_ecef(position)
+
+
+def teme_velocity_to_ecef(velocity, ecef, theta):
+    """
+        Convert TEME velocities (..., M, 3) to earth fixed ones, ecef being
+        the earth fixed positions of the samples
+    """
+    return EarthRotation(theta).velocity_to_ecef(velocity, ecef)
+
+
+def ecef_to_teme(position, theta):
+    """
+        Rotate earth fixed positions (..., M, 3) back to TEME
+    """
+    return EarthRotation(theta).to_teme(position)
+
+
+def ecef_to_geodetic(position):
+    """
+        Convert earth fixed positions (m) to WGS-84 geodetic coordinates
+
+        Returns (longitude, latitude, height) in rad, rad and meters
+    """
+    x = position[..., 0]
+    y = position[..., 1]
+    z = position[..., 2]
+
+    longitude = np.arctan2(y, x)
+    p = np.hypot(x, y)
+
+    # Bowring's method, two iterations are more than enough for orbits
+    latitude = np.arctan2(z, p * (1.0 - WGS84_E2))
+    for _ in range(2):
+        sin_lat = np.sin(latitude)
+        n = WGS84_A / np.sqrt(1.0 - WGS84_E2 * sin_lat * sin_lat)
+        latitude = np.arctan2(z + WGS84_E2 * n * sin_lat, p)
+
+    sin_lat = np.sin(latitude)
+    cos_lat = np.cos(latitude)
+    n = WGS84_A / np.sqrt(1.0 - WGS84_E2 * sin_lat * sin_lat)
+    height = p * cos_lat + z * sin_lat - WGS84_A * WGS84_A / n
+
+    return longitude, latitude, height
+
+
+def subpoint(position):
+    """
+        Longitude, geocentric latitude (rad) and height above the ellipsoid
+        (m) of earth fixed positions, as reported by pyephem
+    """
+    longitude, _, height = ecef_to_geodetic(position)
+    latitude = np.arctan2(
+        position[..., 2],
+        np.hypot(position[..., 0], position[..., 1])
+    )
+
+    return longitude, latitude, height
+
+
+def enu_rotation(longitude, latitude):
+    """
+        Rotation matrices (..., 3, 3) from the earth fixed frame to the local
+        east, north, up frame of the given geodetic coordinates (rad)
+    """
+    sin_lon = np.sin(longitude)
+    cos_lon = np.cos(longitude)
+    sin_lat = np.sin(latitude)
+    cos_lat = np.cos(latitude)
+
+    rotation = np.empty(np.shape(sin_lon) + (3, 3))
+    rotation[..., 0, 0] = -sin_lon
+    rotation[..., 0, 1] = cos_lon
+    rotation[..., 0, 2] = 0.0
+    rotation[..., 1, 0] = -sin_lat * cos_lon
+    rotation[..., 1, 1] = -sin_lat * sin_lon
+    rotation[..., 1, 2] = cos_lat
+    rotation[..., 2, 0] = cos_lat * cos_lon
+    rotation[..., 2, 1] = cos_lat * sin_lon
+    rotation[..., 2, 2] = sin_lat
+
+    return rotation
+
+
+def ecef_to_enu_velocity(velocity, longitude, latitude):
+    """
+        Local east, north and up components (..., 3) of earth fixed
+        velocities, at the given geodetic coordinates (rad)
+    """
+    return np.einsum(
+        '...ij,...j->...i',
+        enu_rotation(longitude, latitude),
+        velocity
+    )
+
+
+def geodetic_to_ecef(longitude, latitude, height):
+    """
+        Convert WGS-84 geodetic coordinates (rad, rad, m) to earth fixed
+        positions (m)
+    """
+    longitude = np.asarray(longitude, dtype=np.float64)
+    latitude = np.asarray(latitude, dtype=np.float64)
+    height = np.asarray(height, dtype=np.float64)
+
+    sin_lat = np.sin(latitude)
+    cos_lat = np.cos(latitude)
+    n = WGS84_A / np.sqrt(1.0 - WGS84_E2 * sin_lat * sin_lat)
+
+    shape = np.broadcast(longitude, latitude, height).shape
+    position = np.empty(shape + (3,))
+    position[..., 0] = (n + height) * cos_lat * np.cos(longitude)
+    position[..., 1] = (n + height) * cos_lat * np.sin(longitude)
+    position[..., 2] = (n * (1.0 - WGS84_E2) + height) * sin_lat
+
+    return position
+
+
+def state_vectors(position, velocity, earth, names=STATE_FRAMES):
+    """
+        Express TEME positions and velocities (..., M, 3) in the requested
+        frames, earth being the EarthRotation of the M timestamps
+
+        Returns a dict keyed by frame name. The teme and ecef entries are
+        (position, velocity) pairs, the geodetic one is a tuple of longitude,
+        geodetic latitude (rad), height (m) and local east, north and up
+        velocity (..., M, 3).
+    """
+    states = {}
+
+    if 'teme' in names:
+        states['teme'] = (position, velocity)
+
+    if 'ecef' in names or 'geodetic' in names:
+        ecef = earth.to_ecef(position)
+        ecef_velocity = earth.velocity_to_ecef(velocity, ecef)
+
+        if 'ecef' in names:
+            states['ecef'] = (ecef, ecef_velocity)
+
+        if 'geodetic' in names:
+            longitude, latitude, height = ecef_to_geodetic(ecef)
+            states['geodetic'] = (
+                longitude,
+                latitude,
+                height,
+                ecef_to_enu_velocity(ecef_velocity, longitude, latitude)
+            )
+
+    return states
@@ -0,0 +1,224 @@
+"""
+    Prediction of satellite passes over ground observers
+"""
+
+import math
+
+import ephem
+import numpy as np
+
+from . import frames
+from .topocentric import look_angles, observer_location
+
+class PassPredictor(object):
+    """
+        Find the passes of the satellites of a BatchPropagator over a pyephem
+        observer
+
+        Elevations are first sampled on a coarse grid for every satellite at
+        once, then the acquisition (AOS), culmination (TCA) and loss (LOS) of
+        signal times are refined for all the passes together. Passes in
+        progress at the boundaries of the window are clipped to it.
+    """
+
+    # Seconds between two samples of the coarse scan
+    coarse_step = 60.0
+
+    # Sampled maxima this close below the mask (rad) are refined as well, the
+    # actual culmination of a short pass may be between two samples
+    near_miss_margin = math.radians(15.0)
+
+    culmination_iterations = 25
+    crossing_iterations = 20
+
+    # Maximum number of samples of the coarse scan propagated at once
+    max_samples = 200000
+
+    def __init__(self, propagator, observer):
+        self.propagator = propagator
+        self.location = observer_location(observer)
+        self.errors = None
+
+    def look(self, propagator, dates):
+        """
+            Azimuth and elevation (rad) of the satellites of a propagator
+        """
+        data = propagator.propagate(dates, vectors=False)
+        theta = frames.gmst(np.asarray(dates) + frames.EPHEM_JD_OFFSET)
+        ecef = frames.teme_to_ecef(data['position'], theta)
+
+        with np.errstate(invalid='ignore'):
+            azimuth, elevation, _ = look_angles(ecef, *self.location)
+
+        # Samples which could not be computed are below the horizon
+        elevation[np.isnan(elevation)] = -math.pi
+
+        return azimuth, elevation, data['error']
+
+    def predict(self, start, end, min_elevation=0.0):
+        """
+            Return the passes of every satellite between start and end
+            (pyephem dates or datetimes) above min_elevation (deg), as a list
+            of lists of dicts
+        """
+        start = float(ephem.Date(start))
+        end = float(ephem.Date(end))
+        mask = math.radians(min_elevation)
+
+        step = self.coarse_step / 86400.0
+        count = int(math.ceil((end - start) / step)) + 1
+        dates = np.minimum(start + np.arange(count) * step, end)
+
+        passes = []
+        self.errors = np.zeros(len(self.propagator), dtype=np.int8)
+
+        chunk = max(1, self.max_samples // count)
+        for first in range(0, len(self.propagator), chunk):
+            rows = np.arange(first, min(first + chunk, len(self.propagator)))
+            passes.extend(self._predict_rows(rows, dates, mask))
+
+        return passes
+
+    def _predict_rows(self, rows, dates, mask):
+        """
+            Find the passes of some satellites of the propagator
+        """
+        _, elevation, errors = self.look(self.propagator.subset(rows), dates)
+        self.errors[rows] = errors
+        last = len(dates) - 1
+
+        # Runs of samples above the mask, ends are exclusive
+        above = np.zeros((len(rows), len(dates) + 2), dtype=np.int8)
+        above[:, 1:-1] = elevation >= mask
+        edges = np.diff(above, axis=1)
+        starts = np.argwhere(edges == 1)
+        ends = np.argwhere(edges == -1)
+
+        # Each candidate is a satellite, the bracket of its culmination and
+        # the (below, above) brackets of its AOS and LOS. A NaN below bound
+        # means the pass is clipped by the window.
+        candidates = []
+        for (row, first), (_, stop) in zip(starts, ends):
+            peak = first + np.argmax(elevation[row, first:stop])
+            candidates.append((
+                row,
+                dates[max(peak - 1, 0)],
+                dates[min(peak + 1, last)],
+                dates[first - 1] if first > 0 else np.nan,
+                dates[first],
+                dates[stop] if stop <= last else np.nan,
+                dates[stop - 1],
+            ))
+
+        # Sampled maxima just below the mask may hide a short pass, whose
+        # crossings are bracketed by its culmination
+        short = len(candidates)
+        if len(dates) > 2:
+            inner = elevation[:, 1:-1]
+            near_misses = np.argwhere(
+                (inner >= elevation[:, :-2]) &
+                (inner > elevation[:, 2:]) &
+                (inner < mask) &
+                (inner > mask - self.near_miss_margin)
+            )
+            for row, index in near_misses:
+                candidates.append((
+                    row,
+                    dates[index],
+                    dates[index + 2],
+                    dates[index],
+                    np.nan,
+                    dates[index + 2],
+                    np.nan,
+                ))
+
+        passes = [[] for _ in rows]
+        if not candidates:
+            return passes
+
+        candidates = np.array(candidates)
+        satellites = candidates[:, 0].astype(np.intp)
+        propagator = self.propagator.subset(rows[satellites])
+
+        tca = self._culminate(propagator, candidates[:, 1], candidates[:, 2])
+        candidates[short:, 4] = tca[short:]
+        candidates[short:, 6] = tca[short:]
+
+        # AOS and LOS are refined together
+        crossings = self._cross(
+            self.propagator.subset(np.tile(rows[satellites], 2)),
+            np.concatenate([candidates[:, 3], candidates[:, 5]]),
+            np.concatenate([candidates[:, 4], candidates[:, 6]]),
+            mask
+        )
+        aos, los = np.split(crossings, 2)
+
+        events = np.stack([aos, tca, los], axis=1)
+        azimuth, elevation, _ = self.look(propagator, events)
+        azimuth = np.degrees(azimuth)
+
+        for i, row in enumerate(satellites):
+            if elevation[i, 1] < mask:
+                continue
+
+            passes[row].append({
+                'aos': ephem.Date(events[i, 0]).datetime(),
+                'aos_azimuth': azimuth[i, 0],
+                'tca': ephem.Date(events[i, 1]).datetime(),
+                'tca_azimuth': azimuth[i, 1],
+                'max_elevation': math.degrees(elevation[i, 1]),
+                'los': ephem.Date(events[i, 2]).datetime(),
+                'los_azimuth': azimuth[i, 2],
+            })
+
+        for satellite_passes in passes:
+            satellite_passes.sort(key=lambda p: p['aos'])
+
+        return passes
+
+    def _culminate(self, propagator, a, b):
+        """
+            Golden section search of the maximum elevation of each satellite
+            of the propagator within [a, b]
+        """
+        ratio = (math.sqrt(5.0) - 1.0) / 2.0
+
+        c = b - ratio * (b - a)
+        d = a + ratio * (b - a)
+        _, fc, _ = self.look(propagator, c[:, np.newaxis])
+        _, fd, _ = self.look(propagator, d[:, np.newaxis])
+        fc = fc[:, 0]
+        fd = fd[:, 0]
+
+        for _ in range(self.culmination_iterations):
+            left = fc > fd
+            b = np.where(left, d, b)
+            a = np.where(left, a, c)
+
+            point = np.where(left, b - ratio * (b - a), a + ratio * (b - a))
+            _, value, _ = self.look(propagator, point[:, np.newaxis])
+            value = value[:, 0]
+
+            c, d = np.where(left, point, d), np.where(left, c, point)
+            fc, fd = np.where(left, value, fd), np.where(left, fc, value)
+
+        return (a + b) / 2.0
+
+    def _cross(self, propagator, below, above, mask):
+        """
+            Bisection of the time the elevation crosses the mask between a
+            date below it and a date above it, for each satellite of the
+            propagator. Where below is NaN the pass is clipped and above is
+            returned.
+        """
+        clipped = np.isnan(below)
+        below = np.where(clipped, above, below)
+
+        for _ in range(self.crossing_iterations):
+            middle = (below + above) / 2.0
+            _, value, _ = self.look(propagator, middle[:, np.newaxis])
+            inside = value[:, 0] >= mask
+            above = np.where(inside, middle, above)
+            below = np.where(inside, below, middle)
+
+        return np.where(clipped, above, (below + above) / 2.0)
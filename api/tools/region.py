@@ -0,0 +1,275 @@
+"""
+    Satellites whose sub-point is inside a geographic region
+"""
+
+import math
+
+import ephem
+import numpy as np
+
+from . import frames
+
+# Gravitational parameter of the earth (m3/s2)
+EARTH_MU = 3.986004418e14
+
+
+class Region(object):
+    """
+        Polygon of (latitude, longitude) vertices in degrees, whose edges are
+        straight lines in the latitude/longitude plane
+
+        Polygons may cross the antimeridian, the longitude of each vertex is
+        taken as the closest one to the previous vertex. They can't contain
+        a pole.
+    """
+
+    def __init__(self, vertices):
+        vertices = np.array(vertices, dtype=np.float64).reshape(-1, 2)
+        if len(vertices) < 3:
+            raise ValueError('a region needs at least 3 vertices')
+
+        latitude = vertices[:, 0]
+        longitude = vertices[:, 1]
+
+        if not np.all(np.isfinite(vertices)):
+            raise ValueError('region out of range')
+        if np.any(np.abs(latitude) > 90) or np.any(np.abs(longitude) > 180):
+            raise ValueError('region out of range')
+
+        # Unwrap the longitudes so that edges are never longer than 180 deg
+        longitude = longitude[0] + np.concatenate([
+            [0.0],
+            np.cumsum((np.diff(longitude) + 180.0) % 360.0 - 180.0)
+        ])
+
+        self.latitude = latitude
+        self.longitude = longitude
+
+    @classmethod
+    def from_bbox(cls, south, west, north, east):
+        """
+            Build the region of a bounding box, which crosses the
+            antimeridian when west is greater than east, raises ValueError
+            if it is out of range
+        """
+        bounds = (south, west, north, east)
+        if not all(math.isfinite(bound) for bound in bounds):
+            raise ValueError('bounding box out of range')
+        if abs(south) > 90 or abs(north) > 90 or \
+                abs(west) > 180 or abs(east) > 180:
+            raise ValueError('bounding box out of range')
+        if south >= north:
+            raise ValueError('empty bounding box')
+
+        if east <= west:
+            east += 360.0
+
+        # Vertices every 90 deg at most, so that the unwrapping of the
+        # longitudes gives back the box, 5 of them at most
+        longitudes = np.linspace(west, east, int(math.ceil((east - west) / 90.0)) + 1)
+        longitudes = (longitudes + 180.0) % 360.0 - 180.0
+
+        return cls(
+            [(south, lon) for lon in longitudes] +
+            [(north, lon) for lon in longitudes[::-1]]
+        )
+
+    @property
+    def latitude_range(self):
+        return float(self.latitude.min()), float(self.latitude.max())
+
+    def contains(self, latitude, longitude):
+        """
+            Mask of the points (deg) inside the region, NaN points are not
+        """
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        inside = np.zeros(np.broadcast(latitude, longitude).shape, dtype=bool)
+
+        # The unwrapped polygon may extend past +-180, points are tested at
+        # each of their equivalent longitudes
+        low = math.floor((self.longitude.min() + 180.0) / 360.0)
+        high = math.ceil((self.longitude.max() - 180.0) / 360.0)
+
+        with np.errstate(invalid='ignore'):
+            for turn in range(low, high + 1):
+                inside |= self._contains(latitude, longitude + 360.0 * turn)
+
+        return inside
+
+    def _contains(self, latitude, longitude):
+        """
+            Even-odd rule, a horizontal ray is cast from each point
+        """
+        inside = np.zeros(np.broadcast(latitude, longitude).shape, dtype=bool)
+
+        y1, x1 = self.latitude, self.longitude
+        y2, x2 = np.roll(y1, -1), np.roll(x1, -1)
+
+        for a, b, c, d in zip(y1, x1, y2, x2):
+            if a == c:
+                continue
+
+            crosses = (a > latitude) != (c > latitude)
+            intersection = b + (latitude - a) * (d - b) / (c - a)
+            inside ^= crosses & (longitude < intersection)
+
+        return inside
+
+
+def reachable(elements, region, min_altitude=None, max_altitude=None):
+    """
+        Mask of the element sets whose sub-point can enter the region and
+        whose altitude range overlaps [min_altitude, max_altitude] (m)
+
+        The sub-point of a satellite never goes further from the equator than
+        its inclination, and its altitude stays between its perigee and
+        apogee. Margins cover the perturbations of the orbit.
+    """
+    latitude_margin = 0.5
+    altitude_margin = 50000.0
+
+    inclination = np.degrees(elements['inclination'])
+    highest = np.where(inclination <= 90.0, inclination, 180.0 - inclination) + \
+        latitude_margin
+
+    south, north = region.latitude_range
+    with np.errstate(invalid='ignore'):
+        mask = (south <= highest) & (north >= -highest)
+
+    if min_altitude is not None or max_altitude is not None:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_motion = elements['mean_motion'] / 60.0
+            axis = (EARTH_MU / mean_motion ** 2) ** (1.0 / 3.0)
+
+            perigee = axis * (1.0 - elements['eccentricity']) - frames.WGS84_A
+            apogee = axis * (1.0 + elements['eccentricity']) - frames.WGS84_A
+
+            if min_altitude is not None:
+                mask &= apogee >= min_altitude - altitude_margin
+            if max_altitude is not None:
+                mask &= perigee <= max_altitude + altitude_margin
+
+    return mask
+
+
+class RegionScanner(object):
+    """
+        Find when the sub-points of the satellites of a BatchPropagator are
+        inside a region
+
+        Sub-points are sampled every step seconds for every satellite at
+        once, then the entry and exit times are refined by bisection. Passes
+        shorter than a step may be missed, and passes in progress at the
+        boundaries of the window are clipped to it.
+    """
+
+    step = 30.0
+
+    crossing_iterations = 15
+
+    # Maximum number of samples propagated at once
+    max_samples = 200000
+
+    def __init__(self, propagator, region):
+        self.propagator = propagator
+        self.region = region
+        self.errors = None
+
+    def inside(self, propagator, dates):
+        """
+            Mask of the samples of a propagator inside the region
+        """
+        data = propagator.propagate(dates, vectors=False)
+
+        return self.region.contains(data['latitude'], data['longitude']), \
+            data['error']
+
+    def scan(self, start, end):
+        """
+            Return the passes of every satellite through the region between
+            start and end (pyephem dates or datetimes), as a list of lists of
+            (entry, exit) datetimes
+        """
+        start = float(ephem.Date(start))
+        end = float(ephem.Date(end))
+
+        step = self.step / 86400.0
+        count = int(math.ceil((end - start) / step)) + 1
+        dates = np.minimum(start + np.arange(count) * step, end)
+
+        passes = []
+        self.errors = np.zeros(len(self.propagator), dtype=np.int8)
+
+        chunk = max(1, self.max_samples // count)
+        for first in range(0, len(self.propagator), chunk):
+            rows = np.arange(first, min(first + chunk, len(self.propagator)))
+            passes.extend(self._scan_rows(rows, dates))
+
+        return passes
+
+    def _scan_rows(self, rows, dates):
+        """
+            Find the passes of some satellites of the propagator
+        """
+        inside, errors = self.inside(self.propagator.subset(rows), dates)
+        self.errors[rows] = errors
+        last = len(dates) - 1
+
+        # Runs of samples inside the region, ends are exclusive
+        runs = np.zeros((len(rows), len(dates) + 2), dtype=np.int8)
+        runs[:, 1:-1] = inside
+        edges = np.diff(runs, axis=1)
+        starts = np.argwhere(edges == 1)
+        ends = np.argwhere(edges == -1)
+
+        # Crossings bracketed by a sample outside and one inside, the ones at
+        # the boundaries of the window are not refined
+        satellites = []
+        outside = []
+        within = []
+        for (row, first), (_, stop) in zip(starts, ends):
+            satellites.extend([row, row])
+            outside.extend([
+                dates[first - 1] if first > 0 else np.nan,
+                dates[stop] if stop <= last else np.nan,
+            ])
+            within.extend([dates[first], dates[stop - 1]])
+
+        passes = [[] for _ in rows]
+        if not satellites:
+            return passes
+
+        satellites = np.array(satellites, dtype=np.intp)
+        crossings = self._cross(
+            self.propagator.subset(rows[satellites]),
+            np.array(outside),
+            np.array(within)
+        )
+
+        for i in range(0, len(satellites), 2):
+            passes[satellites[i]].append((
+                ephem.Date(crossings[i]).datetime(),
+                ephem.Date(crossings[i + 1]).datetime(),
+            ))
+
+        return passes
+
+    def _cross(self, propagator, outside, within):
+        """
+            Bisection of the time each satellite of the propagator crosses
+            the boundary of the region between a date outside and a date
+            inside it. Returns the inside date where the outside one is NaN.
+        """
+        clipped = np.isnan(outside)
+        outside = np.where(clipped, within, outside)
+
+        for _ in range(self.crossing_iterations):
+            middle = (outside + within) / 2.0
+            inside, _ = self.inside(propagator, middle[:, np.newaxis])
+            inside = inside[:, 0]
+
+            within = np.where(inside, middle, within)
+            outside = np.where(inside, outside, middle)
+
+        return np.where(clipped, within, (outside + within) / 2.0)
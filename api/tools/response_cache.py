@@ -0,0 +1,113 @@
+"""
+    Cache of the rendered API responses, valid until the next import
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import urlencode
+
+from api.tools.data_generation import data_generation
+
+class ResponseCache(object):
+    """
+        Rendered responses stored in the API_CACHE_ALIAS Django cache, keyed
+        by the generation of the data, the media type and the normalized URL
+        of the request
+
+        An import bumps the generation, the next requests are then looked
+        up under other keys and the old responses expire. The hits and
+        misses are counted in the cache, so that they are shared by the
+        processes using the same cache.
+    """
+
+    prefix = 'api'
+
+    # Headers stored with the content
+    headers = ('Content-Type', 'Last-Modified')
+
+    @property
+    def enabled(self):
+        return settings.API_CACHE_ENABLED
+
+    @property
+    def cache(self):
+        return caches[settings.API_CACHE_ALIAS]
+
+    def key(self, request):
+        """
+            Return the key of the response to a request, made of its URL with
+            the query parameters sorted by name
+        """
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+
+        # Responses hold absolute links, built from the scheme and the host
+        path = '%s?%s %s' % (
+            request.build_absolute_uri(request.path),
+            query,
+            request.accepted_media_type
+        )
+        value, _ = data_generation.state()
+
+        return '%s:%d:%s' % (
+            self.prefix,
+            value,
+            hashlib.md5(path.encode('utf-8')).hexdigest()
+        )
+
+    def get(self, key):
+        """
+            Return the (content, headers) of a cached response, None if it is
+            not cached
+        """
+        cached = self.cache.get(key)
+        self._count('hits' if cached is not None else 'misses')
+
+        return cached
+
+    def set(self, key, response):
+        self.cache.set(key, (
+            response.content,
+            dict(
+                (header, response[header]) for header in self.headers
+                if response.has_header(header)
+            )
+        ))
+
+    def _count(self, name):
+        key = '%s:stats:%s' % (self.prefix, name)
+        self.cache.add(key, 0, None)
+
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            # Evicted meanwhile
+            self.cache.set(key, 1, None)
+
+    def stats(self):
+        """
+            Return the hits and misses counted since the last reset
+        """
+        hits, misses = [
+            self.cache.get('%s:stats:%s' % (self.prefix, name), 0)
+            for name in ('hits', 'misses')
+        ]
+
+        return {
+            'hits': hits,
+            'misses': misses,
+            'ratio': hits / (hits + misses) if hits + misses else None,
+            'generation': data_generation.state()[0],
+        }
+
+    def reset(self):
+        """
+            Set the hits and misses back to 0
+        """
+        self.cache.delete_many([
+            '%s:stats:%s' % (self.prefix, name) for name in ('hits', 'misses')
+        ])
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,159 @@
+"""
+    Serialization of list responses from database rows, without building
+    model instances nor going through the serializer fields for each value
+"""
+
+import decimal
+from collections import OrderedDict
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+class RowSerializer(object):
+    """
+        Produce the same data as a ModelSerializer (and its nested
+        ModelSerializers), given as a class or an instance, from the tuples
+        of a values_list() queryset
+
+        The columns to read and the conversion of each of them are worked out
+        once from the fields of the serializer. Decimals and datetimes are
+        formatted as the DRF fields do, strings, integers and booleans are
+        passed as read, as well as the keys of the relations returned as
+        primary keys. Any other field uses its own to_representation().
+        Nested serializers become the joined columns of their related model,
+        None when the foreign key is null.
+
+        The hidden columns, for instance the keys of a cursor pagination, are
+        read with the rows but left out of the data.
+    """
+
+    def __init__(self, serializer, hidden=()):
+        if isinstance(serializer, type):
+            serializer = serializer()
+        if isinstance(serializer, serializers.ListSerializer):
+            serializer = serializer.child
+
+        self.columns = []
+        self._steps = self._compile(serializer, '')
+
+        for column in hidden:
+            self._column(column)
+
+    def _column(self, source):
+        """
+            Return the position of a column in the rows, adding it if needed
+        """
+        if source not in self.columns:
+            self.columns.append(source)
+
+        return self.columns.index(source)
+
+    def _compile(self, serializer, prefix):
+        """
+            Return the (name, column, converter, nested steps) steps building
+            the data of a serializer
+        """
+        steps = []
+        for name, field in serializer.fields.items():
+            if '.' in field.source or field.source == '*':
+                raise ValueError('Field "%s" is not a model column' % name)
+
+            source = prefix + field.source
+
+            if isinstance(field, serializers.BaseSerializer):
+                # The foreign key itself tells whether the object is null
+                steps.append((
+                    name,
+                    self._column(source),
+                    None,
+                    self._compile(field, source + '__')
+                ))
+            else:
+                steps.append((
+                    name,
+                    self._column(source),
+                    self._converter(field),
+                    None
+                ))
+
+        return tuple(steps)
+
+    def _converter(self, field):
+        """
+            Return the function formatting the non null values of a field,
+            None when they are used as read
+        """
+        if isinstance(field, serializers.DecimalField):
+            coerce_to_string = getattr(
+                field,
+                'coerce_to_string',
+                api_settings.COERCE_DECIMAL_TO_STRING
+            )
+            if not coerce_to_string or field.localize:
+                return field.to_representation
+            if field.decimal_places is None:
+                return '{0:f}'.format
+
+            quantum = decimal.Decimal('.1') ** field.decimal_places
+            context = decimal.getcontext().copy()
+            if field.max_digits is not None:
+                context.prec = field.max_digits
+
+            def convert(value):
+                return '{0:f}'.format(value.quantize(quantum, context=context))
+
+            return convert
+
+        if isinstance(field, serializers.DateTimeField):
+            output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+            if output_format is None or output_format.lower() != ISO_8601:
+                return field.to_representation
+
+            def convert(value):
+                value = value.isoformat()
+                if value.endswith('+00:00'):
+                    value = value[:-6] + 'Z'
+                return value
+
+            return convert
+
+        if type(field) in (
+                serializers.CharField,
+                serializers.IntegerField,
+                serializers.BooleanField):
+            return None
+
+        # The rows hold the foreign keys rather than the related objects
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and \
+                field.pk_field is None:
+            return None
+
+        return field.to_representation
+
+    def values(self, queryset):
+        """
+            Return a values_list() queryset of the columns of the rows
+        """
+        return queryset.values_list(*self.columns)
+
+    def _build(self, steps, row):
+        data = OrderedDict()
+        for name, column, convert, nested in steps:
+            value = row[column]
+            if value is None:
+                data[name] = None
+            elif nested is not None:
+                data[name] = self._build(nested, row)
+            elif convert is None:
+                data[name] = value
+            else:
+                data[name] = convert(value)
+
+        return data
+
+    def serialize(self, rows):
+        """
+            Return the list of the data of rows read from values()
+        """
+        steps = self._steps
+        return [self._build(steps, row) for row in rows]
@@ -8,18 +8,23 @@ import ephem
 
 
 from catalog.models import TLE
+from . import frames
+from .batch_propagator import BatchPropagator
+from .ephemeris_cache import ephemeris_cache
+from .pass_predictor import PassPredictor
+from .topocentric import observe, observer_location
 
 class SatelliteComputation(object):
     """
         Tools for satellite related computation
     """
 
-    G = 6.67408e-11
-    EARTH_MASS = 5.98e24
+    G = BatchPropagator.G
+    EARTH_MASS = BatchPropagator.EARTH_MASS
 
     def __init__(self, **kwargs):
         self.observer = ephem.Observer()
-        self._satellite = None
+        self._propagator = None
 
         if 'tle' not in kwargs:
             raise TypeError("tle parameter is missing")
@@ -29,11 +34,7 @@ class SatelliteComputation(object):
             raise TypeError("tle must be of type TLE")
 
         try:
-            self._satellite = ephem.readtle(
-                tle.first_line,
-                tle.second_line,
-                tle.third_line
-            )
+            self._propagator = ephemeris_cache.get(tle)
         except TypeError:
             raise ValueError("invalid TLE")
 
@@ -52,10 +53,58 @@ class SatelliteComputation(object):
 
 
     def compute(self):
-        self._satellite.compute(self.observer)
+        longitude, latitude, elevation, error = self._propagator.subpoint(
+            0,
+            self.observer.date
+        )
+
+        if error:
+            raise ValueError(BatchPropagator.ERROR_MESSAGES[error])
+
+        return {
+            'longitude' : math.degrees(longitude),
+            'latitude' : math.degrees(latitude),
+            'elevation' : float(elevation),
+            'velocity' : float(BatchPropagator.orbital_velocity(elevation)),
+        }
+
+
+    def observe(self):
+        """
+            Return the azimuth and elevation (deg), range (m) and range rate
+            (m/s) of the satellite seen from the observer at its date
+        """
+        date = float(self.observer.date)
+        data = self._propagator.propagate([date])
+
+        error = data['error'][0]
+        if error:
+            raise ValueError(BatchPropagator.ERROR_MESSAGES[error])
+
+        azimuth, elevation, distance, range_rate = observe(
+            data['position'],
+            data['velocity_vector'],
+            frames.gmst([date + frames.EPHEM_JD_OFFSET]),
+            [observer_location(self.observer)]
+        )
+
         return {
-            'longitude' : math.degrees(self._satellite.sublong),
-            'latitude' : math.degrees(self._satellite.sublat),
-            'elevation' : self._satellite.elevation,
-            'velocity' : self._calc_orbital_velocity(self._satellite.elevation),
-        }
\ No newline at end of file
+            'azimuth': math.degrees(azimuth[0, 0, 0]),
+            'elevation': math.degrees(elevation[0, 0, 0]),
+            'range': float(distance[0, 0, 0]),
+            'range_rate': float(range_rate[0, 0, 0]),
+        }
+
+    def passes(self, end, min_elevation=0.0):
+        """
+            Return the passes of the satellite over the observer between the
+            observer date and end, above min_elevation (deg)
+        """
+        predictor = PassPredictor(self._propagator, self.observer)
+        passes = predictor.predict(self.observer.date, end, min_elevation)
+
+        error = predictor.errors[0]
+        if error:
+            raise ValueError(BatchPropagator.ERROR_MESSAGES[error])
+
+        return passes[0]
@@ -0,0 +1,451 @@
+"""
+    Vectorized SGP4 propagation of near earth element sets
+
+    This is a NumPy port of the near earth branch of the SGP4 model as revised
+    in "Revisiting Spacetrack Report #3" (Vallado et al., 2006), using WGS-72
+    constants. Every function works on whole arrays of satellites and times so
+    that the Python overhead does not grow with the size of the catalog.
+    Deep space element sets (period >= 225 minutes) are not handled here and
+    are flagged so the caller can fall back to another propagator.
+"""
+
+import math
+
+import numpy as np
+
+# WGS-72 constants used by SGP4
+MU = 398600.8
+EARTH_RADIUS = 6378.135
+XKE = 60.0 / math.sqrt(EARTH_RADIUS ** 3 / MU)
+J2 = 0.001082616
+J3 = -0.00000253881
+J4 = -0.00000165597
+J3OJ2 = J3 / J2
+X2O3 = 2.0 / 3.0
+TWOPI = 2.0 * math.pi
+
+# Velocity unit conversion, from earth radii per minute to km/s
+VKMPERSEC = EARTH_RADIUS * XKE / 60.0
+
+# Elements whose period is at least this long (minutes) need SDP4
+DEEP_SPACE_PERIOD = 225.0
+
+# Element sets can't be trusted further than this from their epoch (days),
+# same limit as pyephem
+MAX_EPOCH_DISTANCE = 365.0
+
+# Error codes, values below 7 match the reference implementation
+ERROR_NONE = 0
+ERROR_ECCENTRICITY = 1
+ERROR_SEMI_LATUS_RECTUM = 4
+ERROR_DECAYED = 6
+ERROR_INVALID = 7
+ERROR_EPOCH_RANGE = 8
+
+ELEMENTS_DTYPE = np.dtype([
+    ('epoch', np.float64),          # Julian date
+    ('bstar', np.float64),          # 1/earth radii
+    ('inclination', np.float64),    # rad
+    ('ascending_node', np.float64), # rad
+    ('eccentricity', np.float64),
+    ('perigee_argument', np.float64), # rad
+    ('mean_anomaly', np.float64),   # rad
+    ('mean_motion', np.float64),    # rad/min
+])
+
+
+def tle_epoch(line):
+    """
+        Return the julian date of the epoch written on the first TLE line
+    """
+    year = int(line[18:20])
+    year += 2000 if year < 57 else 1900
+    day = float(line[20:32])
+
+    # Julian date of the 0th of January of the year
+    jd_year = 367 * year - (7 * year) // 4 + 275 // 9 + 1721013.5
+
+    return jd_year + day
+
+
+def _implied_decimal(field):
+    """
+        Read a TLE field such as ' 35301-4' as 0.35301e-4
+    """
+    field = field.strip()
+    sign = -1.0 if field[0] == '-' else 1.0
+    field = field.lstrip('+-')
+
+    return sign * float('0.%s' % field[:-2]) * 10 ** int(field[-2:])
+
+
+def parse_elements(lines):
+    """
+        Build an elements array from a sequence of (line 1, line 2) pairs
+
+        Element sets which can't be read are filled with NaN and will be
+        flagged as invalid by sgp4_init
+    """
+    invalid = (np.nan,) * len(ELEMENTS_DTYPE.names)
+    rows = []
+
+    for line1, line2 in lines:
+        try:
+            rows.append((
+                tle_epoch(line1),
+                _implied_decimal(line1[53:61]),
+                math.radians(float(line2[8:16])),
+                math.radians(float(line2[17:25])),
+                float('0.%s' % line2[26:33].strip()),
+                math.radians(float(line2[34:42])),
+                math.radians(float(line2[43:51])),
+                float(line2[52:63]) * TWOPI / 1440.0,
+            ))
+        except (TypeError, ValueError, IndexError):
+            rows.append(invalid)
+
+    return np.array(rows, dtype=ELEMENTS_DTYPE)
+
+
+def sgp4_init(elements):
+    """
+        Compute the propagation coefficients of the given elements
+
+        Returns a dict of arrays, one value per element set
+    """
+    ecco = elements['eccentricity']
+    inclo = elements['inclination']
+    argpo = elements['perigee_argument']
+    mo = elements['mean_anomaly']
+    no_kozai = elements['mean_motion']
+    bstar = elements['bstar']
+
+    invalid = np.zeros(len(elements), dtype=bool)
+    for name in ELEMENTS_DTYPE.names:
+        invalid |= ~np.isfinite(elements[name])
+    invalid |= (no_kozai <= 0) | (ecco < 0) | (ecco >= 1)
+
+    # Keep the maths quiet on invalid rows, they are discarded anyway
+    ecco = np.where(invalid, 0.001, ecco)
+    inclo = np.where(invalid, 1.0, inclo)
+    argpo = np.where(invalid, 0.0, argpo)
+    mo = np.where(invalid, 0.0, mo)
+    no_kozai = np.where(invalid, 0.06, no_kozai)
+    bstar = np.where(invalid, 0.0, bstar)
+
+    # Recover the original mean motion and semi major axis
+    eccsq = ecco * ecco
+    omeosq = 1.0 - eccsq
+    rteosq = np.sqrt(omeosq)
+    cosio = np.cos(inclo)
+    cosio2 = cosio * cosio
+
+    ak = (XKE / no_kozai) ** X2O3
+    d1 = 0.75 * J2 * (3.0 * cosio2 - 1.0) / (rteosq * omeosq)
+    delta = d1 / (ak * ak)
+    adel = ak * (1.0 - delta * delta - delta *
+                 (1.0 / 3.0 + 134.0 * delta * delta / 81.0))
+    delta = d1 / (adel * adel)
+    no_unkozai = no_kozai / (1.0 + delta)
+
+    ao = (XKE / no_unkozai) ** X2O3
+    sinio = np.sin(inclo)
+    po = ao * omeosq
+    con42 = 1.0 - 5.0 * cosio2
+    con41 = -con42 - cosio2 - cosio2
+    posq = po * po
+    rp = ao * (1.0 - ecco)
+
+    deep_space = (TWOPI / no_unkozai >= DEEP_SPACE_PERIOD) & ~invalid
+    isimp = rp < (220.0 / EARTH_RADIUS + 1.0)
+
+    # Atmospheric density parameters depend on the perigee height
+    ss = 78.0 / EARTH_RADIUS + 1.0
+    qzms2t = ((120.0 - 78.0) / EARTH_RADIUS) ** 4
+    perige = (rp - 1.0) * EARTH_RADIUS
+
+    sfour = np.where(perige < 98.0, 20.0, perige - 78.0)
+    qzms24 = np.where(
+        perige < 156.0,
+        ((120.0 - sfour) / EARTH_RADIUS) ** 4,
+        qzms2t
+    )
+    sfour = np.where(perige < 156.0, sfour / EARTH_RADIUS + 1.0, ss)
+
+    pinvsq = 1.0 / posq
+    tsi = 1.0 / (ao - sfour)
+    eta = ao * ecco * tsi
+    etasq = eta * eta
+    eeta = ecco * eta
+    psisq = np.abs(1.0 - etasq)
+    coef = qzms24 * tsi ** 4
+    coef1 = coef / psisq ** 3.5
+
+    cc2 = coef1 * no_unkozai * (
+        ao * (1.0 + 1.5 * etasq + eeta * (4.0 + etasq)) +
+        0.375 * J2 * tsi / psisq * con41 *
+        (8.0 + 3.0 * etasq * (8.0 + etasq))
+    )
+    cc1 = bstar * cc2
+
+    eccentric = ecco > 1.0e-4
+    safe_ecco = np.where(eccentric, ecco, 1.0)
+    cc3 = np.where(
+        eccentric,
+        -2.0 * coef * tsi * J3OJ2 * no_unkozai * sinio / safe_ecco,
+        0.0
+    )
+
+    x1mth2 = 1.0 - cosio2
+    cc4 = 2.0 * no_unkozai * coef1 * ao * omeosq * (
+        eta * (2.0 + 0.5 * etasq) + ecco * (0.5 + 2.0 * etasq) -
+        J2 * tsi / (ao * psisq) * (
+            -3.0 * con41 * (1.0 - 2.0 * eeta + etasq * (1.5 - 0.5 * eeta)) +
+            0.75 * x1mth2 * (2.0 * etasq - eeta * (1.0 + etasq)) *
+            np.cos(2.0 * argpo)
+        )
+    )
+    cc5 = 2.0 * coef1 * ao * omeosq * (
+        1.0 + 2.75 * (etasq + eeta) + eeta * etasq
+    )
+
+    # Secular rates
+    cosio4 = cosio2 * cosio2
+    temp1 = 1.5 * J2 * pinvsq * no_unkozai
+    temp2 = 0.5 * temp1 * J2 * pinvsq
+    temp3 = -0.46875 * J4 * pinvsq * pinvsq * no_unkozai
+
+    mdot = (no_unkozai + 0.5 * temp1 * rteosq * con41 +
+            0.0625 * temp2 * rteosq * (13.0 - 78.0 * cosio2 + 137.0 * cosio4))
+    argpdot = (-0.5 * temp1 * con42 +
+               0.0625 * temp2 * (7.0 - 114.0 * cosio2 + 395.0 * cosio4) +
+               temp3 * (3.0 - 36.0 * cosio2 + 49.0 * cosio4))
+    xhdot1 = -temp1 * cosio
+    nodedot = xhdot1 + (
+        0.5 * temp2 * (4.0 - 19.0 * cosio2) +
+        2.0 * temp3 * (3.0 - 7.0 * cosio2)
+    ) * cosio
+
+    omgcof = bstar * cc3 * np.cos(argpo)
+    safe_eeta = np.where(eccentric, eeta, 1.0)
+    xmcof = np.where(eccentric, -X2O3 * coef * bstar / safe_eeta, 0.0)
+    nodecf = 3.5 * omeosq * xhdot1 * cc1
+    t2cof = 1.5 * cc1
+
+    denominator = np.where(np.abs(cosio + 1.0) > 1.5e-12, 1.0 + cosio, 1.5e-12)
+    xlcof = -0.25 * J3OJ2 * sinio * (3.0 + 5.0 * cosio) / denominator
+    aycof = -0.5 * J3OJ2 * sinio
+    delmo = (1.0 + eta * np.cos(mo)) ** 3
+    sinmao = np.sin(mo)
+    x7thm1 = 7.0 * cosio2 - 1.0
+
+    # Higher order drag terms are dropped for low perigees
+    cc1sq = cc1 * cc1
+    d2 = 4.0 * ao * tsi * cc1sq
+    temp = d2 * tsi * cc1 / 3.0
+    d3 = (17.0 * ao + sfour) * temp
+    d4 = 0.5 * temp * ao * tsi * (221.0 * ao + 31.0 * sfour) * cc1
+    t3cof = d2 + 2.0 * cc1sq
+    t4cof = 0.25 * (3.0 * d3 + cc1 * (12.0 * d2 + 10.0 * cc1sq))
+    t5cof = 0.2 * (3.0 * d4 + 12.0 * cc1 * d3 + 6.0 * d2 * d2 +
+                   15.0 * cc1sq * (2.0 * d2 + cc1sq))
+
+    simple = isimp.astype(np.float64)
+    complete = 1.0 - simple
+
+    return {
+        'epoch': elements['epoch'],
+        'invalid': invalid,
+        'deep_space': deep_space,
+        'bstar': bstar,
+        'ecco': ecco,
+        'inclo': inclo,
+        'nodeo': np.where(invalid, 0.0, elements['ascending_node']),
+        'argpo': argpo,
+        'mo': mo,
+        'no_unkozai': no_unkozai,
+        'mdot': mdot,
+        'argpdot': argpdot,
+        'nodedot': nodedot,
+        'nodecf': nodecf,
+        'cc1': cc1,
+        'cc4': cc4,
+        'cc5': cc5 * complete,
+        't2cof': t2cof,
+        'omgcof': omgcof * complete,
+        'xmcof': xmcof * complete,
+        'eta': eta,
+        'delmo': delmo,
+        'sinmao': sinmao,
+        'd2': d2 * complete,
+        'd3': d3 * complete,
+        'd4': d4 * complete,
+        't3cof': t3cof * complete,
+        't4cof': t4cof * complete,
+        't5cof': t5cof * complete,
+        'con41': con41,
+        'x1mth2': x1mth2,
+        'x7thm1': x7thm1,
+        'xlcof': xlcof,
+        'aycof': aycof,
+    }
+
+
+def sgp4(coefficients, jd):
+    """
+        Propagate the initialized element sets to the given julian dates,
+        either shared by every element set (M,) or given per set (N, M)
+
+        Returns a tuple (position, velocity, error) where position (km) and
+        velocity (km/s) are TEME vectors of shape (N, M, 3) and error is an
+        (N, M) array of error codes. Failed samples are set to NaN.
+    """
+    c = dict(
+        (key, value[:, np.newaxis] if value.ndim == 1 else value)
+        for key, value in coefficients.items()
+    )
+    jd = np.asarray(jd, dtype=np.float64)
+    if jd.ndim == 1:
+        jd = jd[np.newaxis, :]
+    t = (jd - c['epoch']) * 1440.0
+    shape = t.shape
+
+    error = np.zeros(shape, dtype=np.int8)
+
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        too_far = np.abs(t) > MAX_EPOCH_DISTANCE * 1440.0
+
+        # Secular gravity and atmospheric drag
+        xmdf = c['mo'] + c['mdot'] * t
+        argpdf = c['argpo'] + c['argpdot'] * t
+        nodedf = c['nodeo'] + c['nodedot'] * t
+        t2 = t * t
+        t3 = t2 * t
+        t4 = t3 * t
+        nodem = nodedf + c['nodecf'] * t2
+
+        delomg = c['omgcof'] * t
+        delm = c['xmcof'] * ((1.0 + c['eta'] * np.cos(xmdf)) ** 3 - c['delmo'])
+        temp = delomg + delm
+        mm = xmdf + temp
+        argpm = argpdf - temp
+
+        tempa = (1.0 - c['cc1'] * t - c['d2'] * t2 - c['d3'] * t3 -
+                 c['d4'] * t4)
+        tempe = (c['bstar'] * c['cc4'] * t +
+                 c['bstar'] * c['cc5'] * (np.sin(mm) - c['sinmao']))
+        templ = (c['t2cof'] * t2 + c['t3cof'] * t3 +
+                 t4 * (c['t4cof'] + t * c['t5cof']))
+
+        nm = c['no_unkozai']
+        am = (XKE / nm) ** X2O3 * tempa * tempa
+        nm = XKE / am ** 1.5
+        em = c['ecco'] - tempe
+        error[(em >= 1.0) | (em < -0.001)] = ERROR_ECCENTRICITY
+        em = np.where(em < 1.0e-6, 1.0e-6, em)
+
+        mm = mm + c['no_unkozai'] * templ
+        xlm = mm + argpm + nodem
+
+        nodem = np.fmod(nodem, TWOPI)
+        argpm = np.fmod(argpm, TWOPI)
+        xlm = np.fmod(xlm, TWOPI)
+        mm = np.fmod(xlm - argpm - nodem, TWOPI)
+
+        sinim = np.sin(c['inclo'])
+        cosim = np.cos(c['inclo'])
+
+        # Long period periodics
+        axnl = em * np.cos(argpm)
+        temp = 1.0 / (am * (1.0 - em * em))
+        aynl = em * np.sin(argpm) + temp * c['aycof']
+        xl = mm + argpm + nodem + temp * c['xlcof'] * axnl
+
+        # Solve Kepler's equation
+        u = np.fmod(xl - nodem, TWOPI)
+        eo1 = u.copy()
+        for _ in range(10):
+            sineo1 = np.sin(eo1)
+            coseo1 = np.cos(eo1)
+            tem5 = 1.0 - coseo1 * axnl - sineo1 * aynl
+            tem5 = (u - aynl * coseo1 + axnl * sineo1 - eo1) / tem5
+            tem5 = np.clip(tem5, -0.95, 0.95)
+            eo1 = eo1 + tem5
+            if not np.any(np.abs(tem5) >= 1.0e-12):
+                break
+        sineo1 = np.sin(eo1)
+        coseo1 = np.cos(eo1)
+
+        # Short period preliminary quantities
+        ecose = axnl * coseo1 + aynl * sineo1
+        esine = axnl * sineo1 - aynl * coseo1
+        el2 = axnl * axnl + aynl * aynl
+        pl = am * (1.0 - el2)
+        error[pl < 0.0] = ERROR_SEMI_LATUS_RECTUM
+
+        rl = am * (1.0 - ecose)
+        rdotl = np.sqrt(am) * esine / rl
+        rvdotl = np.sqrt(pl) / rl
+        betal = np.sqrt(1.0 - el2)
+        temp = esine / (1.0 + betal)
+        sinu = am / rl * (sineo1 - aynl - axnl * temp)
+        cosu = am / rl * (coseo1 - axnl + aynl * temp)
+        su = np.arctan2(sinu, cosu)
+        sin2u = (cosu + cosu) * sinu
+        cos2u = 1.0 - 2.0 * sinu * sinu
+        temp = 1.0 / pl
+        temp1 = 0.5 * J2 * temp
+        temp2 = temp1 * temp
+
+        # Update for short period periodics
+        mrt = (rl * (1.0 - 1.5 * temp2 * betal * c['con41']) +
+               0.5 * temp1 * c['x1mth2'] * cos2u)
+        su = su - 0.25 * temp2 * c['x7thm1'] * sin2u
+        xnode = nodem + 1.5 * temp2 * cosim * sin2u
+        xinc = c['inclo'] + 1.5 * temp2 * cosim * sinim * cos2u
+        mvt = rdotl - nm * temp1 * c['x1mth2'] * sin2u / XKE
+        rvdot = rvdotl + nm * temp1 * (
+            c['x1mth2'] * cos2u + 1.5 * c['con41']
+        ) / XKE
+
+        # Orientation vectors
+        sinsu = np.sin(su)
+        cossu = np.cos(su)
+        snod = np.sin(xnode)
+        cnod = np.cos(xnode)
+        sini = np.sin(xinc)
+        cosi = np.cos(xinc)
+        xmx = -snod * cosi
+        xmy = cnod * cosi
+
+        ux = xmx * sinsu + cnod * cossu
+        uy = xmy * sinsu + snod * cossu
+        uz = sini * sinsu
+        vx = xmx * cossu - cnod * sinsu
+        vy = xmy * cossu - snod * sinsu
+        vz = sini * cossu
+
+        position = np.empty(shape + (3,))
+        position[..., 0] = mrt * ux
+        position[..., 1] = mrt * uy
+        position[..., 2] = mrt * uz
+        position *= EARTH_RADIUS
+
+        velocity = np.empty(shape + (3,))
+        velocity[..., 0] = mvt * ux + rvdot * vx
+        velocity[..., 1] = mvt * uy + rvdot * vy
+        velocity[..., 2] = mvt * uz + rvdot * vz
+        velocity *= VKMPERSEC
+
+        error[(mrt < 1.0) & (error == ERROR_NONE)] = ERROR_DECAYED
+
+    error[~np.isfinite(position).all(axis=-1) & (error == ERROR_NONE)] = \
+        ERROR_SEMI_LATUS_RECTUM
+    error[too_far] = ERROR_EPOCH_RANGE
+    error[np.broadcast_to(c['invalid'], shape)] = ERROR_INVALID
+
+    failed = error != ERROR_NONE
+    position[failed] = np.nan
+    velocity[failed] = np.nan
+
+    return position, velocity, error
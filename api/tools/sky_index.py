@@ -0,0 +1,314 @@
+"""
+    Spatial index of the sub-satellite points, used to find the satellites
+    which may be above the horizon of an observer without propagating the
+    whole catalog
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import ephem
+import numpy as np
+from django.conf import settings
+
+from catalog.models import CatalogEntry, TLE
+from . import frames
+from .batch_propagator import BatchPropagator
+from .topocentric import look_angles
+
+# Smallest distance between the center and the surface of the earth (m)
+EARTH_POLAR_RADIUS = frames.WGS84_A * (1.0 - frames.WGS84_F)
+
+
+def horizon_reach(radius, min_elevation):
+    """
+        Largest angle (rad) between an observer and the sub-point of a
+        satellite at the given distance (m) from the center of the earth for
+        the satellite to be above min_elevation (rad)
+
+        The earth is taken as a sphere of its polar radius, which gives an
+        upper bound for any observer at or above the ellipsoid.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = EARTH_POLAR_RADIUS * math.cos(min_elevation) / radius
+
+    return np.arccos(np.clip(ratio, -1.0, 1.0)) - min_elevation
+
+
+class SkyIndex(object):
+    """
+        Sub-satellite points of element sets at a date, bucketed into cells
+        of cell_size degrees of latitude and longitude
+
+        The index is valid for duration seconds after its date. Every
+        satellite is given a margin covering its motion during that time,
+        so that the candidates of a query are a superset of the visible
+        satellites at any date of the validity window.
+    """
+
+    cell_size = 10.0
+
+    # Added to every reach (rad), covers the difference between the
+    # spherical model and the ellipsoid
+    safety_margin = math.radians(0.5)
+
+    def __init__(self, lines, date, duration):
+        """
+            lines are (satellite number, TLE id, line 1, line 2) tuples as
+            returned by TLEManager.findLinesByCatalogEntriesAndTime, date a
+            datetime and duration in seconds
+        """
+        self.lines = lines
+        self.date = date
+        self.end = date + timedelta(seconds=duration)
+        self.propagator = BatchPropagator.from_lines(
+            [(line1, line2) for _, _, line1, line2 in lines]
+        )
+
+        dates = [float(ephem.Date(date))]
+        data = self.propagator.propagate(dates)
+
+        earth = frames.EarthRotation.from_dates(dates)
+        ecef = earth.to_ecef(data['position'][:, 0])
+        ecef_velocity = earth.velocity_to_ecef(data['velocity_vector'][:, 0], ecef)
+
+        valid = np.flatnonzero(data['error'] == 0)
+        ecef = ecef[valid]
+        ecef_velocity = ecef_velocity[valid]
+
+        radius = np.sqrt(np.einsum('ij,ij->i', ecef, ecef))
+        direction = ecef / radius[:, np.newaxis]
+        speed = np.sqrt(np.einsum('ij,ij->i', ecef_velocity, ecef_velocity))
+        radial = np.abs(np.einsum('ij,ij->i', ecef_velocity, direction))
+
+        # Highest and lowest the satellites can go, and how far their
+        # sub-points can move, during the validity of the index
+        self.rows = valid
+        self.direction = direction
+        self.lowest = np.maximum(radius - radial * duration, EARTH_POLAR_RADIUS)
+        self.highest = radius + radial * duration
+        self.drift = speed * duration / self.lowest + self.safety_margin
+
+        longitude = np.degrees(np.arctan2(direction[:, 1], direction[:, 0]))
+        latitude = np.degrees(np.arcsin(np.clip(direction[:, 2], -1.0, 1.0)))
+
+        self._columns = int(round(360.0 / self.cell_size))
+        self._bands = int(round(180.0 / self.cell_size))
+
+        cells = self._cell(latitude, longitude)
+        order = np.argsort(cells, kind='mergesort')
+        count = self._bands * self._columns
+
+        # Satellites sorted by cell, with the bounds of each cell and its
+        # highest satellite and largest drift
+        self._order = order
+        self._starts = np.searchsorted(cells[order], np.arange(count + 1))
+        self._highest = np.zeros(count)
+        self._drift = np.zeros(count)
+        np.maximum.at(self._highest, cells, self.highest)
+        np.maximum.at(self._drift, cells, self.drift)
+
+        # Center and angular radius of every cell
+        lat = np.radians(
+            (np.arange(self._bands) + 0.5) * self.cell_size - 90.0
+        )[:, np.newaxis]
+        lon = np.radians(
+            (np.arange(self._columns) + 0.5) * self.cell_size - 180.0
+        )[np.newaxis, :]
+        half = math.radians(self.cell_size / 2.0)
+
+        centers = np.empty((self._bands, self._columns, 3))
+        centers[..., 0] = np.cos(lat) * np.cos(lon)
+        centers[..., 1] = np.cos(lat) * np.sin(lon)
+        centers[..., 2] = np.sin(lat) * np.ones_like(lon)
+        self._centers = centers.reshape(-1, 3)
+
+        # Corners are the farthest points of a cell from its center, the one
+        # closest to the equator for the widest longitude span
+        equator = np.maximum(np.abs(lat) - half, 0.0)
+        corner = np.arccos(np.clip(
+            np.sin(np.abs(lat)) * np.sin(equator) +
+            np.cos(lat) * np.cos(equator) * math.cos(half),
+            -1.0,
+            1.0
+        ))
+        self._radii = np.broadcast_to(corner, (self._bands, self._columns)).ravel()
+        self._occupied = np.diff(self._starts) > 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def covers(self, date):
+        """
+            Whether the index can be used at the given datetime
+        """
+        return self.date <= date <= self.end
+
+    def _cell(self, latitude, longitude):
+        line = np.clip(
+            ((latitude + 90.0) // self.cell_size).astype(np.intp),
+            0,
+            self._bands - 1
+        )
+        column = np.clip(
+            ((longitude + 180.0) // self.cell_size).astype(np.intp),
+            0,
+            self._columns - 1
+        )
+
+        return line * self._columns + column
+
+    def candidates(self, longitude, latitude, min_elevation):
+        """
+            Rows of the propagator which may be above min_elevation (rad) for
+            an observer at the given geodetic coordinates (rad) during the
+            validity of the index
+        """
+        observer = frames.geodetic_to_ecef(longitude, latitude, 0.0)
+        observer /= np.sqrt(np.dot(observer, observer))
+
+        # Cells whose closest point is within the reach of their highest
+        # satellite
+        largest = horizon_reach(self._highest, min_elevation) + self._drift
+        distance = np.arccos(np.clip(np.dot(self._centers, observer), -1.0, 1.0))
+        cells = np.flatnonzero(
+            self._occupied & (distance - self._radii <= largest)
+        )
+
+        if not len(cells):
+            return np.zeros(0, dtype=np.intp)
+
+        members = np.concatenate([
+            self._order[self._starts[cell]:self._starts[cell + 1]]
+            for cell in cells
+        ])
+
+        angle = np.arccos(np.clip(
+            np.dot(self.direction[members], observer),
+            -1.0,
+            1.0
+        ))
+        reach = horizon_reach(self.highest[members], min_elevation) + \
+            self.drift[members]
+        members = members[angle <= reach]
+
+        return np.sort(self.rows[members])
+
+    def overhead(self, date, longitude, latitude, height, min_elevation):
+        """
+            Satellites above min_elevation (rad) for an observer at the given
+            geodetic coordinates (rad, rad, m) at date, a datetime covered by
+            the index. Returns their rows, azimuth, elevation (rad) and range
+            (m), and the number of candidates computed.
+        """
+        rows = self.candidates(longitude, latitude, min_elevation)
+        if not len(rows):
+            empty = np.zeros(0)
+            return rows, empty, empty, empty, 0
+
+        dates = [float(ephem.Date(date))]
+        data = self.propagator.subset(rows).propagate(dates, vectors=False)
+        ecef = frames.teme_to_ecef(
+            data['position'][:, 0],
+            frames.gmst(dates[0] + frames.EPHEM_JD_OFFSET)
+        )
+
+        with np.errstate(invalid='ignore'):
+            azimuth, elevation, distance = look_angles(
+                ecef,
+                longitude,
+                latitude,
+                height
+            )
+            visible = elevation >= min_elevation
+
+        return (
+            rows[visible],
+            azimuth[visible],
+            elevation[visible],
+            distance[visible],
+            len(rows)
+        )
+
+
+class SkyIndexLoader(object):
+    """
+        Give access to sky indexes of the latest TLEs of the catalog, valid
+        for OVERHEAD_INDEX_INTERVAL seconds
+
+        The live index, covering the current time, is rebuilt by one request
+        at a time when it expires. Indexes for other times are built outside
+        of the lock, and the last OVERHEAD_INDEX_CACHE_SIZE of them are kept,
+        so that queries on past dates never hold back the live ones.
+    """
+
+    def __init__(self):
+        self._index = None
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+        self._live_lock = threading.Lock()
+
+    def get(self, date):
+        """
+            Return an index covering the given naive UTC datetime
+        """
+        index = self._cached(date)
+        if index is not None:
+            return index
+
+        interval = settings.OVERHEAD_INDEX_INTERVAL
+        if abs(date - datetime.utcnow()) > timedelta(seconds=interval):
+            index = self._build(date)
+
+            with self._lock:
+                self._indexes[index.date] = index
+                while len(self._indexes) > settings.OVERHEAD_INDEX_CACHE_SIZE:
+                    self._indexes.popitem(last=False)
+
+            return index
+
+        with self._live_lock:
+            # Rebuilt meanwhile by another request
+            index = self._cached(date)
+            if index is None:
+                index = self._build(date)
+
+                with self._lock:
+                    self._index = index
+
+            return index
+
+    def _cached(self, date):
+        with self._lock:
+            if self._index is not None and self._index.covers(date):
+                return self._index
+
+            for key, index in self._indexes.items():
+                if index.covers(date):
+                    self._indexes.move_to_end(key)
+                    return index
+
+        return None
+
+    def _build(self, date):
+        return SkyIndex(
+            TLE.objects.findLinesByCatalogEntriesAndTime(
+                CatalogEntry.objects.all(),
+                date
+            ),
+            date,
+            settings.OVERHEAD_INDEX_INTERVAL
+        )
+
+    def clear(self):
+        """
+            Drop the current indexes, the next queries rebuild them
+        """
+        with self._lock:
+            self._index = None
+            self._indexes.clear()
+
+
+sky_index = SkyIndexLoader()
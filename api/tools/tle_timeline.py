@@ -0,0 +1,319 @@
+"""
+    Per process index of the TLE history of every satellite, answering the
+    time based TLE lookups without querying the database
+"""
+
+import bisect
+import logging
+import sys
+import threading
+import time as clock
+from datetime import datetime
+from decimal import Decimal
+
+import pytz
+from django.conf import settings
+
+from catalog.managers import TLEManager
+from catalog.models import Generation, TLE
+
+logger = logging.getLogger(__name__)
+
+# Sorts after any TLE id, used to bisect on a time only
+LAST_ID = float('inf')
+
+
+class SatelliteTimeline(object):
+    """
+        TLEs of a satellite sorted by the date used by a lookup mode, as a
+        list of (timestamp, TLE id) keys and a parallel list of records
+
+        When more than max_size TLEs are known, only the most recent ones are
+        kept and the timeline is marked as truncated.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.keys = []
+        self.records = []
+        self.truncated = False
+
+    def __len__(self):
+        return len(self.keys)
+
+    def insert(self, timestamp, record):
+        key = (timestamp, record[0])
+        index = bisect.bisect_right(self.keys, key)
+        self.keys.insert(index, key)
+        self.records.insert(index, record)
+
+        if self.max_size and len(self.keys) > self.max_size:
+            del self.keys[0]
+            del self.records[0]
+            self.truncated = True
+
+    def latest(self, timestamp):
+        """
+            Return the index of the last TLE at or before timestamp, -1 if
+            there is none, raises LookupError if a dropped TLE may match
+        """
+        index = bisect.bisect_right(self.keys, (timestamp, LAST_ID)) - 1
+        if index < 0 and self.truncated:
+            raise LookupError('timestamp before the kept TLEs')
+
+        return index
+
+    def find(self, timestamp, nearest=False):
+        """
+            Return the record of the TLE matching timestamp, None if there is
+            none, raises LookupError if it may have been dropped
+        """
+        index = self.latest(timestamp)
+
+        if nearest and index + 1 < len(self.keys):
+            # Ties go to the earlier TLE, as for TLEManager
+            if index < 0 or self.keys[index + 1][0] - timestamp < \
+                    timestamp - self.keys[index][0]:
+                index += 1
+
+        return self.records[index] if index >= 0 else None
+
+
+class TLETimeline(object):
+    """
+        TLE history of every satellite, loaded once and then refreshed with
+        the TLEs imported since
+
+        Lookups are bisections in the timelines of a satellite, one sorted by
+        date added and one by epoch. The TLE generation counter, bumped by
+        importtle, is read at most every refresh_interval seconds; when it
+        changed the new TLE rows, which are never updated once imported, are
+        added to the timelines.
+
+        Lookups before the TLEs kept for a satellite, and every lookup while
+        the timeline is disabled, go to TLEManager. Deleted TLEs stay in the
+        timelines until clear() is called.
+    """
+
+    def __init__(self, max_size, refresh_interval):
+        self.max_size = max_size
+        self.refresh_interval = refresh_interval
+
+        self.generation = None
+        self.hits = 0
+        self.fallbacks = 0
+
+        self._timelines = {}
+        self._last_id = 0
+        self._checked = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._timelines)
+
+    @property
+    def enabled(self):
+        return settings.TLE_TIMELINE_ENABLED
+
+    def load(self):
+        """
+            Read the TLEs imported since the last load, everything on the
+            first call
+        """
+        with self._lock:
+            self._load()
+
+    def _load(self):
+        # Read the generation first, TLEs imported meanwhile are read again
+        # by the next refresh at worst
+        self.generation = Generation.objects.current(Generation.TLE)
+        self._checked = clock.monotonic()
+
+        rows = TLE.objects.filter(
+                id__gt=self._last_id,
+                satellite_number__isnull=False
+            ).order_by(
+                'id'
+            ).values_list(
+                'id',
+                'satellite_number',
+                'added',
+                'epoch',
+                'first_line',
+                'second_line',
+                'third_line'
+            ).iterator()
+
+        count = 0
+        for row in rows:
+            self._insert(row)
+            self._last_id = row[0]
+            count += 1
+
+        if count:
+            logger.info(
+                'Loaded %d TLEs, %d satellites using %d bytes',
+                count,
+                len(self._timelines),
+                self._memory()
+            )
+
+    def _insert(self, record):
+        """
+            Add an (id, satellite, added, epoch, line 0, line 1, line 2) TLE
+            record to the timelines of its satellite
+        """
+        timelines = self._timelines.get(record[1])
+        if timelines is None:
+            timelines = self._timelines[record[1]] = (
+                SatelliteTimeline(self.max_size),
+                SatelliteTimeline(self.max_size),
+            )
+
+        for timeline, date in zip(timelines, record[2:4]):
+            if date is not None:
+                timeline.insert(date.timestamp(), record)
+
+    def refresh(self):
+        """
+            Load the new TLEs if the generation changed since the last check,
+            done at most every refresh_interval seconds
+        """
+        with self._lock:
+            if self._checked is not None and \
+                    clock.monotonic() - self._checked < self.refresh_interval:
+                return
+
+            if self.generation is None or \
+                    Generation.objects.current(Generation.TLE) != self.generation:
+                self._load()
+            else:
+                self._checked = clock.monotonic()
+
+    def clear(self):
+        """
+            Drop every timeline, the next lookup loads them again
+        """
+        with self._lock:
+            self._timelines = {}
+            self._last_id = 0
+            self._checked = None
+            self.generation = None
+
+    def build(self, record):
+        """
+            Return a TLE instance from a record, holding its id, satellite,
+            lines, dates and mean motion
+        """
+        tle_id, satellite, added, epoch, first_line, second_line, third_line = record
+
+        return TLE(
+            id=tle_id,
+            satellite_number_id=satellite,
+            added=added,
+            epoch=epoch,
+            first_line=first_line,
+            second_line=second_line,
+            third_line=third_line,
+            mean_motion=Decimal(third_line[52:63]),
+        )
+
+    def find(self, catalogEntry, time=None, mode=None):
+        """
+            Same as TLEManager.findByCatalogEntryAndTime, answered from the
+            timelines when possible
+        """
+        if not self.enabled:
+            return TLE.objects.findByCatalogEntryAndTime(catalogEntry, time, mode)
+
+        if mode is None:
+            mode = settings.TLE_LOOKUP_MODE
+        if mode not in TLEManager.MODES:
+            raise ValueError('Unknown TLE lookup mode "%s"' % mode)
+
+        self.refresh()
+
+        if time is None:
+            time = datetime.utcnow()
+        timestamp = time.replace(tzinfo=pytz.UTC).timestamp()
+
+        with self._lock:
+            timelines = self._timelines.get(catalogEntry.pk)
+
+            try:
+                if timelines is None:
+                    record = None
+                elif mode == TLEManager.ADDED:
+                    record = timelines[0].find(timestamp)
+                else:
+                    record = timelines[1].find(
+                        timestamp,
+                        nearest=mode == TLEManager.NEAREST
+                    )
+            except LookupError:
+                self.fallbacks += 1
+            else:
+                self.hits += 1
+
+                if record is None:
+                    raise IndexError("No TLE found for the given time")
+
+                return self.build(record)
+
+        return TLE.objects.findByCatalogEntryAndTime(catalogEntry, time, mode)
+
+    def _memory(self):
+        """
+            Approximate size in bytes of the timelines
+        """
+        size = sys.getsizeof(self._timelines)
+        records = {}
+
+        for timelines in self._timelines.values():
+            size += sys.getsizeof(timelines)
+            for timeline in timelines:
+                size += sys.getsizeof(timeline.keys) + \
+                    sys.getsizeof(timeline.records)
+                size += sum(
+                    sys.getsizeof(key) + sys.getsizeof(key[0])
+                    for key in timeline.keys
+                )
+                for record in timeline.records:
+                    records[id(record)] = record
+
+        # Records are shared by the two timelines of a satellite
+        for record in records.values():
+            size += sys.getsizeof(record)
+            size += sum(sys.getsizeof(value) for value in record[2:])
+
+        return size
+
+    def stats(self):
+        """
+            Return the counters and the memory use of the timelines
+        """
+        with self._lock:
+            return {
+                'satellites': len(self._timelines),
+                'tles': len(set(
+                    record[0]
+                    for timelines in self._timelines.values()
+                    for timeline in timelines
+                    for record in timeline.records
+                )),
+                'truncated': sum(
+                    1 for timelines in self._timelines.values()
+                    if any(timeline.truncated for timeline in timelines)
+                ),
+                'max_size': self.max_size,
+                'generation': self.generation,
+                'hits': self.hits,
+                'fallbacks': self.fallbacks,
+                'bytes': self._memory(),
+            }
+
+
+tle_timeline = TLETimeline(
+    settings.TLE_TIMELINE_MAX_TLES,
+    settings.TLE_TIMELINE_REFRESH_INTERVAL
+)
@@ -0,0 +1,75 @@
+"""
+    Topocentric coordinates of satellites seen from ground observers
+"""
+
+import math
+
+import numpy as np
+
+from . import frames
+from .frames import enu_rotation
+
+def observer_location(observer):
+    """
+        Return the (longitude, latitude, height) of a pyephem observer, in
+        rad, rad and meters
+    """
+    return float(observer.lon), float(observer.lat), float(observer.elevation)
+
+
+def look_angles(position, longitude, latitude, height):
+    """
+        Azimuth and elevation (rad) and range (m) of earth fixed positions
+        (..., 3) seen from an observer given by its geodetic coordinates
+
+        The elevation is geometric, atmospheric refraction is ignored.
+    """
+    observer = frames.geodetic_to_ecef(longitude, latitude, height)
+    enu = np.dot(position - observer, enu_rotation(longitude, latitude).T)
+
+    distance = np.sqrt(np.einsum('...i,...i->...', enu, enu))
+    azimuth = np.mod(np.arctan2(enu[..., 0], enu[..., 1]), 2.0 * math.pi)
+    elevation = np.arcsin(enu[..., 2] / distance)
+
+    return azimuth, elevation, distance
+
+
+def observe(position, velocity, theta, stations):
+    """
+        Topocentric coordinates of satellites seen from several stations
+
+        position and velocity are TEME vectors (N, M, 3) in m and m/s, theta
+        the sidereal times (M,) of the samples and stations an array (S, 3)
+        of geodetic longitudes, latitudes (rad) and heights (m). Returns the
+        azimuth and elevation (rad), range (m) and range rate (m/s) as arrays
+        (S, N, M), every combination being computed at once.
+    """
+    stations = np.asarray(stations, dtype=np.float64).reshape(-1, 3)
+
+    earth = frames.EarthRotation(theta)
+    ecef = earth.to_ecef(position)
+    ecef_velocity = earth.velocity_to_ecef(velocity, ecef)
+
+    origins = frames.geodetic_to_ecef(
+        stations[:, 0],
+        stations[:, 1],
+        stations[:, 2]
+    )
+    rotation = enu_rotation(stations[:, 0], stations[:, 1])
+
+    # The products are split between the satellite and station terms so that
+    # they are matrix products and the (S, N, M, 3) offsets are never built
+    enu = np.tensordot(rotation, ecef, axes=([2], [2]))
+    enu -= np.einsum('sij,sj->si', rotation, origins)[:, :, np.newaxis, np.newaxis]
+
+    distance = np.sqrt(np.einsum('sinm,sinm->snm', enu, enu))
+    azimuth = np.mod(np.arctan2(enu[:, 0], enu[:, 1]), 2.0 * math.pi)
+    elevation = np.arcsin(enu[:, 2] / distance)
+
+    # Stations are fixed in the earth frame, so the relative velocity is the
+    # earth fixed velocity of the satellite
+    range_rate = np.einsum('nmi,nmi->nm', ecef, ecef_velocity)[np.newaxis] - \
+        np.tensordot(origins, ecef_velocity, axes=([1], [2]))
+    range_rate /= distance
+
+    return azimuth, elevation, distance, range_rate
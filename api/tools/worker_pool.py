@@ -0,0 +1,175 @@
+"""
+    Worker processes sharing the propagation of large batches
+
+    Jobs are split by element sets, each worker receiving the TLE lines of
+    its share rather than model instances, and the resulting arrays are
+    gathered in the calling process.
+"""
+
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import ephem
+import numpy as np
+from django.conf import settings
+
+from .batch_propagator import BatchPropagator
+from .pass_predictor import PassPredictor
+
+logger = logging.getLogger(__name__)
+
+
+def propagate_lines(lines, dates, engine, vectors):
+    """
+        Propagate a list of (line 1, line 2) pairs, run by the workers
+    """
+    return BatchPropagator.from_lines(lines).propagate(dates, engine, vectors)
+
+
+def predict_passes(lines, location, start, end, min_elevation):
+    """
+        Predict the passes of a list of (line 1, line 2) pairs over an
+        observer given by its (longitude, latitude, elevation), run by the
+        workers. Returns the passes and the error codes.
+    """
+    observer = ephem.Observer()
+    observer.lon, observer.lat, observer.elevation = location
+    observer.pressure = 0
+
+    predictor = PassPredictor(BatchPropagator.from_lines(lines), observer)
+    passes = predictor.predict(start, end, min_elevation)
+
+    return passes, predictor.errors
+
+
+class WorkerPool(object):
+    """
+        Pool of COMPUTE_WORKERS processes, created on first use
+
+        With less than two workers, or when the job is too small to be worth
+        sending to other processes, it is run in the calling process. If the
+        pool can't be started or a worker dies, the job is run in the calling
+        process as well.
+    """
+
+    # Smallest number of element sets sent to a worker
+    min_chunk = 500
+
+    def __init__(self, workers=None):
+        """
+            workers defaults to the COMPUTE_WORKERS setting
+        """
+        self._workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self):
+        if self._workers is not None:
+            return self._workers
+        return settings.COMPUTE_WORKERS
+
+    def chunks(self, count):
+        """
+            Return the (first, last) bounds splitting count element sets
+            between the workers, a single chunk if they are not used
+        """
+        parts = min(self.workers, count // self.min_chunk)
+        if parts < 2:
+            return [(0, count)]
+
+        bounds = np.linspace(0, count, parts + 1).astype(int).tolist()
+
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def map(self, function, jobs):
+        """
+            Return the results of function over the argument tuples of jobs,
+            computed by the workers when there is more than one job
+        """
+        jobs = list(jobs)
+
+        if len(jobs) > 1:
+            try:
+                executor = self._get_executor()
+                futures = [executor.submit(function, *job) for job in jobs]
+                return [future.result() for future in futures]
+            except (BrokenProcessPool, OSError) as e:
+                logger.warning('Worker pool failed, computing in process: %s', e)
+                self.shutdown()
+
+        return [function(*job) for job in jobs]
+
+    def propagate(self, lines, dates, engine=BatchPropagator.SGP4, vectors=True):
+        """
+            Same as BatchPropagator.propagate() for a list of (line 1, line 2)
+            pairs, the element sets being shared between the workers
+        """
+        lines = list(lines)
+        dates = np.asarray(dates, dtype=np.float64)
+        per_row = dates.ndim == 2 and dates.shape[0] > 1
+
+        chunks = self.chunks(len(lines))
+        if len(chunks) == 1:
+            return propagate_lines(lines, dates, engine, vectors)
+
+        results = self.map(propagate_lines, [
+            (
+                lines[first:last],
+                dates[first:last] if per_row else dates,
+                engine,
+                vectors
+            )
+            for first, last in chunks
+        ])
+
+        return dict(
+            (key, np.concatenate([result[key] for result in results]))
+            for key in results[0]
+        )
+
+    def predict_passes(self, lines, observer, start, end, min_elevation=0.0):
+        """
+            Same as PassPredictor.predict() for a list of (line 1, line 2)
+            pairs and a pyephem observer, returns the passes and the error
+            code of each element set
+        """
+        lines = list(lines)
+        location = (
+            float(observer.lon),
+            float(observer.lat),
+            float(observer.elevation)
+        )
+
+        results = self.map(predict_passes, [
+            (lines[first:last], location, start, end, min_elevation)
+            for first, last in self.chunks(len(lines))
+        ])
+
+        passes = [p for result in results for p in result[0]]
+        errors = np.concatenate([result[1] for result in results]) if results \
+            else np.zeros(0, dtype=np.int8)
+
+        return passes, errors
+
+    def shutdown(self):
+        """
+            Stop the worker processes, a new pool is started on next use
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+            return self._executor
+
+
+worker_pool = WorkerPool()
@@ -1,7 +1,7 @@
 from django.conf.urls import url, include
 from rest_framework import routers
 
-from .views import LaunchSiteViewSet, OperationalStatusViewSet, OrbitalStatusViewSet, SourceViewSet, CatalogEntryViewSet, TLEViewSet, DataSourceViewSet, ComputeView
+from .views import LaunchSiteViewSet, OperationalStatusViewSet, OrbitalStatusViewSet, SourceViewSet, CatalogEntryViewSet, TLEViewSet, DataSourceViewSet, ComputeView, TrackView, SnapshotView, PassesView, CatalogPassesView, ConjunctionsView, ObservationsView, StateVectorView, CatalogStateVectorView, OverheadView, RegionView
 
 router = routers.DefaultRouter()
 router.register(r'launchsite', LaunchSiteViewSet)
@@ -14,5 +14,15 @@ router.register(r'datasource', DataSourceViewSet)
 
 urlpatterns = [
     url(r'^', include(router.urls)),
-    url(r'^compute/(?P<satellite_number>\d+)/$', ComputeView.as_view())
+    url(r'^compute/(?P<satellite_number>\d+)/$', ComputeView.as_view()),
+    url(r'^compute/(?P<satellite_number>\d+)/track/$', TrackView.as_view()),
+    url(r'^compute/(?P<satellite_number>\d+)/passes/$', PassesView.as_view()),
+    url(r'^compute/(?P<satellite_number>\d+)/state/$', StateVectorView.as_view()),
+    url(r'^compute/snapshot/$', SnapshotView.as_view()),
+    url(r'^compute/passes/$', CatalogPassesView.as_view()),
+    url(r'^compute/conjunctions/$', ConjunctionsView.as_view()),
+    url(r'^compute/observations/$', ObservationsView.as_view()),
+    url(r'^compute/state/$', CatalogStateVectorView.as_view()),
+    url(r'^compute/overhead/$', OverheadView.as_view()),
+    url(r'^compute/region/$', RegionView.as_view()),
 ]
@@ -1,4 +1,8 @@
-from .pagination import StandardResultSetPagination
+from .pagination import StandardResultSetPagination, KeysetPagination, SelectablePagination
+from .rowlist import RowListMixin
+from .fieldsets import Fieldset, FieldsetMixin
+from .conditional import ConditionalMixin
+from .cached import CachedResponseMixin
 from .filters import OrbitalStatusFilter, LaunchSiteFilter, SourceFilter, OperationalStatusFilter, CatalogEntryFilter
 
 from .catalogentry import CatalogEntryViewSet
@@ -8,4 +12,12 @@ from .datasource import DataSourceViewSet
 from .tle import TLEViewSet
 from .source import SourceViewSet
 from .launchsite import LaunchSiteViewSet
-from .compute import ComputeView
\ No newline at end of file
+from .compute import ComputeView
+from .track import TrackView
+from .snapshot import SnapshotView
+from .passes import PassesView, CatalogPassesView
+from .conjunctions import ConjunctionsView
+from .observations import ObservationsView
+from .statevector import StateVectorView, CatalogStateVectorView
+from .overhead import OverheadView
+from .region import RegionView
\ No newline at end of file
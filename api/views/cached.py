@@ -0,0 +1,58 @@
+from django.http import HttpResponse
+
+from api.tools import response_cache
+
+class CachedResponseMixin(object):
+    """
+        Serve the JSON responses of the list and retrieve actions of a model
+        viewset from the response cache when API_CACHE_ENABLED is set
+    """
+
+    cached_actions = ('list', 'retrieve')
+    cached_formats = ('json',)
+
+    def cached(self, handler, request, *args, **kwargs):
+        """
+            Return the cached response to the request, otherwise the
+            response of handler, cached once rendered if it is a success
+        """
+        if not response_cache.enabled or \
+                self.action not in self.cached_actions or \
+                request.accepted_renderer.format not in self.cached_formats:
+            return handler(request, *args, **kwargs)
+
+        key = response_cache.key(request)
+
+        cached = response_cache.get(key)
+        if cached is not None:
+            content, headers = cached
+
+            response = HttpResponse(content)
+            for header, value in headers.items():
+                response[header] = value
+
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda response: response_cache.set(key, response)
+            )
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(
+            super(CachedResponseMixin, self).list,
+            request,
+            *args,
+            **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(
+            super(CachedResponseMixin, self).retrieve,
+            request,
+            *args,
+            **kwargs
+        )
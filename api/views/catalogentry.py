@@ -13,21 +13,39 @@ from api.serializers import CatalogEntrySerializer, TLESerializer
 
 from api.tools import SatelliteComputation, format_inline_time
 
-from api.views import StandardResultSetPagination
+from api.views import CachedResponseMixin, ConditionalMixin
+from api.views import FieldsetMixin, RowListMixin, SelectablePagination
 from api.views import CatalogEntryFilter
+from api.views.search import CatalogSearchFilter
 
-class CatalogEntryViewSet(viewsets.ReadOnlyModelViewSet):
+class CatalogEntryViewSet(
+        ConditionalMixin,
+        CachedResponseMixin,
+        FieldsetMixin,
+        RowListMixin,
+        viewsets.ReadOnlyModelViewSet):
     """
         CatalogEntry API class views
     """
-    queryset = CatalogEntry.objects.all()
+    # Everything the nested serializers read comes with the entries
+    queryset = CatalogEntry.objects.select_related(
+        'operational_status',
+        'owner',
+        'launch_site',
+        'orbital_status',
+    )
     serializer_class = CatalogEntrySerializer
-    pagination_class = StandardResultSetPagination
+    pagination_class = SelectablePagination
+
+    # Keyset of the cursor pagination
+    cursor_ordering = ('norad_catalog_number',)
+
+    last_modified_field = 'updated'
 
     filter_backends = (
         backends.DjangoFilterBackend,
         filters.OrderingFilter,
-        filters.SearchFilter,
+        CatalogSearchFilter,
     )
     filter_class = CatalogEntryFilter
 
@@ -45,6 +63,15 @@ class CatalogEntryViewSet(viewsets.ReadOnlyModelViewSet):
         'orbital_status__description',
     )
 
+    def get_queryset(self):
+        queryset = super(CatalogEntryViewSet, self).get_queryset()
+
+        # The current TLE is read with the entry by the tle action
+        if self.action == 'tle':
+            queryset = queryset.select_related('current_tle__classification')
+
+        return queryset
+
     @detail_route(methods=['get'])
     def tle(self, request, pk=None):
         """
@@ -60,7 +87,14 @@ class CatalogEntryViewSet(viewsets.ReadOnlyModelViewSet):
             if given_time is not None:
                 time = format_inline_time(given_time)
 
-            tle = TLE.objects.findByCatalogEntryAndTime(entry, time)
+            if given_time is None and entry.current_tle is not None:
+                tle = entry.current_tle
+            else:
+                tle = TLE.objects.findByCatalogEntryAndTime(entry, time)
+
+            # The entry is already loaded with its related objects
+            tle.satellite_number = entry
+
             serializer = TLESerializer(tle)
 
             return Response(serializer.data)
@@ -1,18 +1,38 @@
 from datetime import datetime
 
+import ephem
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
 
-from catalog.models import CatalogEntry, TLE
-from api.tools import SatelliteComputation, format_inline_time
+from catalog.models import CatalogEntry
+from api.tools import BatchPropagator, SatelliteComputation, ephemeris_cache, ephemeris_tiles, format_inline_time, tle_timeline
+from api.tools.eclipse import STATES, eclipse
+from api.views.observer import parse_observer
 
 class ComputeView(APIView):
+    """
+        Position of a satellite at a given time
+
+        If an observer is given by its latitude and longitude (deg) and its
+        elevation (m), the topocentric coordinates of the satellite seen from
+        it are returned too.
+
+        With eclipse=true, the sunlight state of the satellite (sunlit,
+        penumbra or umbra) and the fraction of the solar disk it sees are
+        returned too.
+
+        Without time, the current TLE of the catalog entry is used.
+
+        When the ephemeris tiles cover the TLE and the date, the position is
+        interpolated from them rather than propagated.
+    """
 
     def get(self, request, satellite_number, format=None):
         entry = get_object_or_404(
-            CatalogEntry,
+            CatalogEntry.objects.select_related('current_tle'),
             norad_catalog_number=satellite_number
         )
 
@@ -25,28 +45,77 @@ class ComputeView(APIView):
             )
 
         try:
-            tle = TLE.objects.findByCatalogEntryAndTime(entry, time)
+            if 'time' not in request.GET and entry.current_tle is not None:
+                tle = entry.current_tle
+            else:
+                tle = tle_timeline.find(entry, time)
         except:
             return Response(
                 {'detail': 'No TLE corresponding to the given date.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        sc = SatelliteComputation(tle=tle)
-        sc.observer.date = time
+        observer = None
+        if 'latitude' in request.GET or 'longitude' in request.GET:
+            try:
+                observer = parse_observer(request.GET)
+            except ValueError:
+                return Response(
+                    {'detail': 'The given observer is not correct'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        with_eclipse = request.GET.get('eclipse', 'false').lower() in ('true', '1')
+
+        # Answer from the precomputed tiles when they cover the date
+        tiles = ephemeris_tiles.get()
+        data = tiles.compute(tle.id, time) if tiles is not None else None
 
         try:
-            data = sc.compute()
+            # The computation is only set up when it is used
+            if data is None or observer is not None:
+                sc = SatelliteComputation(tle=tle)
+                if observer is not None:
+                    sc.observer = observer
+                sc.observer.date = time
+
+            if data is None:
+                data = sc.compute()
+
+            if observer is not None:
+                topocentric = sc.observe()
         except ValueError as e:
             return Response(
                 {'detail': '{0}'.format(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        return Response({
+        result = {
             'longitude' : data['longitude'],
             'latitude' : data['latitude'],
             'elevation' : data['elevation'],
             'velocity' : data['velocity'],
             'tle' : tle.id,
-        })
+        }
+
+        if observer is not None:
+            result['topocentric'] = topocentric
+
+        if with_eclipse:
+            state, sunlight, error = eclipse(
+                ephemeris_cache.get(tle),
+                [ephem.Date(time)],
+                BatchPropagator.EPHEM
+            )
+            if error[0]:
+                return Response(
+                    {'detail': BatchPropagator.ERROR_MESSAGES[error[0]]},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            result['eclipse'] = {
+                'state': STATES[state[0, 0]],
+                'sunlight': float(sunlight[0, 0]),
+            }
+
+        return Response(result)
@@ -0,0 +1,139 @@
+from calendar import timegm
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from rest_framework import serializers
+
+from api.tools import data_generation
+
+class ConditionalMixin(object):
+    """
+        Answer the conditional list and retrieve requests of a model viewset
+        with 304 Not Modified, before reading and serializing the data
+
+        The ETag is made of the data generation, bumped by every import, and
+        of the format of the response. The Last-Modified date is the time of
+        the last import for the lists, the last_modified_field of the object
+        for the details, or the time of the last import when it is later and
+        nested objects, changed by the imports, are returned with it.
+    """
+
+    # Time the object was last modified, None to use the last import
+    last_modified_field = None
+
+    def get_etag(self, request):
+        value, _ = data_generation.state()
+
+        return '%d-%s' % (value, request.accepted_renderer.format)
+
+    def get_last_modified(self, request, *args, **kwargs):
+        """
+            Return the last modification time of the requested data, None if
+            it is unknown
+        """
+        _, updated = data_generation.state()
+
+        if self.action != 'retrieve' or self.last_modified_field is None:
+            return updated
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        times = list(
+            self.get_queryset().filter(
+                **{self.lookup_field: kwargs[lookup_url_kwarg]}
+            ).values_list(
+                self.last_modified_field,
+                flat=True
+            )[:1]
+        )
+
+        if not times:
+            return None
+
+        return self._object_last_modified(times[0])
+
+    def get_object(self):
+        instance = super(ConditionalMixin, self).get_object()
+
+        # Without reading a column left out by the fieldset
+        if self.last_modified_field is not None and \
+                self.last_modified_field not in instance.get_deferred_fields():
+            self.last_modified = self._object_last_modified(
+                getattr(instance, self.last_modified_field)
+            )
+
+        return instance
+
+    def _object_last_modified(self, time):
+        """
+            Return the last modification time of an object modified at time,
+            the time of the last import if it is later and nested objects are
+            returned
+        """
+        _, updated = data_generation.state()
+
+        if updated is None or not self._nested():
+            return time
+
+        return updated if time is None else max(time, updated)
+
+    def _nested(self):
+        """
+            Whether the serializer of the view returns nested objects
+        """
+        return any(
+            isinstance(field, serializers.BaseSerializer)
+            for field in self.get_serializer().fields.values()
+        )
+
+    def conditional(self, handler, request, *args, **kwargs):
+        """
+            Return 304 when the request conditions match the current data,
+            otherwise the response of handler with its validators
+        """
+        etag = self.get_etag(request)
+
+        # The object is only read beforehand when its date is compared
+        self.last_modified = None
+        if self.action != 'retrieve' or \
+                request.META.get('HTTP_IF_MODIFIED_SINCE'):
+            self.last_modified = self.get_last_modified(request, *args, **kwargs)
+
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=self._timestamp(self.last_modified)
+        )
+
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+        response['ETag'] = quote_etag(etag)
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(self._timestamp(self.last_modified))
+
+        return response
+
+    def _timestamp(self, time):
+        if time is None:
+            return None
+
+        return timegm(time.utctimetuple())
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(
+            super(ConditionalMixin, self).list,
+            request,
+            *args,
+            **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(
+            super(ConditionalMixin, self).retrieve,
+            request,
+            *args,
+            **kwargs
+        )
@@ -0,0 +1,117 @@
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from catalog.models import CatalogEntry, TLE
+from api.tools import BatchPropagator, ConjunctionScreener, format_inline_time
+
+from api.views import CatalogEntryFilter
+from api.views.streaming import StreamingJSONResponse
+
+class ConjunctionsView(APIView):
+    """
+        Close approaches between catalog entries
+
+        Accepts the catalog entry filters. start and end use the same format
+        as the compute view time, without end one hour is screened. threshold
+        is the miss distance in km under which an approach is reported, up to
+        COMPUTE_CONJUNCTIONS_MAX_THRESHOLD, and satellite restricts the screening to the approaches of one entry.
+    """
+
+    default_duration = timedelta(hours=1)
+
+    def get(self, request, format=None):
+        try:
+            start = format_inline_time(request.GET.get('start', None))
+
+            end = request.GET.get('end', None)
+            end = format_inline_time(end) if end else start + self.default_duration
+
+            threshold = float(request.GET.get(
+                'threshold',
+                ConjunctionScreener.default_threshold / 1000.0
+            )) * 1000.0
+        except ValueError:
+            return Response(
+                {'detail': 'The given parameters are not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if end <= start or not math.isfinite(threshold) or threshold <= 0:
+            return Response(
+                {'detail': 'The given parameters are not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Larger distances make the grid keep every pair of satellites
+        if threshold > settings.COMPUTE_CONJUNCTIONS_MAX_THRESHOLD * 1000.0:
+            return Response(
+                {'detail': 'The threshold can not be more than {0} km'.format(
+                    settings.COMPUTE_CONJUNCTIONS_MAX_THRESHOLD
+                )},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        entries = CatalogEntryFilter(
+            request.GET,
+            queryset=CatalogEntry.objects.all()
+        ).qs
+
+        lines = TLE.objects.findLinesByCatalogEntriesAndTime(entries, start)
+        numbers = [line[0] for line in lines]
+
+        primary = request.GET.get('satellite', None)
+        if primary is not None:
+            if primary not in numbers:
+                return Response(
+                    {'detail': 'No TLE corresponding to the given satellite.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            primary = numbers.index(primary)
+
+        steps = math.ceil((end - start).total_seconds() / ConjunctionScreener.step)
+        if len(lines) * steps > settings.COMPUTE_CONJUNCTIONS_MAX_SAMPLES:
+            return Response(
+                {'detail': 'Too many positions requested, the maximum is {0} '
+                           'satellites times steps of {1} seconds'.format(
+                    settings.COMPUTE_CONJUNCTIONS_MAX_SAMPLES,
+                    ConjunctionScreener.step
+                )},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        conjunctions = []
+        if lines:
+            conjunctions = ConjunctionScreener(
+                BatchPropagator.from_lines(
+                    [(line1, line2) for _, _, line1, line2 in lines]
+                ),
+                threshold
+            ).screen(start, end, primary)
+
+        return StreamingJSONResponse(
+            {
+                'start': start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'end': end.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'threshold': threshold / 1000.0,
+                'count': len(conjunctions),
+            },
+            self.rows(numbers, conjunctions)
+        )
+
+    def rows(self, numbers, conjunctions):
+        """
+            Yield the conjunctions one by one, distances in km
+        """
+        for conjunction in conjunctions:
+            yield {
+                'first': numbers[conjunction['first']],
+                'second': numbers[conjunction['second']],
+                'tca': conjunction['tca'].strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+                'miss_distance': conjunction['miss_distance'] / 1000.0,
+                'relative_velocity': conjunction['relative_velocity'],
+            }
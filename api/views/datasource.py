@@ -3,7 +3,13 @@ from rest_framework import viewsets
 from fetcher.models import DataSource
 from api.serializers import DataSourceSerializer
 
-class DataSourceViewSet(viewsets.ReadOnlyModelViewSet):
+from api.views import CachedResponseMixin, ConditionalMixin, FieldsetMixin
+
+class DataSourceViewSet(
+        ConditionalMixin,
+        CachedResponseMixin,
+        FieldsetMixin,
+        viewsets.ReadOnlyModelViewSet):
     """
         DataSource API class view
     """
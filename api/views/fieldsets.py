@@ -0,0 +1,189 @@
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+
+class Fieldset(object):
+    """
+        Selection of the fields of a serializer given by the fields and
+        expand parameters, both comma separated lists
+
+        fields lists the fields to return, the fields of a nested object are
+        given as "relation.field". expand lists the relations returned as
+        nested objects, "relation.relation" for the ones of a nested object.
+        Other relations are returned as their primary key, except when
+        neither parameter is given: everything is then returned, as without
+        a fieldset.
+    """
+
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+
+    def __init__(self, fields=None, expand=None):
+        self.fields = self._paths(fields)
+        self.expand = self._paths(expand)
+
+        # The relations leading to selected nested fields, or to expanded
+        # relations, are expanded
+        if self.fields is not None or self.expand is not None:
+            expand = self.expand or frozenset()
+            self.expand = expand | frozenset(
+                path[:length]
+                for path in (self.fields or frozenset()) | expand
+                for length in range(1, len(path))
+            )
+
+    @classmethod
+    def from_request(cls, request):
+        """
+            Return the fieldset of a request, None if it has none
+        """
+        params = request.query_params
+        if cls.fields_query_param not in params and \
+                cls.expand_query_param not in params:
+            return None
+
+        return cls(
+            params.get(cls.fields_query_param),
+            params.get(cls.expand_query_param)
+        )
+
+    def _paths(self, value):
+        if value is None:
+            return None
+
+        return frozenset(
+            tuple(name.strip().split('.'))
+            for name in value.split(',') if name.strip()
+        )
+
+    def _selected(self, path):
+        """
+            Whether the field at path is returned, all of its fields when it
+            is a nested object
+        """
+        if self.fields is None:
+            return True
+
+        return any(path[:len(field)] == field for field in self.fields) or \
+            any(field[:len(path)] == path for field in self.fields)
+
+    def _expanded(self, path):
+        return self.expand is None or path in self.expand
+
+    def apply(self, serializer):
+        """
+            Remove the fields left out from a serializer, and replace the
+            relations which are not expanded by primary key fields, raises
+            ParseError if a field or a relation is unknown
+        """
+        if isinstance(serializer, serializers.ListSerializer):
+            serializer = serializer.child
+
+        # Checked against every field, before any is left out
+        known = self._known(serializer, ())
+        paths = (self.fields or frozenset()) | (self.expand or frozenset())
+
+        for path in sorted(paths):
+            if path not in known:
+                raise ParseError('Unknown field "%s"' % '.'.join(path))
+
+        for path in sorted(self.expand or frozenset()):
+            if not known[path]:
+                raise ParseError('Field "%s" can not be expanded' % '.'.join(path))
+
+        self._apply(serializer, ())
+
+    def _known(self, serializer, prefix):
+        """
+            Return a dict of the paths of the fields of a serializer and of
+            its nested serializers, telling whether they are relations
+        """
+        known = {}
+        for name, field in serializer.fields.items():
+            path = prefix + (name,)
+            known[path] = isinstance(field, serializers.BaseSerializer)
+
+            if known[path]:
+                known.update(self._known(field, path))
+
+        return known
+
+    def _apply(self, serializer, prefix):
+        for name, field in list(serializer.fields.items()):
+            path = prefix + (name,)
+
+            if not self._selected(path):
+                serializer.fields.pop(name)
+            elif isinstance(field, serializers.BaseSerializer):
+                if self._expanded(path):
+                    self._apply(field, path)
+                else:
+                    serializer.fields[name] = self._primaryKey(field)
+
+    def _primaryKey(self, field):
+        kwargs = {'read_only': True}
+        if field.source != field.field_name:
+            kwargs['source'] = field.source
+
+        return serializers.PrimaryKeyRelatedField(**kwargs)
+
+    def columns(self, serializer, prefix=''):
+        """
+            Return the columns read by a serializer and the relations it
+            follows, as only() and select_related() arguments
+        """
+        if isinstance(serializer, serializers.ListSerializer):
+            serializer = serializer.child
+
+        columns = []
+        related = []
+        for field in serializer.fields.values():
+            source = prefix + field.source
+            columns.append(source)
+
+            if isinstance(field, serializers.BaseSerializer):
+                nested_columns, nested_related = self.columns(field, source + '__')
+                columns += nested_columns
+                related += [source] + nested_related
+
+        return columns, related
+
+
+class FieldsetMixin(object):
+    """
+        Restrict the fields returned by the list and retrieve actions of a
+        model viewset to the Fieldset of the request
+
+        Only the columns of the returned fields are read, and the relations
+        which are not expanded are not joined.
+    """
+
+    fieldset_actions = ('list', 'retrieve')
+
+    @property
+    def fieldset(self):
+        if not hasattr(self, '_fieldset'):
+            self._fieldset = None
+            if self.action in self.fieldset_actions:
+                self._fieldset = Fieldset.from_request(self.request)
+
+        return self._fieldset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super(FieldsetMixin, self).get_serializer(*args, **kwargs)
+        if self.fieldset is not None:
+            self.fieldset.apply(serializer)
+
+        return serializer
+
+    def get_queryset(self):
+        queryset = super(FieldsetMixin, self).get_queryset()
+
+        if self.fieldset is not None:
+            columns, related = self.fieldset.columns(self.get_serializer())
+
+            queryset = queryset.select_related(None)
+            if related:
+                queryset = queryset.select_related(*related)
+            queryset = queryset.only(*columns)
+
+        return queryset
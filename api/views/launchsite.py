@@ -3,7 +3,13 @@ from rest_framework import viewsets
 from catalog.models import LaunchSite
 from api.serializers import LaunchSiteSerializer
 
-class LaunchSiteViewSet(viewsets.ReadOnlyModelViewSet):
+from api.views import CachedResponseMixin, ConditionalMixin, FieldsetMixin
+
+class LaunchSiteViewSet(
+        ConditionalMixin,
+        CachedResponseMixin,
+        FieldsetMixin,
+        viewsets.ReadOnlyModelViewSet):
     """
         LaunchSite API class view
     """
@@ -0,0 +1,168 @@
+from datetime import timedelta
+
+import ephem
+import numpy as np
+
+from django.conf import settings
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from catalog.models import CatalogEntry, TLE
+from api.tools import format_inline_time, worker_pool
+from api.tools import frames
+from api.tools.topocentric import observe
+
+from api.views import CatalogEntryFilter
+from api.views.observer import parse_stations
+from api.views.streaming import StreamingJSONResponse
+
+class ObservationsView(APIView):
+    """
+        Topocentric coordinates of catalog entries seen from several stations
+
+        Each station is given by a "latitude,longitude[,elevation]" station
+        parameter, in degrees and meters. Accepts the catalog entry filters.
+        Either a single time or a start, an end and a step in seconds are
+        given, times use the same format as the compute view time. With
+        min_elevation (deg), only the rows above it are returned.
+
+        Rows are compact arrays whose columns are described by the "fields"
+        key, station and time being indices in the "stations" and "times"
+        lists. Satellites which can't be computed are listed in "failed".
+    """
+
+    fields = (
+        'station',
+        'norad_catalog_number',
+        'time',
+        'azimuth',
+        'elevation',
+        'range',
+        'range_rate',
+    )
+
+    default_step = 60
+
+    def get(self, request, format=None):
+        try:
+            stations = parse_stations(request.GET.getlist('station'))
+        except (TypeError, ValueError):
+            return Response(
+                {'detail': 'The given stations are not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            times = self.parse_times(request.GET)
+
+            min_elevation = request.GET.get('min_elevation', None)
+            if min_elevation is not None:
+                min_elevation = float(min_elevation)
+        except ValueError:
+            return Response(
+                {'detail': 'The given time range is not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        entries = CatalogEntryFilter(
+            request.GET,
+            queryset=CatalogEntry.objects.all()
+        ).qs
+
+        lines = TLE.objects.findLinesByCatalogEntriesAndTime(entries, times[0])
+
+        count = len(stations) * len(lines) * len(times)
+        if count > settings.COMPUTE_OBSERVATIONS_MAX_POINTS:
+            return Response(
+                {'detail': 'Too many points requested, the maximum is {0} '
+                           'stations times satellites times dates'.format(
+                    settings.COMPUTE_OBSERVATIONS_MAX_POINTS
+                )},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        dates = np.array([float(ephem.Date(time)) for time in times])
+
+        data = worker_pool.propagate(
+            [(line1, line2) for _, _, line1, line2 in lines],
+            dates
+        )
+
+        with np.errstate(invalid='ignore'):
+            azimuth, elevation, distance, range_rate = observe(
+                data['position'],
+                data['velocity_vector'],
+                frames.gmst(dates + frames.EPHEM_JD_OFFSET),
+                stations
+            )
+
+        visible = np.ones(azimuth.shape, dtype=bool)
+        visible[:, data['error'] != 0] = False
+        if min_elevation is not None:
+            with np.errstate(invalid='ignore'):
+                visible &= elevation >= np.radians(min_elevation)
+
+        return StreamingJSONResponse(
+            {
+                'stations': [
+                    [np.degrees(latitude), np.degrees(longitude), height]
+                    for longitude, latitude, height in stations.tolist()
+                ],
+                'times': [time.strftime('%Y-%m-%dT%H:%M:%SZ') for time in times],
+                'count': int(np.count_nonzero(visible)),
+                'fields': self.fields,
+                'failed': [
+                    line[0] for line, error in zip(lines, data['error'])
+                    if error
+                ],
+            },
+            self.rows(
+                lines,
+                visible,
+                np.degrees(azimuth),
+                np.degrees(elevation),
+                distance,
+                range_rate
+            )
+        )
+
+    def parse_times(self, params):
+        """
+            Return the list of datetimes of the request, raises ValueError if
+            they are not correct
+        """
+        if 'start' not in params:
+            return [format_inline_time(params.get('time', None))]
+
+        start = format_inline_time(params['start'])
+        end = format_inline_time(params.get('end', params['start']))
+        step = int(params.get('step', self.default_step))
+
+        if step <= 0 or end < start:
+            raise ValueError('incorrect time range')
+
+        count = int((end - start).total_seconds() // step) + 1
+        if count > settings.COMPUTE_OBSERVATIONS_MAX_POINTS:
+            raise ValueError('too many dates')
+
+        return [start + timedelta(seconds=i * step) for i in range(count)]
+
+    def rows(self, lines, visible, azimuth, elevation, distance, range_rate):
+        """
+            Yield one compact row per station, satellite and time
+        """
+        station, satellite, time = np.nonzero(visible)
+
+        rows = zip(
+            station.tolist(),
+            [lines[i][0] for i in satellite.tolist()],
+            time.tolist(),
+            azimuth[visible].tolist(),
+            elevation[visible].tolist(),
+            distance[visible].tolist(),
+            range_rate[visible].tolist(),
+        )
+
+        for row in rows:
+            yield list(row)
@@ -0,0 +1,63 @@
+import math
+
+import ephem
+import numpy as np
+
+def parse_station(latitude, longitude, elevation=0):
+    """
+        Return the (longitude, latitude, elevation) of a station in rad, rad
+        and meters from its latitude and longitude in degrees, raises
+        ValueError if they are not numbers or out of range
+    """
+    latitude = float(latitude)
+    longitude = float(longitude)
+    elevation = float(elevation)
+
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise ValueError('observer out of range')
+
+    return math.radians(longitude), math.radians(latitude), elevation
+
+
+def parse_observer(params):
+    """
+        Build a pyephem observer from the latitude, longitude and elevation
+        request parameters, raises ValueError if they are missing or not
+        correct
+    """
+    if 'latitude' not in params or 'longitude' not in params:
+        raise ValueError('missing observer')
+
+    longitude, latitude, elevation = parse_station(
+        params['latitude'],
+        params['longitude'],
+        params.get('elevation', 0)
+    )
+
+    observer = ephem.Observer()
+    observer.lat = latitude
+    observer.lon = longitude
+    observer.elevation = elevation
+    observer.pressure = 0
+
+    return observer
+
+
+def parse_stations(values):
+    """
+        Parse a list of stations given as "latitude,longitude[,elevation]",
+        returns an array (S, 3) of longitudes, latitudes (rad) and elevations
+        (m)
+    """
+    if not values:
+        raise ValueError('missing stations')
+
+    stations = []
+    for station in values:
+        fields = station.split(',')
+        if len(fields) not in (2, 3):
+            raise ValueError('incorrect station')
+
+        stations.append(parse_station(*fields))
+
+    return np.array(stations)
@@ -3,7 +3,13 @@ from rest_framework import viewsets
 from catalog.models import OperationalStatus
 from api.serializers import OperationalStatusSerializer
 
-class OperationalStatusViewSet(viewsets.ReadOnlyModelViewSet):
+from api.views import CachedResponseMixin, ConditionalMixin, FieldsetMixin
+
+class OperationalStatusViewSet(
+        ConditionalMixin,
+        CachedResponseMixin,
+        FieldsetMixin,
+        viewsets.ReadOnlyModelViewSet):
     """
         OperationalSatus API class view
     """
@@ -3,7 +3,13 @@ from rest_framework import viewsets
 from catalog.models import OrbitalStatus
 from api.serializers import OrbitalStatusSerializer
 
-class OrbitalStatusViewSet(viewsets.ReadOnlyModelViewSet):
+from api.views import CachedResponseMixin, ConditionalMixin, FieldsetMixin
+
+class OrbitalStatusViewSet(
+        ConditionalMixin,
+        CachedResponseMixin,
+        FieldsetMixin,
+        viewsets.ReadOnlyModelViewSet):
     """
         OrbitalStatus API class view
     """
@@ -0,0 +1,94 @@
+import math
+
+import numpy as np
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from api.tools import format_inline_time, sky_index
+from api.tools.topocentric import observer_location
+
+from api.views.observer import parse_observer
+from api.views.streaming import StreamingJSONResponse
+
+class OverheadView(APIView):
+    """
+        Satellites above the horizon of an observer
+
+        The observer is given by its latitude and longitude in degrees and its
+        elevation in meters, only the satellites above min_elevation (deg) at
+        time are returned, highest first. The candidates are found with an
+        index of the sub-satellite points, so that only the satellites which
+        may be visible are propagated.
+
+        Rows are compact arrays whose columns are described by the "fields"
+        key, azimuth and elevation in degrees and range in meters.
+    """
+
+    fields = (
+        'norad_catalog_number',
+        'tle',
+        'azimuth',
+        'elevation',
+        'range',
+    )
+
+    def get(self, request, format=None):
+        try:
+            longitude, latitude, height = observer_location(
+                parse_observer(request.GET)
+            )
+        except ValueError:
+            return Response(
+                {'detail': 'The given observer is not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            time = format_inline_time(request.GET.get('time', None))
+            min_elevation = float(request.GET.get('min_elevation', 0))
+        except ValueError:
+            return Response(
+                {'detail': 'The given time or elevation is not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not -90 <= min_elevation <= 90:
+            return Response(
+                {'detail': 'The given time or elevation is not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        index = sky_index.get(time)
+        rows, azimuth, elevation, distance, candidates = index.overhead(
+            time,
+            longitude,
+            latitude,
+            height,
+            math.radians(min_elevation)
+        )
+
+        order = np.argsort(-elevation, kind='mergesort')
+
+        return StreamingJSONResponse(
+            {
+                'time': time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'count': len(rows),
+                'candidates': candidates,
+                'fields': self.fields,
+            },
+            self.rows(
+                [index.lines[row] for row in rows[order].tolist()],
+                np.degrees(azimuth[order]).tolist(),
+                np.degrees(elevation[order]).tolist(),
+                distance[order].tolist()
+            )
+        )
+
+    def rows(self, lines, azimuth, elevation, distance):
+        """
+            Yield one compact row per visible satellite
+        """
+        for line, values in zip(lines, zip(azimuth, elevation, distance)):
+            yield [line[0], line[1]] + list(values)
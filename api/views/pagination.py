@@ -6,4 +6,71 @@ class StandardResultSetPagination(pagination.PageNumberPagination):
     """
     page_size = 100
     page_size_query_param = 'limit'
-    max_page_size = 1000
\ No newline at end of file
+    max_page_size = 1000
+
+class KeysetPagination(pagination.CursorPagination):
+    """
+        Cursor pagination on the cursor_ordering of the view, an indexed and
+        stable ordering, so that a page is read from where the previous one
+        ended without counting nor skipping rows
+
+        The ordering parameter is ignored, the page size is set as for
+        StandardResultSetPagination.
+    """
+    page_size = StandardResultSetPagination.page_size
+    ordering = ('pk',)
+
+    def get_page_size(self, request):
+        return StandardResultSetPagination().get_page_size(request)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.view = view
+        return super(KeysetPagination, self).paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', self.ordering)
+
+        return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+
+    def _get_position_from_instance(self, instance, ordering):
+        # Rows of the RowListMixin lists are tuples of its columns
+        if isinstance(instance, tuple):
+            instance = dict(zip(self.view.row_serializer.columns, instance))
+
+        return super(KeysetPagination, self)._get_position_from_instance(instance, ordering)
+
+class SelectablePagination(pagination.BasePagination):
+    """
+        Page number pagination, or keyset pagination when the request has a
+        pagination=cursor or a cursor parameter
+    """
+    pagination_query_param = 'pagination'
+
+    page_number_class = StandardResultSetPagination
+    cursor_class = KeysetPagination
+
+    def __init__(self):
+        self.paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.pagination_query_param) == 'cursor' or \
+                self.cursor_class.cursor_query_param in request.query_params:
+            self.paginator = self.cursor_class()
+        else:
+            self.paginator = self.page_number_class()
+
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.paginator, 'display_page_controls', False)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_schema_fields(self, view):
+        return self.page_number_class().get_schema_fields(view) + \
+            self.cursor_class().get_schema_fields(view)
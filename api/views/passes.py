@@ -0,0 +1,189 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from catalog.models import CatalogEntry, TLE
+from api.tools import SatelliteComputation, format_inline_time, tle_timeline, worker_pool
+
+from api.views import CatalogEntryFilter
+from api.views.observer import parse_observer
+from api.views.streaming import StreamingJSONResponse
+
+class PassesView(APIView):
+    """
+        Passes of a satellite over a ground observer
+
+        The observer is given by its latitude and longitude in degrees and its
+        elevation in meters. start and end use the same format as the compute
+        view time, without end one day of passes is returned. Only the passes
+        culminating above min_elevation (deg) are returned.
+    """
+
+    default_duration = timedelta(days=1)
+
+    def get(self, request, satellite_number, format=None):
+        entry = get_object_or_404(
+            CatalogEntry,
+            norad_catalog_number=satellite_number
+        )
+
+        try:
+            observer = parse_observer(request.GET)
+        except ValueError:
+            return Response(
+                {'detail': 'The given observer is not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            start, end, min_elevation = self.parse_window(request.GET)
+        except ValueError as e:
+            return Response(
+                {'detail': '{0}'.format(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            tle = tle_timeline.find(entry, start)
+        except IndexError:
+            return Response(
+                {'detail': 'No TLE corresponding to the given date.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        sc = SatelliteComputation(tle=tle)
+        sc.observer = observer
+        sc.observer.date = start
+
+        try:
+            passes = sc.passes(end, min_elevation)
+        except ValueError as e:
+            return Response(
+                {'detail': '{0}'.format(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            'tle': tle.id,
+            'passes': [self.serialize(p) for p in passes],
+        })
+
+    def parse_window(self, params):
+        """
+            Return the start, end and minimum elevation of the request,
+            raises ValueError with a message if they are not correct
+        """
+        try:
+            start = format_inline_time(params.get('start', None))
+
+            end = params.get('end', None)
+            end = format_inline_time(end) if end else start + self.default_duration
+
+            min_elevation = float(params.get('min_elevation', 0))
+        except ValueError:
+            raise ValueError('The given time range is not correct')
+
+        if end <= start or not -90 <= min_elevation <= 90:
+            raise ValueError('The given time range is not correct')
+
+        if end - start > timedelta(days=settings.COMPUTE_PASSES_MAX_DAYS):
+            raise ValueError(
+                'The time range is too long, the maximum is {0} days'.format(
+                    settings.COMPUTE_PASSES_MAX_DAYS
+                )
+            )
+
+        return start, end, min_elevation
+
+    def serialize(self, satellite_pass):
+        """
+            Return the JSON representation of a pass
+        """
+        return {
+            'aos': satellite_pass['aos'].strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+            'aos_azimuth': float(satellite_pass['aos_azimuth']),
+            'tca': satellite_pass['tca'].strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+            'tca_azimuth': float(satellite_pass['tca_azimuth']),
+            'max_elevation': float(satellite_pass['max_elevation']),
+            'los': satellite_pass['los'].strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+            'los_azimuth': float(satellite_pass['los_azimuth']),
+        }
+
+
+class CatalogPassesView(PassesView):
+    """
+        Passes of every catalog entry over a ground observer
+
+        Accepts the catalog entry filters and the parameters of the passes
+        view. Only the satellites with at least one pass are returned, the
+        ones which can't be computed are listed in "failed".
+    """
+
+    def get(self, request, format=None):
+        try:
+            observer = parse_observer(request.GET)
+        except ValueError:
+            return Response(
+                {'detail': 'The given observer is not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            start, end, min_elevation = self.parse_window(request.GET)
+        except ValueError as e:
+            return Response(
+                {'detail': '{0}'.format(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        entries = CatalogEntryFilter(
+            request.GET,
+            queryset=CatalogEntry.objects.all()
+        ).qs
+
+        lines = TLE.objects.findLinesByCatalogEntriesAndTime(entries, start)
+
+        if len(lines) > settings.COMPUTE_PASSES_MAX_SATELLITES:
+            return Response(
+                {'detail': 'Too many satellites requested, the maximum is {0}'.format(
+                    settings.COMPUTE_PASSES_MAX_SATELLITES
+                )},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        passes, errors = worker_pool.predict_passes(
+            [(line1, line2) for _, _, line1, line2 in lines],
+            observer,
+            start,
+            end,
+            min_elevation
+        )
+
+        return StreamingJSONResponse(
+            {
+                'start': start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'end': end.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'count': sum(1 for p in passes if p),
+                'failed': [
+                    line[0] for line, error in zip(lines, errors)
+                    if error
+                ],
+            },
+            self.rows(lines, passes)
+        )
+
+    def rows(self, lines, passes):
+        """
+            Yield the passes of each satellite
+        """
+        for line, satellite_passes in zip(lines, passes):
+            if satellite_passes:
+                yield {
+                    'norad_catalog_number': line[0],
+                    'tle': line[1],
+                    'passes': [self.serialize(p) for p in satellite_passes],
+                }
@@ -0,0 +1,204 @@
+import math
+from datetime import timedelta
+
+import ephem
+import numpy as np
+
+from django.conf import settings
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from catalog.models import CatalogEntry, TLE
+from api.tools import BatchPropagator, format_inline_time, worker_pool
+from api.tools.region import Region, RegionScanner, reachable
+
+from api.views import CatalogEntryFilter
+from api.views.streaming import StreamingJSONResponse
+
+def parse_region(params):
+    """
+        Build the region of the request, given either by a bbox parameter
+        "south,west,north,east" or by at least three point parameters
+        "latitude,longitude", raises ValueError if it is not correct
+    """
+    if 'bbox' in params:
+        bounds = [float(value) for value in params['bbox'].split(',')]
+        if len(bounds) != 4:
+            raise ValueError('incorrect bounding box')
+
+        return Region.from_bbox(*bounds)
+
+    points = params.getlist('point')
+    vertices = []
+    for point in points:
+        fields = point.split(',')
+        if len(fields) != 2:
+            raise ValueError('incorrect point')
+
+        vertices.append([float(field) for field in fields])
+
+    return Region(vertices)
+
+
+class RegionView(APIView):
+    """
+        Catalog entries whose sub-satellite point is inside a region
+
+        The region is either a bbox=south,west,north,east bounding box or a
+        polygon given by point=latitude,longitude parameters, in degrees.
+        Latitudes are geocentric, as the ones of the compute view. Accepts
+        the catalog entry filters, and min_altitude and max_altitude in km.
+        Satellites whose inclination or altitude range can't match are left
+        out before propagating the others.
+
+        With time, the satellites inside the region at that time are
+        returned as compact rows described by the "fields" key. With start
+        (and end, one hour later by default), the entry and exit times of
+        the passes through the region are returned per satellite.
+    """
+
+    fields = (
+        'norad_catalog_number',
+        'tle',
+        'longitude',
+        'latitude',
+        'elevation',
+    )
+
+    default_duration = timedelta(hours=1)
+
+    def get(self, request, format=None):
+        try:
+            region = parse_region(request.GET)
+        except (TypeError, ValueError):
+            return Response(
+                {'detail': 'The given region is not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            altitudes = [
+                float(request.GET[key]) * 1000.0 if key in request.GET else None
+                for key in ('min_altitude', 'max_altitude')
+            ]
+
+            if 'start' in request.GET:
+                start = format_inline_time(request.GET['start'])
+                end = request.GET.get('end', None)
+                end = format_inline_time(end) if end else start + self.default_duration
+            else:
+                start = format_inline_time(request.GET.get('time', None))
+                end = None
+        except ValueError:
+            return Response(
+                {'detail': 'The given parameters are not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if end is not None and end <= start:
+            return Response(
+                {'detail': 'The given time range is not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        entries = CatalogEntryFilter(
+            request.GET,
+            queryset=CatalogEntry.objects.all()
+        ).qs
+
+        lines = TLE.objects.findLinesByCatalogEntriesAndTime(entries, start)
+
+        propagator = BatchPropagator.from_lines(
+            [(line1, line2) for _, _, line1, line2 in lines]
+        )
+        rows = np.flatnonzero(reachable(propagator.elements, region, *altitudes))
+        lines = [lines[row] for row in rows.tolist()]
+
+        if end is None:
+            return self.snapshot(lines, region, start)
+
+        steps = math.ceil((end - start).total_seconds() / RegionScanner.step)
+        if len(lines) * steps > settings.COMPUTE_REGION_MAX_SAMPLES:
+            return Response(
+                {'detail': 'Too many positions requested, the maximum is {0} '
+                           'satellites times steps of {1} seconds'.format(
+                    settings.COMPUTE_REGION_MAX_SAMPLES,
+                    RegionScanner.step
+                )},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        scanner = RegionScanner(propagator.subset(rows), region)
+        passes = scanner.scan(start, end)
+
+        return StreamingJSONResponse(
+            {
+                'start': start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'end': end.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'candidates': len(lines),
+                'count': sum(1 for p in passes if p),
+                'failed': [
+                    line[0] for line, error in zip(lines, scanner.errors)
+                    if error
+                ],
+            },
+            self.passes(lines, passes)
+        )
+
+    def snapshot(self, lines, region, time):
+        """
+            Response listing the satellites inside the region at time
+        """
+        data = worker_pool.propagate(
+            [(line1, line2) for _, _, line1, line2 in lines],
+            [ephem.Date(time)],
+            vectors=False
+        )
+
+        failed = data['error'] != 0
+        inside = region.contains(data['latitude'][:, 0], data['longitude'][:, 0])
+
+        return StreamingJSONResponse(
+            {
+                'time': time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'candidates': len(lines),
+                'count': int(np.count_nonzero(inside)),
+                'fields': self.fields,
+                'failed': [
+                    line[0] for line, error in zip(lines, failed) if error
+                ],
+            },
+            self.rows(lines, data, inside)
+        )
+
+    def rows(self, lines, data, inside):
+        """
+            Yield one compact row per satellite inside the region
+        """
+        for row in np.flatnonzero(inside).tolist():
+            yield [
+                lines[row][0],
+                lines[row][1],
+                float(data['longitude'][row, 0]),
+                float(data['latitude'][row, 0]),
+                float(data['elevation'][row, 0]),
+            ]
+
+    def passes(self, lines, passes):
+        """
+            Yield the passes through the region of each satellite
+        """
+        for line, satellite_passes in zip(lines, passes):
+            if satellite_passes:
+                yield {
+                    'norad_catalog_number': line[0],
+                    'tle': line[1],
+                    'passes': [
+                        {
+                            'entry': entry.strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+                            'exit': exit.strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+                        }
+                        for entry, exit in satellite_passes
+                    ],
+                }
@@ -0,0 +1,61 @@
+from django.conf import settings
+from rest_framework.response import Response
+
+from api.tools import RowSerializer
+
+class RowListMixin(object):
+    """
+        List action of a model viewset serialized by a RowSerializer of its
+        serializer_class when API_FAST_SERIALIZATION is set
+
+        The rows are read with values_list() on the filtered queryset, then
+        paginated and rendered as usual, the response is the same as the
+        one of the serializer.
+    """
+
+    _row_serializers = {}
+
+    @property
+    def hidden_columns(self):
+        """
+            Columns the rows need besides the returned fields: the keys of
+            the cursor pagination, whatever the fieldset leaves out
+        """
+        ordering = getattr(self, 'cursor_ordering', ())
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+
+        return tuple(field.lstrip('-') for field in ordering)
+
+    @property
+    def row_serializer(self):
+        if getattr(self, '_row_serializer', None) is None:
+            # Requests restricting the fields are not kept, as there are
+            # many combinations of them
+            if getattr(self, 'fieldset', None) is not None:
+                self._row_serializer = RowSerializer(
+                    self.get_serializer(),
+                    self.hidden_columns
+                )
+            else:
+                key = (self.get_serializer_class(), self.hidden_columns)
+                if key not in self._row_serializers:
+                    self._row_serializers[key] = RowSerializer(*key)
+
+                self._row_serializer = self._row_serializers[key]
+
+        return self._row_serializer
+
+    def list(self, request, *args, **kwargs):
+        if not settings.API_FAST_SERIALIZATION:
+            return super(RowListMixin, self).list(request, *args, **kwargs)
+
+        rows = self.row_serializer.values(
+            self.filter_queryset(self.get_queryset())
+        )
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.row_serializer.serialize(page))
+
+        return Response(self.row_serializer.serialize(rows))
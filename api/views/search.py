@@ -0,0 +1,36 @@
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+from catalog.search import catalog_search
+
+class CatalogSearchFilter(filters.SearchFilter):
+    """
+        Search filter of the catalog entries answered by the full text index
+        when it is available, with ordering=rank the entries are sorted by
+        relevance
+
+        Terms shorter than the index can match fall back to the lookups on
+        the search_fields of the view.
+    """
+    rank_ordering = 'rank'
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+
+        if not terms or not catalog_search.available(queryset.db) or \
+                any(len(term) < catalog_search.min_length for term in terms):
+            return super(CatalogSearchFilter, self).filter_queryset(
+                request,
+                queryset,
+                view
+            )
+
+        ordering = request.query_params.get(api_settings.ORDERING_PARAM, '')
+
+        return catalog_search.filter(
+            queryset,
+            terms,
+            rank=self.rank_ordering in [
+                field.strip() for field in ordering.split(',')
+            ]
+        )
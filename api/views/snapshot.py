@@ -0,0 +1,111 @@
+import ephem
+import numpy as np
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from catalog.models import CatalogEntry, TLE
+from api.tools import format_inline_time, solar_ephemeris, worker_pool
+from api.tools.eclipse import SUNLIT, shadow
+
+from api.views import CatalogEntryFilter
+from api.views.streaming import StreamingJSONResponse
+
+class SnapshotView(APIView):
+    """
+        Position of every catalog entry at a given time
+
+        Accepts the catalog entry filters. Rows are compact arrays whose
+        columns are described by the "fields" key, satellites which can't be
+        computed are listed in "failed". With sunlit=true (or false), only
+        the satellites fully lit by the sun (or in the shadow of the earth,
+        penumbra included) are returned.
+    """
+
+    fields = (
+        'norad_catalog_number',
+        'tle',
+        'longitude',
+        'latitude',
+        'elevation',
+        'velocity',
+    )
+
+    def get(self, request, format=None):
+        try:
+            time = format_inline_time(request.GET.get('time', None))
+        except ValueError:
+            return Response(
+                {'detail': 'The given time is not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        sunlit = request.GET.get('sunlit', None)
+        if sunlit is not None:
+            sunlit = sunlit.lower()
+            if sunlit not in ('true', 'false', '1', '0'):
+                return Response(
+                    {'detail': 'The given sunlit filter is not correct'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            sunlit = sunlit in ('true', '1')
+
+        entries = CatalogEntryFilter(
+            request.GET,
+            queryset=CatalogEntry.objects.all()
+        ).qs
+
+        lines = TLE.objects.findLinesByCatalogEntriesAndTime(entries, time)
+
+        data = worker_pool.propagate(
+            [(line1, line2) for _, _, line1, line2 in lines],
+            [ephem.Date(time)]
+        )
+
+        failed = data['error'] != 0
+
+        skipped = failed.copy()
+        if sunlit is not None:
+            with np.errstate(invalid='ignore'):
+                state, _ = shadow(
+                    data['position'][:, 0],
+                    solar_ephemeris.get(ephem.Date(time))
+                )
+            skipped |= (state == SUNLIT) != sunlit
+
+        return StreamingJSONResponse(
+            {
+                'time': time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'count': int(np.count_nonzero(~skipped)),
+                'fields': self.fields,
+                'failed': [
+                    line[0] for line, error in zip(lines, failed) if error
+                ],
+            },
+            self.rows(lines, data, skipped)
+        )
+
+    def rows(self, lines, data, skipped):
+        """
+            Yield one compact row per computed satellite which isn't skipped
+        """
+        rows = zip(
+            lines,
+            skipped.tolist(),
+            data['longitude'][:, 0].tolist(),
+            data['latitude'][:, 0].tolist(),
+            data['elevation'][:, 0].tolist(),
+            data['velocity'][:, 0].tolist(),
+        )
+
+        for line, error, longitude, latitude, elevation, velocity in rows:
+            if not error:
+                yield [
+                    line[0],
+                    line[1],
+                    longitude,
+                    latitude,
+                    elevation,
+                    velocity,
+                ]
@@ -3,7 +3,13 @@ from rest_framework import viewsets
 from catalog.models import Source
 from api.serializers import SourceSerializer
 
-class SourceViewSet(viewsets.ReadOnlyModelViewSet):
+from api.views import CachedResponseMixin, ConditionalMixin, FieldsetMixin
+
+class SourceViewSet(
+        ConditionalMixin,
+        CachedResponseMixin,
+        FieldsetMixin,
+        viewsets.ReadOnlyModelViewSet):
     """
         Source API class view
     """
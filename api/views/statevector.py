@@ -0,0 +1,235 @@
+import ephem
+import numpy as np
+
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from catalog.models import CatalogEntry, TLE
+from api.tools import BatchPropagator, ephemeris_cache, format_inline_time, tle_timeline, worker_pool
+from api.tools import frames
+
+from api.views import CatalogEntryFilter
+from api.views.streaming import StreamingJSONResponse
+
+def parse_frames(params):
+    """
+        Return the frames requested by the frames parameter, a comma
+        separated list, every frame by default. Raises ValueError if one of
+        them is unknown.
+    """
+    names = params.get('frames', None)
+    if not names:
+        return frames.STATE_FRAMES
+
+    names = [name.strip().lower() for name in names.split(',')]
+    for name in names:
+        if name not in frames.STATE_FRAMES:
+            raise ValueError('unknown frame')
+
+    return tuple(names)
+
+
+def serialize_state(states, index):
+    """
+        Return the JSON representation of the sample at index of the state
+        vectors computed by frames.state_vectors()
+    """
+    data = {}
+
+    for name in ('teme', 'ecef'):
+        if name in states:
+            position, velocity = states[name]
+            data[name] = {
+                'position': position[index].tolist(),
+                'velocity': velocity[index].tolist(),
+            }
+
+    if 'geodetic' in states:
+        longitude, latitude, height, velocity = states['geodetic']
+        data['geodetic'] = {
+            'longitude': float(np.degrees(longitude[index])),
+            'latitude': float(np.degrees(latitude[index])),
+            'height': float(height[index]),
+            'velocity': velocity[index].tolist(),
+        }
+
+    return data
+
+
+class StateVectorView(APIView):
+    """
+        Position and velocity of a satellite
+
+        Vectors are given in meters and meters per second, in the TEME frame
+        of SGP4, the earth fixed frame (ECEF) and as WGS-84 geodetic
+        coordinates with a local east, north, up velocity. frames restricts
+        them to a comma separated list of teme, ecef and geodetic. start and
+        end use the same format as the compute view time, step is in
+        seconds, without end the state at start is returned.
+    """
+
+    default_step = 60
+
+    def get(self, request, satellite_number, format=None):
+        entry = get_object_or_404(
+            CatalogEntry,
+            norad_catalog_number=satellite_number
+        )
+
+        try:
+            names = parse_frames(request.GET)
+        except ValueError:
+            return Response(
+                {'detail': 'The given frames are not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            start = format_inline_time(request.GET.get('start', None))
+
+            end = request.GET.get('end', None)
+            end = format_inline_time(end) if end is not None else start
+
+            step = int(request.GET.get('step', self.default_step))
+        except ValueError:
+            return Response(
+                {'detail': 'The given time range is not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if step <= 0 or end < start:
+            return Response(
+                {'detail': 'The given time range is not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        count = int((end - start).total_seconds() // step) + 1
+        if count > settings.COMPUTE_TRACK_MAX_POINTS:
+            return Response(
+                {'detail': 'Too many points requested, the maximum is {0}'.format(
+                    settings.COMPUTE_TRACK_MAX_POINTS
+                )},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            tle = tle_timeline.find(entry, start)
+        except IndexError:
+            return Response(
+                {'detail': 'No TLE corresponding to the given date.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        offsets = np.arange(count) * step
+        dates = ephem.Date(start) + offsets / 86400.0
+        data = ephemeris_cache.get(tle).propagate(dates)
+
+        error = data['error'][0]
+        if error:
+            return Response(
+                {'detail': BatchPropagator.ERROR_MESSAGES[error]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        states = frames.state_vectors(
+            data['position'][0],
+            data['velocity_vector'][0],
+            frames.EarthRotation.from_dates(dates),
+            names
+        )
+
+        times = np.datetime64(start, 's') + offsets.astype('timedelta64[s]')
+
+        return StreamingJSONResponse(
+            {'tle': tle.id, 'count': count, 'frames': names},
+            self.rows(times, states)
+        )
+
+    def rows(self, times, states):
+        """
+            Yield the state vectors one by one
+        """
+        for i, time in enumerate(np.datetime_as_string(times)):
+            row = {'time': time + 'Z'}
+            row.update(serialize_state(states, i))
+
+            yield row
+
+
+class CatalogStateVectorView(APIView):
+    """
+        Position and velocity of every catalog entry at a given time
+
+        Accepts the catalog entry filters and the frames parameter of the
+        state vector view. Satellites which can't be computed are listed in
+        "failed".
+    """
+
+    def get(self, request, format=None):
+        try:
+            names = parse_frames(request.GET)
+        except ValueError:
+            return Response(
+                {'detail': 'The given frames are not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            time = format_inline_time(request.GET.get('time', None))
+        except ValueError:
+            return Response(
+                {'detail': 'The given time is not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        entries = CatalogEntryFilter(
+            request.GET,
+            queryset=CatalogEntry.objects.all()
+        ).qs
+
+        lines = TLE.objects.findLinesByCatalogEntriesAndTime(entries, time)
+
+        dates = [ephem.Date(time)]
+        data = worker_pool.propagate(
+            [(line1, line2) for _, _, line1, line2 in lines],
+            dates
+        )
+
+        # Every satellite shares the earth rotation of the single timestamp
+        states = frames.state_vectors(
+            data['position'][:, 0],
+            data['velocity_vector'][:, 0],
+            frames.EarthRotation.from_dates(dates),
+            names
+        )
+
+        failed = data['error'] != 0
+
+        return StreamingJSONResponse(
+            {
+                'time': time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'count': int(np.count_nonzero(~failed)),
+                'frames': names,
+                'failed': [
+                    line[0] for line, error in zip(lines, failed) if error
+                ],
+            },
+            self.rows(lines, states, failed)
+        )
+
+    def rows(self, lines, states, failed):
+        """
+            Yield the state vectors of the computed satellites
+        """
+        for i, (line, error) in enumerate(zip(lines, failed.tolist())):
+            if not error:
+                row = {
+                    'norad_catalog_number': line[0],
+                    'tle': line[1],
+                }
+                row.update(serialize_state(states, i))
+
+                yield row
@@ -0,0 +1,41 @@
+import json
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    """
+        JSON object streamed chunk by chunk, made of a header and a "results"
+        array filled from an iterable of rows
+    """
+
+    chunk_size = 1000
+
+    def __init__(self, header, rows, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super(StreamingJSONResponse, self).__init__(
+            self.stream(header, rows),
+            **kwargs
+        )
+
+    def stream(self, header, rows):
+        """
+            Yield the encoded JSON, without keeping more than one chunk of
+            rows in memory
+        """
+        opening = json.dumps(header, separators=(',', ':'))[:-1]
+        if header:
+            opening += ','
+        yield opening + '"results":['
+
+        rows = iter(rows)
+        separator = ''
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+
+            yield separator + json.dumps(chunk, separators=(',', ':'))[1:-1]
+            separator = ','
+
+        yield ']}'
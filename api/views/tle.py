@@ -3,12 +3,31 @@ from rest_framework import viewsets
 from catalog.models import TLE
 from api.serializers import TLESerializer
 
-from api.views import StandardResultSetPagination
+from api.views import CachedResponseMixin, ConditionalMixin
+from api.views import FieldsetMixin, RowListMixin, SelectablePagination
 
-class TLEViewSet(viewsets.ReadOnlyModelViewSet):
+class TLEViewSet(
+        ConditionalMixin,
+        CachedResponseMixin,
+        FieldsetMixin,
+        RowListMixin,
+        viewsets.ReadOnlyModelViewSet):
     """
         TLE API class view
     """
-    queryset = TLE.objects.all()
+    # Everything the nested serializers read comes with the TLEs
+    queryset = TLE.objects.select_related(
+        'classification',
+        'satellite_number__operational_status',
+        'satellite_number__owner',
+        'satellite_number__launch_site',
+        'satellite_number__orbital_status',
+    )
     serializer_class = TLESerializer
-    pagination_class = StandardResultSetPagination
\ No newline at end of file
+    pagination_class = SelectablePagination
+
+    # Keyset of the cursor pagination, in import order
+    cursor_ordering = ('id',)
+
+    # TLEs are never updated once imported
+    last_modified_field = 'added'
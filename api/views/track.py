@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+import ephem
+import numpy as np
+
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from catalog.models import CatalogEntry
+from api.tools import BatchPropagator, ephemeris_cache, format_inline_time, tle_timeline
+
+from api.views.streaming import StreamingJSONResponse
+
+class TrackView(APIView):
+    """
+        Ground track of a satellite between two dates
+
+        start and end use the same format as the compute view time, step is
+        in seconds. Without end, one orbital period is returned.
+    """
+
+    default_step = 60
+
+    def get(self, request, satellite_number, format=None):
+        entry = get_object_or_404(
+            CatalogEntry,
+            norad_catalog_number=satellite_number
+        )
+
+        try:
+            start = format_inline_time(request.GET.get('start', None))
+
+            end = request.GET.get('end', None)
+            if end is not None:
+                end = format_inline_time(end)
+
+            step = int(request.GET.get('step', self.default_step))
+        except ValueError:
+            return Response(
+                {'detail': 'The given time range is not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            tle = tle_timeline.find(entry, start)
+        except IndexError:
+            return Response(
+                {'detail': 'No TLE corresponding to the given date.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if end is None:
+            if not tle.mean_motion:
+                return Response(
+                    {'detail': 'The TLE has no mean motion, an end is required'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            end = start + timedelta(minutes=1440 / float(tle.mean_motion))
+
+        if step <= 0 or end < start:
+            return Response(
+                {'detail': 'The given time range is not correct'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        count = int((end - start).total_seconds() // step) + 1
+        if count > settings.COMPUTE_TRACK_MAX_POINTS:
+            return Response(
+                {'detail': 'Too many points requested, the maximum is {0}'.format(
+                    settings.COMPUTE_TRACK_MAX_POINTS
+                )},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        offsets = np.arange(count) * step
+        data = ephemeris_cache.get(tle).propagate(
+            ephem.Date(start) + offsets / 86400.0,
+            vectors=False
+        )
+
+        error = data['error'][0]
+        if error:
+            return Response(
+                {'detail': BatchPropagator.ERROR_MESSAGES[error]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        times = np.datetime64(start, 's') + offsets.astype('timedelta64[s]')
+
+        return StreamingJSONResponse(
+            {'tle': tle.id, 'count': count},
+            self.rows(times, data)
+        )
+
+    def rows(self, times, data):
+        """
+            Yield the points of the track one by one
+        """
+        points = zip(
+            np.datetime_as_string(times),
+            data['longitude'][0].tolist(),
+            data['latitude'][0].tolist(),
+            data['elevation'][0].tolist(),
+            data['velocity'][0].tolist(),
+        )
+
+        for time, longitude, latitude, elevation, velocity in points:
+            yield {
+                'time': time + 'Z',
+                'longitude': longitude,
+                'latitude': latitude,
+                'elevation': elevation,
+                'velocity': velocity,
+            }
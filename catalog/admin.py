@@ -1,9 +1,10 @@
 from django.contrib import admin
-from .models import LaunchSite, OperationalStatus, OrbitalStatus, Source, CatalogEntry, TLE
+from .models import LaunchSite, OperationalStatus, OrbitalStatus, Source, CatalogEntry, TLE, Generation
 
 admin.site.register(LaunchSite)
 admin.site.register(OperationalStatus)
 admin.site.register(OrbitalStatus)
 admin.site.register(Source)
 admin.site.register(CatalogEntry)
-admin.site.register(TLE)
\ No newline at end of file
+admin.site.register(TLE)
+admin.site.register(Generation)
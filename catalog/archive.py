@@ -0,0 +1,199 @@
+"""
+    Compressed archive of the TLEs moved out of the database
+"""
+
+import datetime
+import decimal
+import gzip
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
+class TLEArchive(object):
+    """
+        Append-only archive of TLE rows, one gzip file per satellite and
+        year the TLE was added, under <path>/<satellite number>/<year>.gz
+
+        Each file holds one JSON object per line, the values of the columns
+        of a row. Appending adds a gzip member to the file, so existing data
+        is never rewritten. A row archived twice, for instance when an
+        archiving run is interrupted before removing it from the database,
+        is only read once.
+
+        The last TLE_ARCHIVE_CACHE_SIZE files read are kept parsed, until
+        they are modified, so that batch lookups decompress each file once.
+    """
+
+    # Dates of the records compared with the lookup times
+    DATE_COLUMNS = ('added', 'epoch')
+
+    def __init__(self, path=None):
+        self._path = path
+        self._lock = threading.Lock()
+        self._files = OrderedDict()
+
+    @property
+    def path(self):
+        """
+            Directory of the archive, TLE_ARCHIVE_PATH by default, None when
+            the archive is disabled
+        """
+        if self._path is not None:
+            return self._path
+
+        return settings.TLE_ARCHIVE_PATH
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    def _file(self, satellite, year):
+        return os.path.join(self.path, str(satellite), '%d.gz' % year)
+
+    def satellites(self):
+        """
+            Return the set of the numbers of the satellites with archived
+            rows, read by a single listing of the archive
+        """
+        if not os.path.isdir(self.path):
+            return set()
+
+        return set(os.listdir(self.path))
+
+    def years(self, satellite):
+        """
+            Return the sorted years archived for a satellite
+        """
+        directory = os.path.join(self.path, str(satellite))
+        if not os.path.isdir(directory):
+            return []
+
+        return sorted(
+            int(name[:-3]) for name in os.listdir(directory)
+            if name.endswith('.gz') and name[:-3].isdigit()
+        )
+
+    def _encode(self, value):
+        if isinstance(value, datetime.datetime):
+            return value.isoformat()
+        if isinstance(value, decimal.Decimal):
+            return str(value)
+
+        raise TypeError('%r can not be archived' % value)
+
+    def append(self, rows):
+        """
+            Archive a list of dicts of column values, which need at least id,
+            satellite_number_id and added
+        """
+        files = {}
+        for row in rows:
+            key = (row['satellite_number_id'], row['added'].year)
+            files.setdefault(key, []).append(
+                json.dumps(row, default=self._encode, sort_keys=True)
+            )
+
+        with self._lock:
+            for (satellite, year), lines in sorted(files.items()):
+                path = self._file(satellite, year)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+
+                with open(path, 'ab') as output:
+                    with gzip.GzipFile(fileobj=output, mode='ab') as archive:
+                        archive.write(('\n'.join(lines) + '\n').encode('utf-8'))
+
+                    # Rows are removed from the database once on disk
+                    output.flush()
+                    os.fsync(output.fileno())
+
+        return len(rows)
+
+    def read(self, satellite, year):
+        """
+            Return the rows archived for a satellite and a year, sorted by id,
+            with their dates parsed
+        """
+        path = self._file(satellite, year)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return []
+
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            rows = self._files.get(key)
+            if rows is not None:
+                self._files.move_to_end(key)
+                return list(rows)
+
+        rows = self._parse(path)
+
+        with self._lock:
+            self._files[key] = rows
+            while len(self._files) > settings.TLE_ARCHIVE_CACHE_SIZE:
+                self._files.popitem(last=False)
+
+        return list(rows)
+
+    def _parse(self, path):
+        rows = {}
+        with gzip.open(path, 'rt', encoding='utf-8') as archive:
+            for line in archive:
+                if line.strip():
+                    row = json.loads(line)
+                    for column in self.DATE_COLUMNS:
+                        if row.get(column) is not None:
+                            row[column] = parse_datetime(row[column])
+
+                    rows.setdefault(row['id'], row)
+
+        return [rows[key] for key in sorted(rows)]
+
+    def find(self, satellite, time, column, nearest=False):
+        """
+            Return the archived row of a satellite with the latest value of
+            column ("added" or "epoch") at or before time, an aware datetime.
+            With nearest, the row whose value is the closest to time is
+            returned instead. None if there is no such row.
+        """
+        if not self.enabled:
+            return None
+
+        before = None
+        after = None
+
+        # Files are split by date added, the epochs of backfilled TLEs may be
+        # years older, so only the added lookups can skip files
+        by_added = column == 'added' and not nearest
+
+        for year in reversed(self.years(satellite)):
+            if by_added and year > time.year:
+                continue
+
+            for row in self.read(satellite, year):
+                value = row.get(column)
+                if value is None:
+                    continue
+
+                if value <= time:
+                    if before is None or (value, row['id']) > (before[column], before['id']):
+                        before = row
+                elif after is None or (value, -row['id']) < (after[column], -after['id']):
+                    after = row
+
+            # The earlier files only hold rows added before
+            if by_added and before is not None:
+                break
+
+        if nearest and after is not None and (
+                before is None or after[column] - time < time - before[column]):
+            return after
+
+        return before
+
+
+tle_archive = TLEArchive()
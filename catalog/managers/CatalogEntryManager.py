@@ -0,0 +1,62 @@
+from django.db import models, connections
+
+from .TLEManager import TLEManager
+
+class CatalogEntryManager(models.Manager):
+
+    # Also available to the data migrations
+    use_in_migrations = True
+
+    def updateCurrentTles(self, entries = None):
+        """
+            Point the current TLE of the entries of a CatalogEntry queryset,
+            every entry by default, to their latest TLE, with a single UPDATE
+            statement. Returns the number of updated entries, raises
+            ValueError if TLE_LOOKUP_MODE is unknown.
+
+            The latest TLE is the last one added, or the one with the latest
+            epoch when TLE_LOOKUP_MODE is "epoch" or "nearest".
+        """
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        meta = self.model._meta
+        current = meta.get_field('current_tle')
+        tle_meta = current.related_model._meta
+
+        table = quote(meta.db_table)
+        tle_table = quote(tle_meta.db_table)
+        column = quote(tle_meta.get_field(
+            'added' if TLEManager._mode(None) == TLEManager.ADDED else 'epoch'
+        ).column)
+        tle_id = quote(tle_meta.pk.column)
+
+        sql = (
+            'UPDATE {table} SET {current} = ('
+                'SELECT {tle_table}.{tle_id} FROM {tle_table} '
+                'WHERE {tle_table}.{satellite} = {table}.{pk} '
+                'AND {tle_table}.{column} IS NOT NULL '
+                'ORDER BY {tle_table}.{column} DESC, {tle_table}.{tle_id} DESC '
+                'LIMIT 1'
+            ')'
+        ).format(
+            table=table,
+            current=quote(current.column),
+            tle_table=tle_table,
+            tle_id=tle_id,
+            satellite=quote(tle_meta.get_field('satellite_number').column),
+            pk=quote(meta.pk.column),
+            column=column,
+        )
+        params = ()
+
+        if entries is not None:
+            entries_sql, params = entries.order_by().values('pk') \
+                .query.sql_with_params()
+            sql += ' WHERE {pk} IN ({entries})'.format(
+                pk=quote(meta.pk.column),
+                entries=entries_sql,
+            )
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
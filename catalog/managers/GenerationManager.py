@@ -0,0 +1,35 @@
+from django.db import models, transaction
+from django.utils import timezone
+
+class GenerationManager(models.Manager):
+
+    def current(self, name):
+        """
+            Return the value of a generation counter, 0 if it was never bumped
+        """
+        return self.state(name)[0]
+
+    def state(self, name):
+        """
+            Return the value of a generation counter and the time it was last
+            bumped, (0, None) if it was never bumped
+        """
+        states = list(self.filter(name=name).values_list('value', 'updated'))
+
+        return states[0] if states else (0, None)
+
+    @transaction.atomic
+    def bump(self, name):
+        """
+            Increment a generation counter and return its new value, within
+            the transaction of the caller if any so that the counter changes
+            when its data is committed
+        """
+        generation, _ = self.select_for_update().get_or_create(name=name)
+
+        generation.value = models.F('value') + 1
+        generation.updated = timezone.now()
+        generation.save()
+        generation.refresh_from_db()
+
+        return generation.value
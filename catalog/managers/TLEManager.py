@@ -1,29 +1,380 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, connections
+from django.utils.dateparse import parse_datetime
 
 import datetime
 import pytz
 
+from catalog.archive import tle_archive
+
 class TLEManager(models.Manager):
 
-    def findByCatalogEntryAndTime(self, catalogEntry, time = None):
+    # TLE selection modes:
+    #  - added: the latest TLE imported before the time
+    #  - epoch: the TLE with the latest epoch before the time
+    #  - nearest: the TLE whose epoch is the closest to the time
+    ADDED = 'added'
+    EPOCH = 'epoch'
+    NEAREST = 'nearest'
+
+    MODES = (ADDED, EPOCH, NEAREST)
+
+    @classmethod
+    def _mode(cls, mode):
         """
-            Return a tle matching the given time and catalog entry
+            Return the given mode, TLE_LOOKUP_MODE by default, raises
+            ValueError if it is unknown
+        """
+        if mode is None:
+            mode = getattr(settings, 'TLE_LOOKUP_MODE', cls.ADDED)
+
+        if mode not in cls.MODES:
+            raise ValueError('Unknown TLE lookup mode "%s"' % mode)
+
+        return mode
+
+    def _time(self, time):
+        """
+            Return the given time as UTC, now by default
         """
         if time is None:
-            time = datetime.utcnow()
+            time = datetime.datetime.utcnow()
+
+        return time.replace(tzinfo=pytz.UTC)
 
-        time = time.replace(tzinfo=pytz.UTC)
+    def findByCatalogEntryAndTime(self, catalogEntry, time = None, mode = None):
+        """
+            Return a tle matching the given time and catalog entry, selected
+            according to the lookup mode
+        """
+        mode = self._mode(mode)
+        time = self._time(time)
+
+        if mode == self.NEAREST:
+            return self._findNearest(catalogEntry, time)
+
+        column = 'added' if mode == self.ADDED else 'epoch'
 
         tles = self.filter(
                 models.Q(
-                    added__lte=time
+                    **{column + '__lte': time}
                 ),
                 satellite_number=catalogEntry
             ).order_by(
-                '-added',
+                '-' + column,
             )
 
-        if tles.exists():
+        # A single query, rather than exists() followed by the row
+        tles = list(tles[:1])
+        if tles:
             return tles[0]
 
+        # Older TLEs may have been moved to the archive
+        archived = self._findArchived(catalogEntry.pk, time, mode)
+        if archived is not None:
+            return archived
+
         raise IndexError("No TLE found for the given time")
+
+    def _findArchived(self, satellite, time, mode):
+        """
+            Return the archived TLE of a satellite matching the given time,
+            None if there is none or if the archive is disabled
+        """
+        if not tle_archive.enabled:
+            return None
+
+        row = tle_archive.find(
+            satellite,
+            self._time(time),
+            'added' if mode == self.ADDED else 'epoch',
+            nearest=mode == self.NEAREST
+        )
+        if row is None:
+            return None
+
+        return self.model(**dict(
+            (field.attname, field.to_python(row.get(field.attname)))
+            for field in self.model._meta.concrete_fields
+        ))
+
+    def _findArchivedByCatalogEntries(self, entries, time, mode, found):
+        """
+            Return a dict of the archived TLEs of the entries whose TLE was
+            not found in the database, or in nearest mode whose TLE found is
+            after the given time, keyed by NORAD catalog number
+        """
+        if not tle_archive.enabled:
+            return {}
+
+        time = self._time(time)
+        archived = {}
+
+        # Satellites which never had archived TLEs are left out without
+        # looking for their files
+        satellites = tle_archive.satellites()
+
+        for number in self._numbers(entries):
+            if str(number) not in satellites:
+                continue
+            elif number not in found:
+                tle = self._findArchived(number, time, mode)
+            elif mode == self.NEAREST and found[number] > time:
+                tle = self._findArchived(number, time, mode)
+                if tle is not None and \
+                        abs(tle.epoch - time) >= found[number] - time:
+                    tle = None
+            else:
+                continue
+
+            if tle is not None:
+                archived[number] = tle
+
+        return archived
+
+    def _findNearest(self, catalogEntry, time):
+        """
+            Return the TLE of a catalog entry whose epoch is the closest to
+            the given time, the latest one before and the first one after it
+            are read by a single query on the (satellite, epoch) index
+        """
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        meta = self.model._meta
+
+        table = quote(meta.db_table)
+        satellite = quote(meta.get_field('satellite_number').column)
+        epoch = quote(meta.get_field('epoch').column)
+
+        sql = (
+            'SELECT * FROM ('
+                'SELECT * FROM {table} WHERE {satellite} = %s AND {epoch} <= %s '
+                'ORDER BY {epoch} DESC, {id} DESC LIMIT 1'
+            ') earlier '
+            'UNION ALL '
+            'SELECT * FROM ('
+                'SELECT * FROM {table} WHERE {satellite} = %s AND {epoch} > %s '
+                'ORDER BY {epoch} ASC, {id} DESC LIMIT 1'
+            ') later'
+        ).format(
+            table=table,
+            satellite=satellite,
+            epoch=epoch,
+            id=quote(meta.pk.column),
+        )
+
+        value = connection.ops.adapt_datetimefield_value(time)
+        tles = list(self.raw(sql, [catalogEntry.pk, value] * 2))
+
+        # Before the TLEs of the database, the archive may hold closer ones
+        if not any(tle.epoch <= time for tle in tles):
+            archived = self._findArchived(catalogEntry.pk, time, self.NEAREST)
+            if archived is not None:
+                tles.insert(0, archived)
+
+        if not tles:
+            raise IndexError("No TLE found for the given time")
+
+        return min(tles, key=lambda tle: abs(tle.epoch - time))
+
+    def _entriesQuery(self, entries):
+        """
+            Build the SQL of the primary keys of the given catalog entries, a
+            CatalogEntry queryset or an iterable of entries or NORAD catalog
+            numbers
+
+            Numbers are checked and written in the query rather than bound,
+            which keeps tens of thousands of them within a single query
+            whatever the parameter limit of the database (999 for SQLite).
+        """
+        if isinstance(entries, models.QuerySet):
+            return entries.order_by().values('pk').query.sql_with_params()
+
+        numbers = self._numbers(entries)
+        if not numbers:
+            return 'NULL', ()
+
+        return ', '.join("'%s'" % number for number in numbers), ()
+
+    def _numbers(self, entries):
+        """
+            Return the sorted NORAD catalog numbers of the given catalog
+            entries, raises ValueError if one of them is not correct
+        """
+        if isinstance(entries, models.QuerySet):
+            return sorted(entries.order_by().values_list('pk', flat=True))
+
+        numbers = set()
+        for entry in entries:
+            number = str(getattr(entry, 'pk', entry)).strip()
+            if not number.isdigit() or len(number) > 5:
+                raise ValueError('Incorrect NORAD catalog number "%s"' % number)
+
+            numbers.add(number.zfill(5))
+
+        return sorted(numbers)
+
+    def _latestByCatalogEntriesQuery(self, entries, time, columns, mode):
+        """
+            Build the SQL selecting the given columns of the TLE of each
+            catalog entry at the given time, in a single query
+
+            In nearest mode, both the latest TLE before the time and the
+            first one after it are selected.
+        """
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        meta = self.model._meta
+
+        table = quote(meta.db_table)
+        satellite = quote(meta.get_field('satellite_number').column)
+        column = quote(meta.get_field(
+            'added' if mode == self.ADDED else 'epoch'
+        ).column)
+
+        entries_sql, entries_params = self._entriesQuery(entries)
+
+        bounds = [('MAX', '<=')]
+        if mode == self.NEAREST:
+            bounds.append(('MIN', '>'))
+
+        targets = ' UNION ALL '.join(
+            'SELECT {satellite} AS satellite, {aggregate}({column}) AS target '
+            'FROM {table} '
+            'WHERE {column} {comparison} %s AND {satellite} IN ({entries}) '
+            'GROUP BY {satellite}'.format(
+                satellite=satellite,
+                aggregate=aggregate,
+                column=column,
+                comparison=comparison,
+                table=table,
+                entries=entries_sql,
+            )
+            for aggregate, comparison in bounds
+        )
+
+        sql = (
+            'SELECT {columns} FROM {table} '
+            'INNER JOIN ({targets}) targets '
+            'ON {table}.{satellite} = targets.satellite '
+            'AND {table}.{column} = targets.target '
+            'ORDER BY {table}.{satellite}, {table}.{id}'
+        ).format(
+            columns=', '.join(
+                '{0}.{1}'.format(table, quote(meta.get_field(c).column))
+                for c in columns
+            ),
+            table=table,
+            targets=targets,
+            satellite=satellite,
+            column=column,
+            id=quote(meta.pk.column),
+        )
+
+        time = connection.ops.adapt_datetimefield_value(self._time(time))
+
+        return sql, ((time,) + tuple(entries_params)) * len(bounds)
+
+    def _datetime(self, value):
+        """
+            Return a datetime read by a raw query as an aware datetime
+        """
+        if isinstance(value, str):
+            value = parse_datetime(value)
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=pytz.UTC)
+
+        return value
+
+    def _select(self, rows, time, satellite, epoch):
+        """
+            Keep one row per satellite from rows sorted by satellite and id,
+            the last one of each satellite or in nearest mode (epoch not
+            None) the one whose epoch is the closest to the time
+        """
+        time = self._time(time)
+
+        def distance(row):
+            if epoch is None:
+                return 0
+
+            return abs(self._datetime(epoch(row)) - time)
+
+        selected = []
+        for row in rows:
+            if selected and satellite(selected[-1][0]) == satellite(row):
+                if distance(row) <= selected[-1][1]:
+                    selected[-1] = (row, distance(row))
+            else:
+                selected.append((row, distance(row)))
+
+        return [row for row, _ in selected]
+
+    def findByCatalogEntriesAndTime(self, entries, time = None, mode = None):
+        """
+            Return a dict of the TLEs matching the given time for each entry
+            of a CatalogEntry queryset, or of a list of entries or NORAD
+            catalog numbers, keyed by NORAD catalog number. Entries without
+            any TLE at that time are left out.
+        """
+        mode = self._mode(mode)
+        columns = [f.name for f in self.model._meta.concrete_fields]
+        sql, params = self._latestByCatalogEntriesQuery(entries, time, columns, mode)
+
+        # Rows are sorted by satellite and id, the last one wins on ties
+        tles = self._select(
+            self.raw(sql, params),
+            time,
+            lambda tle: tle.satellite_number_id,
+            (lambda tle: tle.epoch) if mode == self.NEAREST else None
+        )
+
+        tles = dict((tle.satellite_number_id, tle) for tle in tles)
+        tles.update(self._findArchivedByCatalogEntries(
+            entries,
+            time,
+            mode,
+            dict((number, tle.epoch) for number, tle in tles.items())
+        ))
+
+        return tles
+
+    def findLinesByCatalogEntriesAndTime(self, entries, time = None, mode = None):
+        """
+            Same as findByCatalogEntriesAndTime without building model
+            instances, returns a list of (satellite number, TLE id, line 1,
+            line 2) tuples sorted by satellite number
+        """
+        mode = self._mode(mode)
+        sql, params = self._latestByCatalogEntriesQuery(
+            entries,
+            time,
+            ['satellite_number', 'id', 'second_line', 'third_line', 'epoch'],
+            mode
+        )
+
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        rows = self._select(
+            rows,
+            time,
+            lambda row: row[0],
+            (lambda row: row[4]) if mode == self.NEAREST else None
+        )
+
+        archived = self._findArchivedByCatalogEntries(
+            entries,
+            time,
+            mode,
+            dict((row[0], self._datetime(row[4])) for row in rows)
+        )
+        if archived:
+            rows = [row for row in rows if row[0] not in archived] + [
+                (tle.satellite_number_id, tle.id, tle.second_line, tle.third_line)
+                for tle in archived.values()
+            ]
+            rows.sort(key=lambda row: row[0])
+
+        return [row[:4] for row in rows]
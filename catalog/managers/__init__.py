@@ -1 +1,3 @@
 from .TLEManager import TLEManager
+from .GenerationManager import GenerationManager
+from .CatalogEntryManager import CatalogEntryManager
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import datetime
+
+import pytz
+from django.db import migrations, models
+
+# Rows updated by each statement
+BATCH_SIZE = 1000
+
+
+def epoch_datetime(epoch_year, epoch_day):
+    """
+        Return the UTC datetime of an epoch given by the two digits year and
+        the fractional day of the year written on TLE lines, as computed by
+        the model when the migration was written
+    """
+    year = int(epoch_year)
+    year += 1900 if year >= 57 else 2000
+
+    return datetime.datetime(year, 1, 1, tzinfo=pytz.UTC) + \
+        datetime.timedelta(days=float(epoch_day) - 1)
+
+
+def backfill_epochs(apps, schema_editor):
+    """
+        Compute the epoch of the existing TLEs from their epoch year and day,
+        with one UPDATE for each batch of rows
+    """
+    TLE = apps.get_model('catalog', 'TLE')
+
+    last_id = 0
+    while True:
+        rows = list(
+            TLE.objects.filter(epoch__isnull=True, id__gt=last_id)
+            .order_by('id')
+            .values_list('id', 'epoch_year', 'epoch_day')[:BATCH_SIZE]
+        )
+        if not rows:
+            break
+
+        TLE.objects.filter(id__in=[row[0] for row in rows]).update(
+            epoch=models.Case(
+                *[
+                    models.When(
+                        id=tle_id,
+                        then=models.Value(epoch_datetime(epoch_year, epoch_day))
+                    )
+                    for tle_id, epoch_year, epoch_day in rows
+                ],
+                output_field=models.DateTimeField()
+            )
+        )
+
+        last_id = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0009_auto_20170825_0142'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tle',
+            name='epoch',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AlterIndexTogether(
+            name='tle',
+            index_together=set([('satellite_number', 'epoch')]),
+        ),
+        migrations.RunPython(backfill_epochs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.3 on 2026-10-18 16:26
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from catalog.managers import CatalogEntryManager
+
+
+def legacy_alter_table(enabled):
+    """
+        SQLite 3.26 and later rename the references to a table rebuilt by the
+        schema editor, which breaks the foreign keys between the TLEs and the
+        catalog entries unless the legacy behaviour is used
+    """
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'sqlite':
+            schema_editor.execute(
+                'PRAGMA legacy_alter_table = %s' % ('ON' if enabled else 'OFF')
+            )
+
+    return run
+
+
+def update_current_tles(apps, schema_editor):
+    """
+        Point every catalog entry to its latest TLE
+    """
+    CatalogEntry = apps.get_model('catalog', 'CatalogEntry')
+    CatalogEntry.objects.updateCurrentTles()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0011_generation'),
+    ]
+
+    operations = [
+        migrations.RunPython(legacy_alter_table(True), legacy_alter_table(False)),
+        migrations.AlterIndexTogether(
+            name='tle',
+            index_together=set([('satellite_number', 'added'), ('satellite_number', 'epoch')]),
+        ),
+        migrations.AlterModelManagers(
+            name='catalogentry',
+            managers=[
+                ('objects', CatalogEntryManager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='current_tle',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='catalog.TLE'),
+        ),
+        migrations.RunPython(legacy_alter_table(False), legacy_alter_table(True)),
+        migrations.RunPython(update_current_tles, migrations.RunPython.noop),
+    ]
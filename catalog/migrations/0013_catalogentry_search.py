@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+from catalog.search import catalog_search
+
+
+def create_search_index(apps, schema_editor):
+    """
+        Create the full text index of the catalog entries where the database
+        supports it, and index the existing entries
+    """
+    if catalog_search.create(schema_editor.connection):
+        catalog_search.update(using=schema_editor.connection.alias)
+
+
+def drop_search_index(apps, schema_editor):
+    catalog_search.drop(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0012_catalogentry_current_tle'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
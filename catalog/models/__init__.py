@@ -4,3 +4,4 @@ from .tle import TLE
 from .catalogentry import CatalogEntry
 from .source import Source
 from .launchsite import LaunchSite
+from .generation import Generation
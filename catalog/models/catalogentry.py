@@ -2,6 +2,7 @@ import datetime
 import pytz
 
 from django.db import models
+from catalog.managers import CatalogEntryManager
 from catalog.models import TLE
 
 class CatalogEntry(models.Model):
@@ -89,6 +90,15 @@ class CatalogEntry(models.Model):
     updated = models.DateTimeField(
         null=True
     )
+    current_tle = models.ForeignKey(
+        "TLE",
+        models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='+'
+    )
+
+    objects = CatalogEntryManager()
 
     def __str__(self):
         return self.international_designator
@@ -0,0 +1,30 @@
+from django.db import models
+from catalog.managers import GenerationManager
+
+class Generation(models.Model):
+    """
+        Counter bumped every time a kind of data is imported, lets the
+        processes keeping the data in memory know when to refresh it
+    """
+
+    # TLEs imported by importtle
+    TLE = 'tle'
+
+    # Any data served by the API, bumped by every import
+    DATA = 'data'
+
+    name = models.CharField(
+        max_length=32,
+        unique=True
+    )
+    value = models.PositiveIntegerField(
+        default=0
+    )
+    updated = models.DateTimeField(
+        null=True
+    )
+
+    objects = GenerationManager()
+
+    def __str__(self):
+        return '%s:%i' % (self.name, self.value)
@@ -1,11 +1,29 @@
+import datetime
+
+import pytz
 from django.db import models
 from catalog.managers import TLEManager
 
+def epoch_datetime(epoch_year, epoch_day):
+    """
+        Return the UTC datetime of an epoch given by the two digits year and
+        the fractional day of the year written on TLE lines
+    """
+    year = int(epoch_year)
+    year += 1900 if year >= 57 else 2000
+
+    return datetime.datetime(year, 1, 1, tzinfo=pytz.UTC) + \
+        datetime.timedelta(days=float(epoch_day) - 1)
+
 class TLE(models.Model):
 
     class Meta:
         verbose_name = "Two Line Element"
         verbose_name_plural = "Two Line Elements"
+        index_together = [
+            ('satellite_number', 'added'),
+            ('satellite_number', 'epoch'),
+        ]
 
     first_line = models.CharField(
         max_length=70,
@@ -92,8 +110,17 @@ class TLE(models.Model):
     added = models.DateTimeField(
         null=True
     )
+    epoch = models.DateTimeField(
+        null=True
+    )
 
     objects = TLEManager()
 
+    def save(self, *args, **kwargs):
+        if self.epoch is None and self.epoch_year and self.epoch_day is not None:
+            self.epoch = epoch_datetime(self.epoch_year, self.epoch_day)
+
+        super(TLE, self).save(*args, **kwargs)
+
     def __str__(self):
         return '%s:%i' % (self.satellite_number.international_designator , self.set_number)
@@ -0,0 +1,252 @@
+"""
+    Full text index of the catalog entries
+"""
+
+import threading
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+class CatalogSearchIndex(object):
+    """
+        SQLite FTS5 table of the searchable text of every catalog entry,
+        its row id is the NORAD catalog number
+
+        The trigram tokenizer matches any substring of at least three
+        characters, case insensitively, like the icontains lookups of the
+        search filter it replaces, and ranks the matches with BM25. On other
+        databases, or SQLite builds without FTS5 trigrams, the index is not
+        available and searches use the regular lookups.
+    """
+
+    table = 'catalog_catalogentry_search'
+
+    # Shortest term the trigram tokenizer can match
+    min_length = 3
+
+    columns = (
+        'norad_catalog_number',
+        'international_designator',
+        'names',
+        'launch_date',
+        'decay_date',
+        'owner',
+        'launch_site',
+        'operational_status',
+        'orbital_status',
+    )
+
+    def __init__(self):
+        self._available = {}
+        self._deferred = threading.local()
+
+    def create(self, connection):
+        """
+            Create the index table, returns whether it is supported
+        """
+        if connection.vendor != 'sqlite':
+            return False
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+                    "{columns}, tokenize='trigram')".format(
+                        table=self.table,
+                        columns=', '.join(self.columns),
+                    )
+                )
+        except OperationalError:
+            return False
+
+        self._available.pop(connection.alias, None)
+        return True
+
+    def drop(self, connection):
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('DROP TABLE IF EXISTS {0}'.format(self.table))
+
+        self._available.pop(connection.alias, None)
+
+    def available(self, using=DEFAULT_DB_ALIAS):
+        """
+            Whether the index table exists in the given database
+        """
+        if using not in self._available:
+            connection = connections[using]
+            self._available[using] = connection.vendor == 'sqlite' and \
+                self.table in connection.introspection.table_names()
+
+        return self._available[using]
+
+    def update(self, numbers=None, using=DEFAULT_DB_ALIAS):
+        """
+            Index again the catalog entries of the given NORAD catalog
+            numbers, the whole catalog by default
+        """
+        if not self.available(using):
+            return
+
+        from catalog.models import CatalogEntry
+
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        meta = CatalogEntry._meta
+
+        def related(name, columns):
+            field = meta.get_field(name)
+            alias = quote(name)
+            join = 'LEFT OUTER JOIN {table} {alias} ON {alias}.{pk} = e.{column}'.format(
+                table=quote(field.related_model._meta.db_table),
+                alias=alias,
+                pk=quote(field.related_model._meta.pk.column),
+                column=quote(field.column),
+            )
+            text = " || ' ' || ".join(
+                "COALESCE({0}.{1}, '')".format(alias, quote(column))
+                for column in columns
+            )
+
+            return join, text
+
+        joins = [
+            related('owner', ('code', 'description')),
+            related('launch_site', ('code', 'description')),
+            related('operational_status', ('description',)),
+            related('orbital_status', ('description',)),
+        ]
+
+        pk = 'e.{0}'.format(quote(meta.pk.column))
+        select = [
+            'CAST({0} AS INTEGER)'.format(pk),
+            pk,
+            'e.{0}'.format(quote(meta.get_field('international_designator').column)),
+            'e.{0}'.format(quote(meta.get_field('names').column)),
+            'e.{0}'.format(quote(meta.get_field('launch_date').column)),
+            'e.{0}'.format(quote(meta.get_field('decay_date').column)),
+        ] + [text for _, text in joins]
+
+        sql = (
+            'INSERT INTO {table} (rowid, {columns}) '
+            'SELECT {select} FROM {entries} e {joins}'
+        ).format(
+            table=self.table,
+            columns=', '.join(self.columns),
+            select=', '.join(select),
+            entries=quote(meta.db_table),
+            joins=' '.join(join for join, _ in joins),
+        )
+
+        with connection.cursor() as cursor:
+            if numbers is None:
+                cursor.execute('DELETE FROM {0}'.format(self.table))
+                cursor.execute(sql)
+                return
+
+            numbers = list(numbers)
+            for first in range(0, len(numbers), 500):
+                chunk = numbers[first:first + 500]
+                placeholders = ', '.join(['%s'] * len(chunk))
+
+                cursor.execute(
+                    'DELETE FROM {0} WHERE rowid IN ({1})'.format(
+                        self.table,
+                        placeholders
+                    ),
+                    [int(number) for number in chunk]
+                )
+                cursor.execute(
+                    '{0} WHERE {1} IN ({2})'.format(sql, pk, placeholders),
+                    chunk
+                )
+
+    def delete(self, numbers, using=DEFAULT_DB_ALIAS):
+        """
+            Remove catalog entries from the index
+        """
+        if not self.available(using):
+            return
+
+        numbers = [int(number) for number in numbers]
+        with connections[using].cursor() as cursor:
+            for first in range(0, len(numbers), 500):
+                chunk = numbers[first:first + 500]
+                cursor.execute(
+                    'DELETE FROM {0} WHERE rowid IN ({1})'.format(
+                        self.table,
+                        ', '.join(['%s'] * len(chunk))
+                    ),
+                    chunk
+                )
+
+    @contextmanager
+    def deferred(self, using=DEFAULT_DB_ALIAS):
+        """
+            Skip the indexing of each saved entry within the block, the whole
+            catalog is indexed again at its end
+        """
+        self._deferred.active = True
+        try:
+            yield
+        finally:
+            self._deferred.active = False
+
+        self.update(using=using)
+
+    @property
+    def is_deferred(self):
+        return getattr(self._deferred, 'active', False)
+
+    def match(self, terms):
+        """
+            Return the FTS5 query matching rows containing every term
+        """
+        return ' AND '.join(
+            '"{0}"'.format(term.replace('"', '""')) for term in terms
+        )
+
+    def filter(self, queryset, terms, rank=False):
+        """
+            Restrict a CatalogEntry queryset to the entries matching every
+            term, sorted by relevance with rank
+        """
+        meta = queryset.model._meta
+        connection = connections[queryset.db]
+        quote = connection.ops.quote_name
+
+        queryset = queryset.extra(
+            select={'search_rank': '{0}.rank'.format(self.table)},
+            tables=[self.table],
+            where=[
+                '{0}.norad_catalog_number = {1}.{2}'.format(
+                    self.table,
+                    quote(meta.db_table),
+                    quote(meta.pk.column)
+                ),
+                '{0} MATCH %s'.format(self.table),
+            ],
+            params=[self.match(terms)],
+        )
+
+        if rank:
+            queryset = queryset.extra(order_by=['search_rank'])
+
+        return queryset
+
+
+catalog_search = CatalogSearchIndex()
+
+
+@receiver(post_save, sender='catalog.CatalogEntry')
+def index_entry(sender, instance, using, **kwargs):
+    if not catalog_search.is_deferred:
+        catalog_search.update([instance.pk], using=using)
+
+
+@receiver(post_delete, sender='catalog.CatalogEntry')
+def unindex_entry(sender, instance, using, **kwargs):
+    if not catalog_search.is_deferred:
+        catalog_search.delete([instance.pk], using=using)
@@ -1,10 +1,23 @@
+import copy
 import datetime
+import gzip
+import importlib
+import os
 import pytz
+import shutil
+import tempfile
+from unittest import mock
 
-from django.test import TestCase
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils.six import StringIO
+from django.test import TestCase, override_settings
 from django.db.utils import IntegrityError
 
-from .models import CatalogEntry, TLE
+from .models import CatalogEntry, Generation, TLE
+from .models.tle import epoch_datetime
+from .archive import TLEArchive
 
 class CatalogTestCase(TestCase):
 
@@ -49,3 +62,460 @@ class CatalogTestCase(TestCase):
                 entry, time2
             )
         )
+
+    def test_findByCatalogEntriesAndTimeReturnsLatestTlePerEntry(self):
+        time = datetime.datetime(2017, 3, 1, 0, 0, 0)
+
+        tles = TLE.objects.findByCatalogEntriesAndTime(
+            CatalogEntry.objects.all(),
+            time
+        )
+
+        self.assertEqual(sorted(tles.keys()), ['25544', '37820'])
+        self.assertEqual(tles['25544'].id, 4)
+        self.assertEqual(tles['37820'].id, 3)
+
+    def test_findByCatalogEntriesAndTimeHonorsTheQueryset(self):
+        time = datetime.datetime(2017, 3, 1, 0, 0, 0)
+
+        tles = TLE.objects.findByCatalogEntriesAndTime(
+            CatalogEntry.objects.filter(owner__code='PRC'),
+            time
+        )
+
+        self.assertEqual(list(tles.keys()), ['37820'])
+
+    def test_findByCatalogEntriesAndTimeIgnoresLaterTles(self):
+        time = datetime.datetime(2017, 2, 28, 21, 0, 0)
+
+        tles = TLE.objects.findByCatalogEntriesAndTime(
+            CatalogEntry.objects.all(),
+            time
+        )
+
+        self.assertEqual(list(tles.keys()), ['25544'])
+        self.assertEqual(tles['25544'].id, 2)
+
+    def test_findByCatalogEntriesAndTimeUsesOneQuery(self):
+        time = datetime.datetime(2017, 3, 1, 0, 0, 0)
+
+        with self.assertNumQueries(1):
+            TLE.objects.findByCatalogEntriesAndTime(
+                CatalogEntry.objects.all(),
+                time
+            )
+
+        with self.assertNumQueries(1):
+            TLE.objects.findLinesByCatalogEntriesAndTime(
+                CatalogEntry.objects.all(),
+                time
+            )
+
+    def test_findLinesByCatalogEntriesAndTimeReturnsLines(self):
+        time = datetime.datetime(2017, 3, 1, 0, 0, 0)
+        tle = TLE.objects.get(id=4)
+
+        lines = TLE.objects.findLinesByCatalogEntriesAndTime(
+            CatalogEntry.objects.filter(norad_catalog_number='25544'),
+            time
+        )
+
+        self.assertEqual(
+            lines,
+            [('25544', 4, tle.second_line, tle.third_line)]
+        )
+
+    def test_epochDatetimeReadsTleEpoch(self):
+        self.assertEqual(
+            epoch_datetime('17', 59.5),
+            datetime.datetime(2017, 2, 28, 12, 0, 0, tzinfo=pytz.UTC)
+        )
+        self.assertEqual(
+            epoch_datetime('98', 1.0),
+            datetime.datetime(1998, 1, 1, 0, 0, 0, tzinfo=pytz.UTC)
+        )
+
+    def test_tleSaveStoresEpoch(self):
+        tle = TLE.objects.get(id=4)
+        tle.pk = None
+        tle.epoch = None
+        tle.save()
+
+        self.assertEqual(
+            TLE.objects.get(pk=tle.pk).epoch,
+            epoch_datetime(tle.epoch_year, tle.epoch_day)
+        )
+
+    def test_backfillMigrationComputesEpochs(self):
+        migration = importlib.import_module('catalog.migrations.0010_tle_epoch')
+
+        TLE.objects.update(epoch=None)
+        with mock.patch.object(migration, 'BATCH_SIZE', 3), \
+                self.assertNumQueries(5):
+            migration.backfill_epochs(apps, None)
+
+        for tle in TLE.objects.all():
+            self.assertEqual(
+                tle.epoch,
+                epoch_datetime(tle.epoch_year, tle.epoch_day)
+            )
+
+    def test_findByCatalogEntryAndTimeEpochMode(self):
+        entry = CatalogEntry.objects.get(norad_catalog_number='25544')
+
+        # TLE 2 has an epoch of 2017-02-28 13:51, TLE 4 of 19:56
+        time = datetime.datetime(2017, 2, 28, 19, 0, 0)
+
+        self.assertEqual(
+            TLE.objects.findByCatalogEntryAndTime(entry, time, 'epoch').id,
+            2
+        )
+        self.assertEqual(
+            TLE.objects.findByCatalogEntryAndTime(entry, time, 'nearest').id,
+            4
+        )
+
+        with self.assertRaises(IndexError):
+            TLE.objects.findByCatalogEntryAndTime(
+                entry,
+                datetime.datetime(2016, 1, 1),
+                'epoch'
+            )
+
+    def test_findByCatalogEntryAndTimeNearestUsesOneQuery(self):
+        entry = CatalogEntry.objects.get(norad_catalog_number='25544')
+
+        with self.assertNumQueries(1):
+            tle = TLE.objects.findByCatalogEntryAndTime(
+                entry,
+                datetime.datetime(2010, 1, 1),
+                'nearest'
+            )
+
+        self.assertEqual(tle.id, 1)
+
+    def test_findByCatalogEntryAndTimeRejectsUnknownMode(self):
+        entry = CatalogEntry.objects.get(norad_catalog_number='25544')
+
+        with self.assertRaises(ValueError):
+            TLE.objects.findByCatalogEntryAndTime(entry, None, 'closest')
+
+    def test_findByCatalogEntriesAndTimeNearestMode(self):
+        time = datetime.datetime(2017, 2, 28, 17, 0, 0)
+
+        with self.assertNumQueries(1):
+            tles = TLE.objects.findByCatalogEntriesAndTime(
+                CatalogEntry.objects.all(),
+                time,
+                'nearest'
+            )
+
+        self.assertEqual(tles['25544'].id, 4)
+        self.assertEqual(tles['37820'].id, 3)
+
+        lines = TLE.objects.findLinesByCatalogEntriesAndTime(
+            CatalogEntry.objects.all(),
+            time,
+            'nearest'
+        )
+        self.assertEqual([line[1] for line in lines], [4, 3])
+
+        lines = TLE.objects.findLinesByCatalogEntriesAndTime(
+            CatalogEntry.objects.all(),
+            time,
+            'epoch'
+        )
+        self.assertEqual([line[1] for line in lines], [2, 3])
+
+    @override_settings(TLE_LOOKUP_MODE='epoch')
+    def test_lookupModeDefaultsToSettings(self):
+        entry = CatalogEntry.objects.get(norad_catalog_number='25544')
+        time = datetime.datetime(2017, 2, 28, 19, 0, 0)
+
+        self.assertEqual(TLE.objects.findByCatalogEntryAndTime(entry, time).id, 2)
+
+    def test_generationBumpIncrementsCounter(self):
+        self.assertEqual(Generation.objects.current(Generation.TLE), 0)
+
+        self.assertEqual(Generation.objects.bump(Generation.TLE), 1)
+        self.assertEqual(Generation.objects.bump(Generation.TLE), 2)
+
+        self.assertEqual(Generation.objects.current(Generation.TLE), 2)
+        self.assertEqual(Generation.objects.current('other'), 0)
+
+    def test_findByCatalogEntriesAndTimeAcceptsNumbers(self):
+        time = datetime.datetime(2017, 3, 1, 0, 0, 0)
+        entry = CatalogEntry.objects.get(norad_catalog_number='37820')
+
+        with self.assertNumQueries(1):
+            tles = TLE.objects.findByCatalogEntriesAndTime(
+                [25544, entry, '99999'],
+                time
+            )
+
+        self.assertEqual(sorted(tles.keys()), ['25544', '37820'])
+        self.assertEqual(tles['25544'].id, 4)
+
+        self.assertEqual(TLE.objects.findByCatalogEntriesAndTime([], time), {})
+
+        with self.assertRaises(ValueError):
+            TLE.objects.findByCatalogEntriesAndTime(["25544' OR 1=1"], time)
+
+    def test_findByCatalogEntriesAndTimeHandlesLargeInputs(self):
+        time = datetime.datetime(2017, 3, 1, 0, 0, 0)
+        count = 2000
+
+        CatalogEntry.objects.bulk_create([
+            CatalogEntry(
+                norad_catalog_number=str(70000 + i),
+                international_designator='2099-%05d' % i
+            )
+            for i in range(count)
+        ])
+
+        template = TLE.objects.get(id=4)
+        tles = []
+        for i in range(count):
+            tle = copy.copy(template)
+            tle.pk = None
+            tle.satellite_number_id = str(70000 + i)
+            tles.append(tle)
+        TLE.objects.bulk_create(tles)
+
+        # Far more numbers than SQLite accepts bound parameters
+        numbers = [60000 + i for i in range(30000)] + [25544]
+
+        with self.assertNumQueries(1):
+            found = TLE.objects.findByCatalogEntriesAndTime(numbers, time)
+
+        self.assertEqual(len(found), count + 1)
+        self.assertEqual(found['25544'].id, 4)
+        self.assertEqual(found['71999'].satellite_number_id, '71999')
+
+        with self.assertNumQueries(1):
+            lines = TLE.objects.findLinesByCatalogEntriesAndTime(
+                CatalogEntry.objects.filter(norad_catalog_number__gte='70000'),
+                time
+            )
+
+        self.assertEqual(len(lines), count)
+
+    def test_updateCurrentTlesPointsToLatestTle(self):
+        CatalogEntry.objects.update(current_tle=None)
+
+        with self.assertNumQueries(1):
+            count = CatalogEntry.objects.updateCurrentTles()
+
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            CatalogEntry.objects.get(norad_catalog_number='25544').current_tle_id,
+            4
+        )
+        self.assertEqual(
+            CatalogEntry.objects.get(norad_catalog_number='37820').current_tle_id,
+            3
+        )
+
+    def test_updateCurrentTlesHonorsTheQueryset(self):
+        CatalogEntry.objects.update(current_tle=None)
+
+        CatalogEntry.objects.updateCurrentTles(
+            CatalogEntry.objects.filter(owner__code='PRC')
+        )
+
+        self.assertIsNone(
+            CatalogEntry.objects.get(norad_catalog_number='25544').current_tle_id
+        )
+        self.assertEqual(
+            CatalogEntry.objects.get(norad_catalog_number='37820').current_tle_id,
+            3
+        )
+
+    @override_settings(TLE_LOOKUP_MODE='latest')
+    def test_updateCurrentTlesRejectsUnknownModes(self):
+        with self.assertRaises(ValueError):
+            CatalogEntry.objects.updateCurrentTles()
+
+        with self.assertRaises(ValueError):
+            TLE.objects.findByCatalogEntryAndTime(
+                CatalogEntry.objects.get(norad_catalog_number='25544')
+            )
+
+    def test_deletedCurrentTleIsUnset(self):
+        TLE.objects.get(id=4).delete()
+
+        self.assertIsNone(
+            CatalogEntry.objects.get(norad_catalog_number='25544').current_tle_id
+        )
+
+
+class TLEArchiveTestCase(TestCase):
+
+    fixtures = [
+        'initial_data',
+        'test_data',
+    ]
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.archive = TLEArchive(self.path)
+        self.iss = CatalogEntry.objects.get(norad_catalog_number='25544')
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def archiveTles(self, *ids):
+        fields = TLE._meta.concrete_fields
+        tles = TLE.objects.filter(id__in=ids)
+
+        self.archive.append([
+            dict((field.attname, getattr(tle, field.attname)) for field in fields)
+            for tle in tles
+        ])
+        tles.delete()
+
+    def test_archiveReadsBackAppendedRows(self):
+        tle = TLE.objects.get(id=1)
+        self.archiveTles(1)
+        self.archive.append([{
+            'id': 1,
+            'satellite_number_id': '25544',
+            'added': tle.added,
+            'epoch': tle.epoch,
+        }])
+
+        self.assertEqual(self.archive.years('25544'), [2016])
+
+        rows = self.archive.read('25544', 2016)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['third_line'], tle.third_line)
+        self.assertEqual(rows[0]['epoch'], tle.epoch)
+
+    def test_findFallsThroughToTheArchive(self):
+        expected = TLE.objects.get(id=1)
+        self.archiveTles(1, 2)
+
+        time = datetime.datetime(2016, 12, 1)
+
+        with override_settings(TLE_ARCHIVE_PATH=self.path):
+            tle = TLE.objects.findByCatalogEntryAndTime(self.iss, time)
+            self.assertEqual(tle.id, 1)
+            self.assertEqual(tle.second_line, expected.second_line)
+            self.assertEqual(tle.mean_motion, expected.mean_motion)
+            self.assertEqual(tle.added, expected.added)
+
+            tle = TLE.objects.findByCatalogEntryAndTime(self.iss, time, 'epoch')
+            self.assertEqual(tle.id, 1)
+
+            tle = TLE.objects.findByCatalogEntryAndTime(
+                self.iss,
+                datetime.datetime(2017, 2, 28, 13, 0, 0)
+            )
+            self.assertEqual(tle.id, 2)
+
+            tle = TLE.objects.findByCatalogEntryAndTime(
+                self.iss,
+                datetime.datetime(2017, 2, 28, 14, 0, 0),
+                'nearest'
+            )
+            self.assertEqual(tle.id, 2)
+
+            with self.assertRaises(IndexError):
+                TLE.objects.findByCatalogEntryAndTime(
+                    self.iss,
+                    datetime.datetime(2016, 1, 1)
+                )
+
+        with self.assertRaises(IndexError):
+            TLE.objects.findByCatalogEntryAndTime(self.iss, time)
+
+    def test_batchLookupsFallThroughToTheArchive(self):
+        self.archiveTles(1, 2)
+
+        with override_settings(TLE_ARCHIVE_PATH=self.path):
+            tles = TLE.objects.findByCatalogEntriesAndTime(
+                CatalogEntry.objects.all(),
+                datetime.datetime(2016, 12, 1)
+            )
+            self.assertEqual(list(tles.keys()), ['25544'])
+            self.assertEqual(tles['25544'].id, 1)
+
+            lines = TLE.objects.findLinesByCatalogEntriesAndTime(
+                ['25544', '37820'],
+                datetime.datetime(2017, 2, 28, 16, 0, 0),
+                'nearest'
+            )
+            self.assertEqual([line[1] for line in lines], [2, 3])
+
+    def test_epochLookupsFindBackfilledTles(self):
+        # A TLE of 2014 imported in 2017
+        tle = TLE.objects.get(id=1)
+        tle.added = datetime.datetime(2017, 1, 5, tzinfo=pytz.UTC)
+        tle.epoch = datetime.datetime(2014, 6, 1, tzinfo=pytz.UTC)
+        tle.save()
+        self.archiveTles(1, 2)
+
+        with override_settings(TLE_ARCHIVE_PATH=self.path):
+            for mode in ['epoch', 'nearest']:
+                self.assertEqual(
+                    TLE.objects.findByCatalogEntryAndTime(
+                        self.iss,
+                        datetime.datetime(2014, 6, 2),
+                        mode
+                    ).id,
+                    1
+                )
+
+            with self.assertRaises(IndexError):
+                TLE.objects.findByCatalogEntryAndTime(
+                    self.iss,
+                    datetime.datetime(2014, 6, 2)
+                )
+
+    def test_batchLookupsReadEachFileOnce(self):
+        self.archiveTles(1, 2)
+
+        with override_settings(TLE_ARCHIVE_PATH=self.path), \
+                mock.patch('catalog.archive.gzip.open', wraps=gzip.open) as opened, \
+                mock.patch('catalog.archive.os.path.isdir', wraps=os.path.isdir) as checked:
+            for time in ['2016-12-01', '2016-12-02']:
+                tles = TLE.objects.findByCatalogEntriesAndTime(
+                    CatalogEntry.objects.all(),
+                    datetime.datetime.strptime(time, '%Y-%m-%d'),
+                    'epoch'
+                )
+                self.assertEqual(tles['25544'].id, 1)
+
+        # The 2016 and 2017 files, parsed by the first lookup only
+        self.assertEqual(opened.call_count, 2)
+
+        # Nothing is looked for the satellite without archived TLEs
+        self.assertNotIn(
+            mock.call(os.path.join(self.path, '37820')),
+            checked.call_args_list
+        )
+
+    def test_archivetlesMovesOldTles(self):
+        with override_settings(TLE_ARCHIVE_PATH=self.path):
+            call_command('archivetles', age=0, batch_size=1, stdout=StringIO())
+
+            # The current TLEs stay in the database
+            self.assertEqual(
+                sorted(TLE.objects.values_list('id', flat=True)),
+                [3, 4]
+            )
+            self.assertEqual(
+                [row['id'] for row in self.archive.read('25544', 2017)],
+                [2]
+            )
+            self.assertEqual(
+                TLE.objects.findByCatalogEntryAndTime(
+                    self.iss,
+                    datetime.datetime(2016, 12, 1)
+                ).id,
+                1
+            )
+
+    def test_archivetlesRequiresAnArchivePath(self):
+        with self.assertRaises(CommandError):
+            call_command('archivetles', stdout=StringIO())
@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.archive import tle_archive
+from catalog.models import CatalogEntry, Generation, TLE
+
+class Command(BaseCommand):
+    help = 'Move the old TLEs from the database to the archive'
+
+    def add_arguments(self, parser):
+        """
+            Set command's arguments
+        """
+        parser.add_argument(
+            '--age',
+            type=int,
+            default=settings.TLE_ARCHIVE_AGE,
+            help='Archive the TLEs added more than this number of days ago'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of TLEs moved by each transaction'
+        )
+
+    def handle(self, *args, **options):
+        """
+            Main function
+        """
+        if not tle_archive.enabled:
+            raise CommandError('TLE_ARCHIVE_PATH is not set')
+
+        if options['age'] < 0 or options['batch_size'] <= 0:
+            raise CommandError('Incorrect age or batch size')
+
+        limit = timezone.now() - timedelta(days=options['age'])
+        count = 0
+
+        while True:
+            moved = self.archive(limit, options['batch_size'])
+            if not moved:
+                break
+
+            count += moved
+
+        self.stdout.write(self.style.SUCCESS(
+            'Successfully archived %d TLEs' % count
+        ))
+
+    def archive(self, limit, batch_size):
+        """
+            Move a batch of the TLEs added before limit to the archive, the
+            current TLEs of the catalog entries are kept. Returns the number
+            of TLEs moved.
+
+            Rows are written to the archive before being deleted, each batch
+            in its own short transaction, so the command can be stopped and
+            run again at any time.
+        """
+        fields = TLE._meta.concrete_fields
+
+        rows = list(
+            TLE.objects.filter(
+                added__lt=limit,
+                satellite_number__isnull=False
+            ).exclude(
+                id__in=CatalogEntry.objects.filter(current_tle__isnull=False) \
+                    .values('current_tle')
+            ).order_by(
+                'id'
+            ).values(
+                *[field.name for field in fields]
+            )[:batch_size]
+        )
+
+        if not rows:
+            return 0
+
+        tle_archive.append([
+            dict((field.attname, row[field.name]) for field in fields)
+            for row in rows
+        ])
+
+        with transaction.atomic():
+            TLE.objects.filter(id__in=[row['id'] for row in rows]).delete()
+            Generation.objects.bump(Generation.DATA)
+
+        return len(rows)
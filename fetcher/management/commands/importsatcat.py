@@ -12,7 +12,8 @@ from fetcher.models import DataSource
 from fetcher import tools
 
 from catalog.models import CatalogEntry,LaunchSite, OrbitalStatus, \
-                           OperationalStatus, Source
+                           OperationalStatus, Source, Generation
+from catalog.search import catalog_search
 
 class Command(BaseCommand):
     help = 'Import SatCat from specified datasource'
@@ -48,8 +49,11 @@ class Command(BaseCommand):
             raise CommandError('DataSource "%s" does not exist' % system_name)
 
         for source in sources:
-            source.last_time_checked = timezone.now()
-            source.save()
+            # The date of the check is returned by the API
+            with transaction.atomic():
+                source.last_time_checked = timezone.now()
+                source.save()
+                Generation.objects.bump(Generation.DATA)
 
             self.stdout.write(source.url)
             data = tools.download(source.url)
@@ -65,9 +69,14 @@ class Command(BaseCommand):
         """
         parser = tools.SatcatParser()
 
-        for line in tqdm(lines, desc="Inserting  ", total=len(lines)):
-            data = parser.parse_line(line)
-            self.update(data)
+        # The search index is built again once every entry is saved
+        with catalog_search.deferred():
+            for line in tqdm(lines, desc="Inserting  ", total=len(lines)):
+                data = parser.parse_line(line)
+                self.update(data)
+
+        # Committed with the entries, the API responses change
+        Generation.objects.bump(Generation.DATA)
 
     def update(self, data):
         """
@@ -1,12 +1,14 @@
+from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
+from django.core.management import call_command
 from django.core.management.base import BaseCommand, CommandError
 
 from tqdm import tqdm
 
 from fetcher import tools
 from fetcher.models import DataSource
-from catalog.models import CatalogEntry, TLE
+from catalog.models import CatalogEntry, Generation, TLE
 
 class Command(BaseCommand):
     help = 'Import TLE from specified datasource'
@@ -26,6 +28,10 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS('Successfully imported TLEs'))
 
+        # Precompute the positions of the new TLEs
+        if settings.EPHEMERIS_TILES_PATH is not None:
+            call_command('buildtiles', stdout=self.stdout)
+
     def process_system_name(self, system_name):
         """
             Finds and process a DataSource by its system name
@@ -42,8 +48,11 @@ class Command(BaseCommand):
             raise CommandError('DataSource "%s" does not exists' % system_name)
 
         for source in sources:
-            source.last_time_checked = timezone.now()
-            source.save()
+            # The date of the check is returned by the API
+            with transaction.atomic():
+                source.last_time_checked = timezone.now()
+                source.save()
+                Generation.objects.bump(Generation.DATA)
 
             self.stdout.write(source.url)
             data = tools.download(source.url)
@@ -59,6 +68,10 @@ class Command(BaseCommand):
         """
         parser = tools.TleParser()
 
+        # TLEs with a greater id are the ones of this import
+        last_id = TLE.objects.order_by('-id') \
+            .values_list('id', flat=True).first() or 0
+
         group = {}
         for line in tqdm(lines, desc="Inserting  ", total=len(lines)):
             group[len(group)] = line
@@ -66,6 +79,18 @@ class Command(BaseCommand):
                 self.update(parser.parse(group))
                 group = {}
 
+        # Point the catalog entries to their new TLEs in one statement
+        CatalogEntry.objects.updateCurrentTles(
+            CatalogEntry.objects.filter(
+                pk__in=TLE.objects.filter(id__gt=last_id) \
+                    .values('satellite_number')
+            )
+        )
+
+        # Committed with the TLEs, tells the processes to load them
+        Generation.objects.bump(Generation.TLE)
+        Generation.objects.bump(Generation.DATA)
+
     def update(self, data):
         """
             Insert a TLE
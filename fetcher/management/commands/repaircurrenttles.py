@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.core.management.base import BaseCommand
+
+from catalog.models import CatalogEntry, Generation
+
+class Command(BaseCommand):
+    help = 'Point every catalog entry to its latest TLE'
+
+    def handle(self, *args, **options):
+        """
+            Main function
+        """
+        with transaction.atomic():
+            count = CatalogEntry.objects.updateCurrentTles()
+            Generation.objects.bump(Generation.DATA)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Successfully updated the current TLE of %d catalog entries' % count
+        ))
@@ -10,6 +10,8 @@ from django.utils.six import StringIO
 from django.utils.dateformat import format
 
 from fetcher.models import DataSource
+from fetcher.management.commands.importsatcat import Command
+from catalog.models import Generation
 
 class ImportSatCatTestCase(TestCase):
 
@@ -57,3 +59,16 @@ class ImportSatCatTestCase(TestCase):
             timestamp,
             format(datasource.last_time_checked, 'U')
         )
+
+    def test_importsatcatBumpsTheDataGeneration(self):
+        """
+            Test if the data generation changes with an import
+        """
+        generation = Generation.objects.current(Generation.DATA)
+
+        Command(stdout=StringIO()).parse([])
+
+        self.assertEqual(
+            Generation.objects.current(Generation.DATA),
+            generation + 1
+        )
@@ -10,6 +10,8 @@ from django.utils.six import StringIO
 from django.utils.dateformat import format
 
 from fetcher.models import DataSource
+from fetcher.management.commands.importtle import Command
+from catalog.models import CatalogEntry, Generation, TLE
 
 class ImportTleTestCase(TestCase):
 
@@ -57,3 +59,81 @@ class ImportTleTestCase(TestCase):
             timestamp,
             format(datasource.last_time_checked, 'U')
         )
+
+    def test_importtleBumpsTheDataGenerationWhenChecking(self):
+        """
+            Test if the data generation changes with the date of the check,
+            even when the download fails
+        """
+        generation = Generation.objects.current(Generation.DATA)
+
+        try:
+            call_command('importtle', 'tle_test', stdout=StringIO())
+        except (ConnectionError, CommandError):
+            pass
+
+        self.assertGreater(
+            Generation.objects.current(Generation.DATA),
+            generation
+        )
+
+    def test_importtleUpdatesCurrentTle(self):
+        """
+            Test if the catalog entries point to the imported TLEs
+        """
+        tle = TLE.objects.get(id=4)
+        lines = [
+            line.encode("utf-8")
+            for line in (tle.first_line, tle.second_line, tle.third_line)
+        ]
+        tle.delete()
+
+        self.assertIsNone(
+            CatalogEntry.objects.get(norad_catalog_number='25544').current_tle
+        )
+
+        Command(stdout=StringIO()).parse(lines)
+
+        entry = CatalogEntry.objects.get(norad_catalog_number='25544')
+        self.assertEqual(entry.current_tle.third_line, tle.third_line)
+        self.assertEqual(
+            CatalogEntry.objects.get(norad_catalog_number='37820').current_tle_id,
+            3
+        )
+
+    def test_importtleBumpsTheGenerations(self):
+        """
+            Test if the TLE and data generations change with an import
+        """
+        tle = TLE.objects.get(id=4)
+        lines = [
+            line.encode("utf-8")
+            for line in (tle.first_line, tle.second_line, tle.third_line)
+        ]
+        generations = [
+            Generation.objects.current(name)
+            for name in (Generation.TLE, Generation.DATA)
+        ]
+
+        Command(stdout=StringIO()).parse(lines)
+
+        self.assertEqual(
+            [
+                Generation.objects.current(name)
+                for name in (Generation.TLE, Generation.DATA)
+            ],
+            [generation + 1 for generation in generations]
+        )
+
+    def test_repaircurrenttlesUpdatesEveryEntry(self):
+        """
+            Test if the repair command recomputes the current TLEs
+        """
+        CatalogEntry.objects.update(current_tle=None)
+
+        call_command('repaircurrenttles', stdout=StringIO())
+
+        self.assertEqual(
+            dict(CatalogEntry.objects.values_list('pk', 'current_tle')),
+            {'25544': 4, '37820': 3}
+        )
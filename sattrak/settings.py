@@ -97,6 +97,27 @@ DATABASES = {
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/1.10/ref/settings/#caches
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Responses of the API, for instance in memcached with
+    # API_CACHE_BACKEND=django.core.cache.backends.memcached.MemcachedCache
+    # and API_CACHE_LOCATION=127.0.0.1:11211
+    'api': {
+        'BACKEND': os.environ.get(
+            'API_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('API_CACHE_LOCATION', 'api'),
+        'TIMEOUT': 24 * 3600,
+    },
+}
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/1.8/topics/i18n/
 
@@ -116,3 +137,92 @@ APPEND_SLASH = True
 # https://docs.djangoproject.com/en/1.8/howto/static-files/
 
 STATIC_URL = '/static/'
+
+
+# Computation
+
+# How the TLE of a satellite at a given time is selected: "added" for the
+# latest one imported before it, "epoch" for the one with the latest epoch
+# before it, "nearest" for the one whose epoch is the closest to it
+TLE_LOOKUP_MODE = 'added'
+
+# Maximum number of points a ground track can be made of
+COMPUTE_TRACK_MAX_POINTS = 10000
+
+# Number of parsed TLEs kept in memory by each process
+EPHEMERIS_CACHE_SIZE = 2048
+
+# Longest time range of a pass prediction, in days
+COMPUTE_PASSES_MAX_DAYS = 10
+
+# Maximum number of satellites of a catalog wide pass prediction
+COMPUTE_PASSES_MAX_SATELLITES = 1000
+
+# Maximum number of positions (satellites times steps) a conjunction
+# screening request can propagate
+COMPUTE_CONJUNCTIONS_MAX_SAMPLES = 5000000
+
+# Maximum miss distance in km a conjunction screening request can use
+COMPUTE_CONJUNCTIONS_MAX_THRESHOLD = 100
+
+# Maximum number of points (stations times satellites times dates) of a
+# multi station observation request
+COMPUTE_OBSERVATIONS_MAX_POINTS = 1000000
+
+# Ephemeris tiles file built after each TLE import, None disables the tiles
+EPHEMERIS_TILES_PATH = os.environ.get('EPHEMERIS_TILES_PATH', None)
+
+# Time window covered by the tiles from their build time, in hours
+EPHEMERIS_TILES_HOURS = 48
+
+# Largest position error of the tiles, in meters
+EPHEMERIS_TILES_ACCURACY = 10.0
+
+# Number of worker processes sharing large propagation jobs, 0 or 1 computes
+# them in the process handling the request
+COMPUTE_WORKERS = int(os.environ.get('COMPUTE_WORKERS', 0))
+
+# Maximum number of positions (satellites times steps) a region window
+# request can propagate
+COMPUTE_REGION_MAX_SAMPLES = 5000000
+
+# Seconds during which the index of the sub-satellite points answering the
+# overhead queries is used before being rebuilt
+OVERHEAD_INDEX_INTERVAL = 60
+
+# Number of indexes kept for overhead queries on other times than now
+OVERHEAD_INDEX_CACHE_SIZE = 4
+
+# Keep the TLE history of every satellite in the memory of each process to
+# answer the single satellite TLE lookups without querying the database
+TLE_TIMELINE_ENABLED = int(os.environ.get('TLE_TIMELINE_ENABLED', 0)) > 0
+
+# Most recent TLEs of each satellite kept in memory, 0 keeps all of them,
+# older ones are looked up in the database
+TLE_TIMELINE_MAX_TLES = 32
+
+# Seconds between two checks for newly imported TLEs
+TLE_TIMELINE_REFRESH_INTERVAL = 10
+
+# Directory of the compressed archive of the old TLEs, None disables it
+TLE_ARCHIVE_PATH = os.environ.get('TLE_ARCHIVE_PATH', None)
+
+# Age in days from which the archivetles command moves TLEs to the archive
+TLE_ARCHIVE_AGE = 365
+
+# Number of archive files kept parsed in memory by each process
+TLE_ARCHIVE_CACHE_SIZE = 64
+
+# Serialize the TLE and catalog entry lists straight from the database rows
+# rather than through the model serializers, the output is the same
+API_FAST_SERIALIZATION = int(os.environ.get('API_FAST_SERIALIZATION', 0)) > 0
+
+# Seconds during which each process uses the data generation it read, which
+# makes the ETag of the API responses, before reading it again
+API_GENERATION_REFRESH_INTERVAL = 5
+
+# Serve the API responses from the cache until the next import
+API_CACHE_ENABLED = int(os.environ.get('API_CACHE_ENABLED', 0)) > 0
+
+# Cache of CACHES holding the API responses
+API_CACHE_ALIAS = 'api'
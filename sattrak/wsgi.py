@@ -21,3 +21,11 @@ dotenv.read_dotenv(os.path.join(
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sattrak.settings")
 
 application = get_wsgi_application()
+
+# Load the TLE history before the first request
+from django.conf import settings
+
+if settings.TLE_TIMELINE_ENABLED:
+    from api.tools import tle_timeline
+
+    tle_timeline.load()